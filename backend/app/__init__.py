@@ -1 +1,7 @@
 # FinPulse Backend App
+
+# Register the write-path hooks first, so every process that touches the
+# database through app.* (API, scripts, workers) keeps derived data in step
+from app.services import write_hooks
+
+__all__ = ["write_hooks"]
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -7,6 +8,21 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "postgresql://localhost:5432/finpulse"
+    async_database_url: Optional[str] = None  # Derived from database_url when unset
+    
+    # Read replicas (comma-separated URLs); GET requests read from them when set
+    database_replica_urls: str = ""
+    replica_health_check_seconds: int = 10
+    replica_read_after_write_seconds: int = 5  # Keep a writer's reads on the primary this long
+    
+    # Connection pools, one per engine in each worker: a sync and an async pool
+    # on the primary, one async pool per replica. Keep workers * 2 * (size + overflow)
+    # under the primary's max_connections and workers * (size + overflow) under each replica's
+    db_pool_size: int = 5
+    db_max_overflow: int = 5
+    db_pool_timeout: int = 30  # Seconds to wait for a connection before failing
+    db_pool_recycle: int = 1800  # Seconds before a connection is replaced
+    db_pool_pre_ping: bool = True
     
     # JWT
     secret_key: str = "dev-secret-key-change-in-production"
@@ -14,8 +30,84 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
     
+    # Authenticated-user cache (per worker process)
+    auth_cache_enabled: bool = True
+    auth_cache_ttl_seconds: int = 60  # Also bounds how stale another worker can be
+    auth_cache_max_entries: int = 10000
+    
+    # Per-(user, month) budget evaluation cache (per worker process)
+    budget_cache_enabled: bool = True
+    budget_cache_ttl_seconds: int = 300  # Keyed on the shared data version; the TTL only bounds memory
+    budget_cache_max_entries: int = 10000
+    
+    # Cached responses of the dashboard, budget status and prediction endpoints,
+    # keyed on the user's data version (a database counter, so writes in any
+    # worker invalidate every worker's entries). "memory" is per worker;
+    # "redis" (any Redis-protocol server at result_cache_url) shares entries
+    result_cache_enabled: bool = True
+    result_cache_backend: str = "memory"  # "memory" or "redis"
+    result_cache_url: str = "redis://localhost:6379/0"
+    result_cache_ttl_seconds: int = 300  # Also bounds staleness of date-dependent figures
+    result_cache_max_entries: int = 10000  # memory backend
+    result_cache_lock_seconds: float = 5.0  # How long other workers wait for one computing a miss
+    
+    # Server-Sent Events push channel (/api/events)
+    event_queue_size: int = 100  # Per connection; oldest events are dropped beyond this
+    event_heartbeat_seconds: int = 15
+    event_max_streams_per_user: int = 5  # Per worker
+    event_ticket_expire_seconds: int = 30  # Single-use tickets that open a stream
+    event_broker: str = "local"  # "local" (single worker) or "postgres" (LISTEN/NOTIFY across workers)
+    event_outbox_size: int = 1000  # Events waiting to be relayed by the postgres broker
+    
+    # PostgreSQL range partitions of transactions (migration 0002); pick the
+    # interval before migrating and keep it afterwards
+    transaction_partition_interval: str = "month"  # "month" or "quarter"
+    transaction_partitions_ahead: int = 3  # Future periods kept ready
+    
+    # Archive tiering (scripts/archive.py): transactions older than this many
+    # whole months move to transactions_archive; 0 disables archiving
+    archive_after_months: int = 24
+    
+    # Load the app and shared read-only state in the gunicorn master before
+    # forking, so workers start from a warm copy-on-write image
+    preload_in_master: bool = False
+    
+    # Transaction categorizer: per-user models (per worker process), trained
+    # at startup for users who wrote transactions recently; 0 users disables
+    categorizer_warmup_users: int = 50
+    categorizer_warmup_days: int = 7
+    categorizer_max_models: int = 1000
+    categorizer_model_ttl_seconds: int = 21600  # Models retrain from fresh history after this
+    
     # App
     debug: bool = True
+    admin_emails: str = ""  # Comma-separated emails allowed to use /admin endpoints
+    request_timing_enabled: bool = True  # One JSON log line per request (total, DB, spans)
+    server_timing_header: bool = False  # Also send the timings to clients; exposes internals, dev only
+    metrics_enabled: bool = True  # Prometheus /metrics endpoint and request histograms
+    metrics_refresh_seconds: int = 5  # How often each worker publishes pool/cache gauges
+    
+    # Query diagnostics (opt-in): slow-query log and repeated-statement detection
+    diagnostics_enabled: bool = False
+    diagnostics_slow_query_ms: int = 100
+    diagnostics_repeat_threshold: int = 3  # Same statement shape this many times in one request
+    diagnostics_max_findings: int = 500
+    
+    # Request profiling: admins send X-Profile: sample|trace (or ?_profile=...);
+    # profile_sample_rate > 0 also profiles that fraction of all requests
+    profiling_enabled: bool = True
+    profile_sample_rate: float = 0.0
+    profile_interval_ms: int = 5
+    profile_dir: str = ""  # Defaults to <tmp>/finpulse-profiles
+    profile_max_files: int = 200
+    
+    @property
+    def admin_email_list(self) -> List[str]:
+        return [email.strip().lower() for email in self.admin_emails.split(",") if email.strip()]
+    
+    @property
+    def replica_urls(self) -> List[str]:
+        return [url.strip() for url in self.database_replica_urls.split(",") if url.strip()]
     
     class Config:
         env_file = ".env"
@@ -1,30 +1,215 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from typing import List
+import asyncio
+import itertools
+import threading
+import time
 
 from app.config import get_settings
+from app.services.cache import TTLCache
 
 settings = get_settings()
 
+
+class _CheckoutStatsMixin:
+    """
+    Records how long pool checkouts wait for a connection
+    and how many give up with a pool timeout.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+
+class InstrumentedQueuePool(_CheckoutStatsMixin, QueuePool):
+    """QueuePool with checkout wait/timeout stats."""
+
+
+class InstrumentedAsyncQueuePool(_CheckoutStatsMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool with checkout wait/timeout stats."""
+
+
+def _async_url(url: str) -> str:
+    """Map a sync database URL to its async driver (asyncpg / aiosqlite)."""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    if url.startswith(("postgresql:", "postgres:")):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    if url.startswith("postgresql+psycopg2:"):
+        return "postgresql+asyncpg:" + url[len("postgresql+psycopg2:"):]
+    return url
+
+
+def _pool_args(url: str, poolclass) -> dict:
+    """Pool tuning from Settings; SQLite keeps SQLAlchemy's defaults."""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
 # Create database engine
 # SQLite needs special args, PostgreSQL doesn't
 connect_args = {}
 if settings.database_url.startswith("sqlite"):
     connect_args["check_same_thread"] = False
 
+# Sync engine: schema management, streaming exports and scripts
 engine = create_engine(
     settings.database_url,
     connect_args=connect_args,
-    pool_pre_ping=True if not settings.database_url.startswith("sqlite") else False
+    **_pool_args(settings.database_url, InstrumentedQueuePool)
+)
+
+# Async engine: serves API requests without blocking the event loop
+async_engine = create_async_engine(
+    settings.async_database_url or _async_url(settings.database_url),
+    **_pool_args(settings.database_url, InstrumentedAsyncQueuePool)
 )
 
-# Session factory
+
+class ReplicaSet:
+    """
+    Read replicas chosen round-robin, skipping any marked unhealthy.
+    Health comes from a periodic SELECT 1 and from disconnect errors.
+    """
+    
+    def __init__(self, urls: List[str]):
+        self.engines = [
+            create_async_engine(_async_url(url), **_pool_args(url, InstrumentedAsyncQueuePool))
+            for url in urls
+        ]
+        self.healthy = [True] * len(self.engines)
+        self._cycle = itertools.cycle(range(len(self.engines)))
+        self._lock = threading.Lock()
+        
+        for index, replica in enumerate(self.engines):
+            event.listen(replica.sync_engine, "handle_error", self._on_error(index))
+    
+    def _on_error(self, index: int):
+        def handle_error(context):
+            if context.is_disconnect:
+                self.healthy[index] = False
+        return handle_error
+    
+    def choose(self):
+        """Next healthy replica engine, or None to fall back to the primary."""
+        with self._lock:
+            for _ in range(len(self.engines)):
+                index = next(self._cycle)
+                if self.healthy[index]:
+                    return self.engines[index]
+        return None
+    
+    async def check_health(self):
+        for index, replica in enumerate(self.engines):
+            try:
+                async with replica.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                self.healthy[index] = True
+            except Exception:
+                self.healthy[index] = False
+    
+    async def monitor(self, interval: int):
+        """Background loop started by the app when replicas are configured."""
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+    
+    async def dispose(self):
+        for replica in self.engines:
+            await replica.dispose()
+
+
+replicas = ReplicaSet(settings.replica_urls)
+
+# Bearer tokens that recently wrote; their GETs stay on the primary for a few
+# seconds so they read their own writes despite replication lag (per worker)
+_recent_writers = TTLCache(max_entries=10000, ttl_seconds=settings.replica_read_after_write_seconds)
+
+
+class RoutingSession(Session):
+    """
+    Sends reads from GET requests to a replica and everything else,
+    including any flush, to the primary. A session sticks to one replica.
+    """
+    
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing:
+            self.info["use_replica"] = False
+        
+        if self.info.get("use_replica"):
+            replica = self.info.get("replica")
+            if replica is None:
+                replica = replicas.choose()
+                self.info["replica"] = replica
+            if replica is not None:
+                return replica.sync_engine
+        
+        return async_engine.sync_engine
+
+
+# Session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False  # Attributes stay readable after commit; lazy loads can't run in async
+)
 
 # Base class for models
 Base = declarative_base()
 
 
+def insert_ignoring_conflict(session: Session, model, values: dict) -> bool:
+    """
+    INSERT ... ON CONFLICT DO NOTHING for summary rows created lazily by
+    concurrent writers; returns whether this call inserted the row.
+    """
+    dialect = session.connection().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(model).values(**values).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        statement = sqlite.insert(model).values(**values).on_conflict_do_nothing()
+    else:
+        statement = insert(model).values(**values)
+    return session.execute(statement).rowcount == 1
+
+
 def get_db():
     """
     Dependency that provides a database session.
@@ -35,3 +220,66 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def _use_replica(request: Request) -> bool:
+    """GET/HEAD requests read from a replica unless the caller just wrote."""
+    if not replicas.engines:
+        return False
+    
+    writer = request.headers.get("authorization")
+    if request.method not in ("GET", "HEAD"):
+        if writer:
+            _recent_writers.set(writer, True)
+        return False
+    
+    return not (writer and _recent_writers.get(writer))
+
+
+async def get_async_db(request: Request):
+    """
+    Async counterpart of get_db used by the API routers.
+    Sync service code can run on it through `await db.run_sync(fn, ...)`.
+    """
+    async with AsyncSessionLocal() as db:
+        db.sync_session.info["use_replica"] = _use_replica(request)
+        yield db
+
+
+def _pool_stats(pool) -> dict:
+    stats = {"pool_class": type(pool).__name__}
+    
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+        })
+    
+    if isinstance(pool, _CheckoutStatsMixin):
+        with pool._stats_lock:
+            stats.update({
+                "checkouts": pool.checkouts,
+                "timeouts": pool.timeouts,
+                "avg_wait_ms": round(pool.total_wait / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+                "max_wait_ms": round(pool.max_wait * 1000, 3),
+            })
+    
+    return stats
+
+
+def get_pool_stats() -> dict:
+    """Connection pool state for this worker, surfaced from /health."""
+    stats = {
+        "async": _pool_stats(async_engine.pool),
+        "sync": _pool_stats(engine.pool),
+    }
+    for index, replica in enumerate(replicas.engines):
+        stats[f"replica_{index}"] = {
+            "healthy": replicas.healthy[index],
+            **_pool_stats(replica.pool)
+        }
+    return stats
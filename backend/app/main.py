@@ -1,9 +1,37 @@
-from fastapi import FastAPI
+from app.services import startup as startup_report  # First: times the rest of this module's imports
+from fastapi import FastAPI, Request, Response
+import asyncio
+import random
+import time
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 from app.config import get_settings
-from app.database import engine, Base
-from app.routers import auth, transactions, dashboard, budgets, predictions
+from app.database import engine, async_engine, replicas, get_pool_stats
+from app.schema import verify_schema
+from app.routers import auth, transactions, dashboard, budgets, predictions, admin, events
+from app.services import diagnostics
+from app.services.auth import get_auth_cache_stats, is_admin_token
+from app.services.budget_evaluation import get_budget_cache_stats
+from app.services.coalesce import get_coalescing_stats
+from app.services.result_cache import get_result_cache_stats
+from app.services import notifications
+from app.services.partitions import ensure_partitions
+from app.services.profiling import RequestProfiler, save_profile
+from app.services.metrics import (
+    REQUESTS_IN_FLIGHT,
+    METRICS_CONTENT_TYPE,
+    observe_request,
+    update_pool_gauges,
+    update_cache_gauges,
+    render_metrics
+)
+from app.services.timing import (
+    start_request,
+    server_timing_header,
+    log_request,
+    configure_request_log
+)
 
 settings = get_settings()
 
@@ -23,22 +51,192 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Profile-Id"] if settings.server_timing_header else ["X-Profile-Id"],
 )
 
+
+@app.middleware("http")
+async def request_timing(request: Request, call_next):
+    """
+    Time each request and log total, DB (with statement count) and service
+    spans as a structured line; with SERVER_TIMING_HEADER also send them to
+    the client in a Server-Timing header.
+    """
+    if not settings.request_timing_enabled:
+        return await call_next(request)
+    
+    timings = start_request()
+    response = await call_next(request)
+    
+    if settings.server_timing_header:
+        response.headers["Server-Timing"] = server_timing_header(timings)
+    route = request.scope.get("route")
+    log_request(
+        timings,
+        request.method,
+        request.url.path,
+        getattr(route, "path", None),
+        response.status_code
+    )
+    return response
+
+
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    """Latency histogram per route template, plus in-flight requests."""
+    if not settings.metrics_enabled:
+        return await call_next(request)
+    
+    start = time.perf_counter()
+    status_code = 500
+    REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        observe_request(
+            request.method,
+            getattr(route, "path", None) or "unmatched",
+            status_code,
+            time.perf_counter() - start
+        )
+
+
+if settings.diagnostics_enabled:
+    diagnostics.install()
+    
+    @app.middleware("http")
+    async def query_diagnostics(request: Request, call_next):
+        """Track statement shapes per request to flag repeated queries."""
+        queries = diagnostics.start_request(request.scope)
+        response = await call_next(request)
+        diagnostics.finish_request(queries)
+        return response
+
+
+if settings.profiling_enabled:
+    @app.middleware("http")
+    async def request_profiler(request: Request, call_next):
+        """
+        Profile a request when an admin asks for it (X-Profile header or
+        _profile query parameter) or when it is randomly sampled.
+        Untriggered requests only pay for a header lookup.
+        """
+        mode = request.headers.get("x-profile") or request.query_params.get("_profile")
+        if mode:
+            # Only admins may trigger a profile; for anyone else it's an ordinary request
+            authorization = request.headers.get("authorization", "")
+            token = authorization[7:] if authorization.lower().startswith("bearer ") else ""
+            if not token or not await is_admin_token(token):
+                mode = None
+        sampled = (
+            not mode
+            and settings.profile_sample_rate > 0
+            and random.random() < settings.profile_sample_rate
+        )
+        if not mode and not sampled:
+            return await call_next(request)
+        
+        profiler = RequestProfiler(mode or "sample")
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            response = await call_next(request)
+        finally:
+            content = profiler.stop()
+        
+        route = request.scope.get("route")
+        profile_id = await run_in_threadpool(save_profile, content, {
+            "mode": profiler.mode,
+            "requested_mode": profiler.requested_mode,
+            "loop_wide": True,  # Includes everything else that ran on the event loop meanwhile
+            "sampled": sampled,
+            "method": request.method,
+            "path": request.url.path,
+            "route": getattr(route, "path", None),
+            "status": response.status_code,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+        })
+        response.headers["X-Profile-Id"] = profile_id
+        return response
+
+
+def refresh_process_gauges():
+    """Publish this worker's pool and cache stats as gauges."""
+    update_pool_gauges(get_pool_stats())
+    auth_stats = get_auth_cache_stats()
+    update_cache_gauges({
+        "auth_tokens": auth_stats["tokens"],
+        "auth_users": auth_stats["users"],
+        "budget_months": get_budget_cache_stats(),
+        "results": get_result_cache_stats(),
+    })
+
+
+async def publish_process_gauges(interval: int):
+    while True:
+        refresh_process_gauges()
+        await asyncio.sleep(interval)
+
+
 # Include routers
 app.include_router(auth.router, prefix="/api")
 app.include_router(transactions.router, prefix="/api")
 app.include_router(dashboard.router, prefix="/api")
 app.include_router(budgets.router, prefix="/api")
 app.include_router(predictions.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+app.include_router(events.router, prefix="/api")
 
 
 @app.on_event("startup")
 async def startup():
-    """Create database tables on startup."""
-    # Import all models to register them with Base
-    from app.models import User, Transaction, Budget  # noqa: F401
-    Base.metadata.create_all(bind=engine)
+    """Check the schema revision (migrations run separately) and start background tasks."""
+    with startup_report.phase("verify_schema"):
+        verify_schema()
+    
+    # Keep the next periods' transaction partitions ready (PostgreSQL only)
+    with startup_report.phase("ensure_partitions"), engine.begin() as connection:
+        ensure_partitions(connection)
+    
+    if settings.request_timing_enabled:
+        configure_request_log()
+    
+    # Pool/cache gauges are per worker, so each worker publishes its own
+    if settings.metrics_enabled:
+        app.state.gauge_publisher = asyncio.create_task(
+            publish_process_gauges(settings.metrics_refresh_seconds)
+        )
+    
+    # Train suggest-category models for recently active users before taking traffic
+    with startup_report.phase("categorizer_warmup"):
+        startup_report.warm_categorizer()
+    
+    with startup_report.phase("event_broker"):
+        await notifications.broker.start()
+    
+    # Keep replica health current so reads fail over to the primary
+    if replicas.engines:
+        app.state.replica_monitor = asyncio.create_task(
+            replicas.monitor(settings.replica_health_check_seconds)
+        )
+    
+    startup_report.log_startup_report()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close pooled async connections."""
+    for task_name in ("replica_monitor", "gauge_publisher"):
+        task = getattr(app.state, task_name, None)
+        if task:
+            task.cancel()
+    await notifications.broker.stop()
+    await replicas.dispose()
+    await async_engine.dispose()
 
 
 @app.get("/")
@@ -54,4 +252,25 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "database_pool": get_pool_stats(),
+        "auth_cache": get_auth_cache_stats(),
+        "event_streams": notifications.get_connection_stats(),
+        "categorizer": startup_report.get_categorizer_stats(),
+        "coalescing": get_coalescing_stats(),
+        "result_cache": get_result_cache_stats()
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (aggregated across gunicorn workers)."""
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    
+    refresh_process_gauges()
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
+startup_report.mark_imported()
@@ -2,5 +2,9 @@
 from app.models.user import User
 from app.models.transaction import Transaction
 from app.models.budget import Budget
+from app.models.spend import CategoryMonthSpend, BudgetAlertEvent
+from app.models.ledger import UserBalance, UserDataVersion
+from app.models.summary import MonthSummary
+from app.models.archive import ArchivedTransaction, ArchiveState
 
-__all__ = ["User", "Transaction", "Budget"]
+__all__ = ["User", "Transaction", "Budget", "CategoryMonthSpend", "BudgetAlertEvent", "UserBalance", "UserDataVersion", "MonthSummary", "ArchivedTransaction", "ArchiveState"]
@@ -0,0 +1,58 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Date, Integer, Boolean, ForeignKey, Text, Index, JSON
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import Base
+
+
+class ArchivedTransaction(Base):
+    """
+    Transactions older than the archive horizon, moved out of the hot
+    table by scripts/archive.py. Same columns as Transaction; read-only.
+    """
+
+    __tablename__ = "transactions_archive"
+
+    __table_args__ = (
+        Index('idx_archive_user_date', 'user_id', 'date'),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    date = Column(Date, nullable=False)
+    amount = Column(Integer, nullable=False)  # In paise
+    description = Column(Text, nullable=False)
+    merchant = Column(String(255), nullable=True)
+    category = Column(String(50), nullable=False)
+    is_income = Column(Boolean, default=False)
+
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+
+    category_confidence = Column(Integer, nullable=True)
+    is_category_overridden = Column(Boolean, default=False)
+
+    def __repr__(self):
+        return f"<ArchivedTransaction {self.amount} - {self.category}>"
+
+
+class ArchiveState(Base):
+    """
+    Per-user archive watermark. Reads whose date range starts on or after
+    archived_before never touch the archive table.
+    """
+
+    __tablename__ = "archive_states"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    archived_before = Column(Date, nullable=False)  # Every archived row is dated before this
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+    # Archived expenses per category in paise, for all-time breakdowns
+    expense_by_category = Column(JSON, nullable=False, default=dict)
+
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ArchiveState {self.user_id} before {self.archived_before}>"
@@ -0,0 +1,47 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Date, Integer, BigInteger, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import Base
+
+
+class UserBalance(Base):
+    """
+    All-time totals per user, kept current by every transaction write so
+    the dashboard balance is a single-row read.
+    """
+    
+    __tablename__ = "user_balances"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    
+    total_income = Column(BigInteger, nullable=False, default=0)  # In paise
+    total_expense = Column(BigInteger, nullable=False, default=0)  # In paise
+    transaction_count = Column(Integer, nullable=False, default=0)
+    first_date = Column(Date, nullable=True)
+    last_date = Column(Date, nullable=True)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<UserBalance {self.user_id}: {self.balance}>"
+    
+    @property
+    def balance(self) -> int:
+        return self.total_income - self.total_expense
+
+
+class UserDataVersion(Base):
+    """
+    Counter bumped in the same database transaction as every write to a
+    user's transactions or budgets. Cached reads key on it, so a write
+    handled by one worker invalidates every worker's cached results.
+    """
+    
+    __tablename__ = "user_data_versions"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<UserDataVersion {self.user_id}: {self.version}>"
@@ -0,0 +1,49 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Date, Integer, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import Base
+
+
+class CategoryMonthSpend(Base):
+    """
+    Running expense total per user, category and month.
+    Maintained on every transaction write so budget thresholds can be
+    checked without aggregating transactions.
+    """
+    
+    __tablename__ = "category_month_spend"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    category = Column(String(50), primary_key=True)
+    month = Column(Date, primary_key=True)  # First day of the month
+    amount = Column(Integer, nullable=False, default=0)  # In paise
+    
+    def __repr__(self):
+        return f"<CategoryMonthSpend {self.category} {self.month}: {self.amount}>"
+
+
+class BudgetAlertEvent(Base):
+    """A budget threshold (75/90/100%) crossed by a transaction write."""
+    
+    __tablename__ = "budget_alert_events"
+    
+    __table_args__ = (
+        Index('idx_alert_user_created', 'user_id', 'created_at'),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    
+    category = Column(String(50), nullable=False)
+    month = Column(Date, nullable=False)
+    threshold = Column(Integer, nullable=False)  # Percentage crossed
+    alert_level = Column(String(20), nullable=False)  # info, warning, critical
+    spent = Column(Integer, nullable=False)  # In paise, after the write
+    monthly_limit = Column(Integer, nullable=False)  # In paise
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<BudgetAlertEvent {self.category} {self.threshold}%>"
@@ -0,0 +1,32 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Date, Integer, BigInteger, ForeignKey, JSON
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import Base
+
+
+class MonthSummary(Base):
+    """
+    Frozen figures for a completed month, so historical reads skip the
+    transactions table. A late edit to the month recomputes its row.
+    """
+    
+    __tablename__ = "month_summaries"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    month = Column(Date, primary_key=True)  # First day of the month
+    
+    income_total = Column(BigInteger, nullable=False, default=0)  # In paise
+    income_count = Column(Integer, nullable=False, default=0)
+    expense_total = Column(BigInteger, nullable=False, default=0)  # In paise
+    expense_count = Column(Integer, nullable=False, default=0)
+    
+    # Expenses per category: {category: {total, count, min, max, sum_squares}}
+    categories = Column(JSON, nullable=False, default=dict)
+    # Budget outcome as of closing: {category: {limit, spent, over_budget}}
+    budgets = Column(JSON, nullable=False, default=dict)
+    
+    closed_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<MonthSummary {self.user_id} {self.month}>"
@@ -12,7 +12,10 @@ class Transaction(Base):
     
     __tablename__ = "transactions"
     
-    # Composite indexes for common query patterns
+    # Composite indexes for common query patterns. On PostgreSQL, migration
+    # 0002 partitions the table by date range, so the key is (id, date); ids
+    # stay unique as app-assigned uuid4s, with a unique index on id in each
+    # partition (app/services/partitions.py). SQLite keeps id as the key.
     __table_args__ = (
         Index('idx_user_date', 'user_id', 'date'),
         Index('idx_user_category', 'user_id', 'category'),
@@ -23,7 +26,7 @@ class Transaction(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Transaction details
-    date = Column(Date, nullable=False, index=True)
+    date = Column(Date, primary_key=True, nullable=False, index=True)
     amount = Column(Integer, nullable=False)  # Stored in paise (smallest unit) to avoid float issues
     description = Column(Text, nullable=False)
     merchant = Column(String(255), nullable=True)  # Extracted or inferred merchant name
@@ -0,0 +1,35 @@
+from typing import Callable
+
+import orjson
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson.
+    Handles UUID, date and datetime natively, so endpoints can return
+    pre-built dicts without going through pydantic serialization.
+    """
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
+class EventStreamResponse(StreamingResponse):
+    """
+    Server-Sent Events response that calls `on_close` however the stream
+    ends, including when the client disconnects before the first event
+    and the body generator's own cleanup never runs.
+    """
+    
+    media_type = "text/event-stream"
+    
+    def __init__(self, content, on_close: Callable[[], None], **kwargs):
+        super().__init__(content, **kwargs)
+        self.on_close = on_close
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
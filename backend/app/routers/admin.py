@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import Optional, Literal
+
+from app.models.user import User
+from app.services.auth import get_admin_user
+from app.services.diagnostics import get_findings, clear_findings
+from app.services.profiling import list_profiles, load_profile
+from app.services.startup import get_startup_report
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/diagnostics/queries")
+async def list_query_findings(
+    type: Optional[Literal["slow_query", "repeated_statement"]] = None,
+    route: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Slow queries and repeated-statement (N+1) findings recorded by this worker.
+    Requires DIAGNOSTICS_ENABLED=true.
+    
+    - type: slow_query or repeated_statement
+    - route: route template, e.g. /dashboard/summary
+    """
+    return get_findings(type, route, limit)
+
+
+@router.delete("/diagnostics/queries", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_query_findings(admin: User = Depends(get_admin_user)):
+    """Clear recorded findings on this worker."""
+    clear_findings()
+
+
+@router.get("/profiles")
+async def list_request_profiles(
+    limit: int = Query(50, ge=1, le=200),
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Stored request profiles, newest first.
+    Profiles come from X-Profile requests and random sampling (PROFILE_SAMPLE_RATE).
+    """
+    return {"profiles": list_profiles(limit)}
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_request_profile(
+    profile_id: str,
+    admin: User = Depends(get_admin_user)
+):
+    """
+    Raw profile: folded stacks for sample mode (load into speedscope or
+    flamegraph.pl), a pstats report for trace mode.
+    """
+    content = load_profile(profile_id)
+    if content is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return content
+
+
+@router.get("/startup")
+async def get_worker_startup(admin: User = Depends(get_admin_user)):
+    """
+    Startup report for the worker serving this request: app import time,
+    startup phase timings, whether it was forked from a preloaded master,
+    and which lazily imported heavy modules have been loaded so far.
+    """
+    return get_startup_report()
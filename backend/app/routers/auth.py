@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.schemas.user import (
     UserCreate, 
@@ -24,7 +26,7 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user account.
     
@@ -32,7 +34,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     - Password must be at least 8 characters
     """
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -42,26 +44,27 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     # Create new user
     user = User(
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password)
+        password_hash=await run_in_threadpool(get_password_hash, user_data.password)
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     return user
 
 
 @router.post("/login", response_model=Token)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Login with email and password.
     
     Returns access and refresh tokens.
     """
     # Find user by email
-    user = db.query(User).filter(User.email == credentials.email).first()
+    user = await db.scalar(select(User).where(User.email == credentials.email))
     
-    if not user or not verify_password(credentials.password, user.password_hash):
+    # bcrypt is deliberately slow; keep it off the event loop
+    if not user or not await run_in_threadpool(verify_password, credentials.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -80,7 +83,7 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_db)):
+async def refresh_token(request: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Get new access token using refresh token.
     """
@@ -101,7 +104,7 @@ async def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_
             detail="Invalid refresh token"
         )
     
-    user = db.query(User).filter(User.id == user_uuid).first()
+    user = await db.get(User, user_uuid)
     
     if not user or not user.is_active:
         raise HTTPException(
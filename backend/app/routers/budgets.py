@@ -1,22 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from uuid import UUID
-from datetime import date
-from typing import List
+from datetime import date, datetime
+from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.models.budget import Budget
-from app.models.transaction import Transaction
+from app.models.spend import BudgetAlertEvent
 from app.schemas.budget import (
     BudgetCreate,
     BudgetUpdate,
     BudgetResponse,
     BudgetStatusItem,
-    BudgetStatusResponse
+    BudgetStatusResponse,
+    BudgetAlertEventResponse
 )
 from app.services.auth import get_current_user
+from app.services.budget_alerts import alert_payload
+from app.services.budget_evaluation import evaluate_budgets
+from app.services.result_cache import cached_response
 
 router = APIRouter(prefix="/budgets", tags=["Budgets"])
 
@@ -25,77 +29,68 @@ router = APIRouter(prefix="/budgets", tags=["Budgets"])
 async def get_budget_status(
     month: date = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get budget status for all categories for a given month.
     Shows budget limit, spent amount, and percentage used.
+    Cached per user data version (see app/services/result_cache.py).
     """
-    if month is None:
-        month = date.today().replace(day=1)
-    else:
-        month = month.replace(day=1)
-    
-    # Get end of month
-    if month.month == 12:
-        next_month = month.replace(year=month.year + 1, month=1)
-    else:
-        next_month = month.replace(month=month.month + 1)
-    
-    # Get all budgets for this month
-    budgets = db.query(Budget).filter(
-        Budget.user_id == current_user.id,
-        Budget.month == month
-    ).all()
-    
-    # Get spending per category for this month
-    spending = db.query(
-        Transaction.category,
-        func.sum(Transaction.amount).label('total')
-    ).filter(
-        Transaction.user_id == current_user.id,
-        Transaction.date >= month,
-        Transaction.date < next_month,
-        Transaction.is_income == False
-    ).group_by(Transaction.category).all()
-    
-    spending_dict = {cat: int(total) for cat, total in spending}
-    
-    # Build response
-    budget_items = []
-    total_budgeted = 0
-    total_spent = 0
-    
-    for budget in budgets:
-        spent = spending_dict.get(budget.category, 0)
-        remaining = budget.monthly_limit - spent
-        percentage = (spent / budget.monthly_limit * 100) if budget.monthly_limit > 0 else 0
-        
-        budget_items.append(BudgetStatusItem(
-            category=budget.category,
-            monthly_limit=budget.monthly_limit,
-            spent=spent,
-            remaining=remaining,
-            percentage_used=round(percentage, 1),
-            is_over_budget=spent > budget.monthly_limit
-        ))
-        
-        total_budgeted += budget.monthly_limit
-        total_spent += spent
+    return await cached_response(
+        db, "budgets.status", current_user.id,
+        lambda: _build_status(db, current_user.id, month),
+        params=(month,)
+    )
+
+
+async def _build_status(db: AsyncSession, user_id: UUID, month: Optional[date]) -> BudgetStatusResponse:
+    evaluation = await db.run_sync(evaluate_budgets, user_id, month)
     
     return BudgetStatusResponse(
-        month=month,
-        budgets=budget_items,
-        total_budgeted=total_budgeted,
-        total_spent=total_spent
+        month=evaluation["month"],
+        budgets=[
+            BudgetStatusItem(
+                category=item["category"],
+                monthly_limit=item["monthly_limit"],
+                spent=item["spent"],
+                remaining=item["remaining"],
+                percentage_used=round(item["percentage_used"], 1),
+                is_over_budget=item["is_over_budget"]
+            )
+            for item in evaluation["budgets"]
+        ],
+        total_budgeted=evaluation["total_budgeted"],
+        total_spent=evaluation["total_spent"]
     )
 
 
+@router.get("/alerts", response_model=List[BudgetAlertEventResponse])
+async def list_budget_alert_events(
+    since: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Threshold crossings recorded at write time, newest first.
+    The same events are pushed live on /events; use `since` to catch up.
+    """
+    query = select(BudgetAlertEvent).where(BudgetAlertEvent.user_id == current_user.id)
+    if since is not None:
+        query = query.where(BudgetAlertEvent.created_at > since)
+    
+    events = (await db.scalars(
+        query.order_by(BudgetAlertEvent.created_at.desc()).limit(limit)
+    )).all()
+    
+    return [alert_payload(event) for event in events]
+
+
 @router.get("", response_model=List[BudgetResponse])
 async def list_budgets(
     month: date = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all budgets for a month."""
     if month is None:
@@ -103,10 +98,12 @@ async def list_budgets(
     else:
         month = month.replace(day=1)
     
-    budgets = db.query(Budget).filter(
-        Budget.user_id == current_user.id,
-        Budget.month == month
-    ).all()
+    budgets = (await db.scalars(
+        select(Budget).where(
+            Budget.user_id == current_user.id,
+            Budget.month == month
+        )
+    )).all()
     
     return budgets
 
@@ -115,15 +112,17 @@ async def list_budgets(
 async def create_budget(
     budget_data: BudgetCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new budget for a category."""
     # Check if budget already exists
-    existing = db.query(Budget).filter(
-        Budget.user_id == current_user.id,
-        Budget.category == budget_data.category,
-        Budget.month == budget_data.month.replace(day=1)
-    ).first()
+    existing = await db.scalar(
+        select(Budget).where(
+            Budget.user_id == current_user.id,
+            Budget.category == budget_data.category,
+            Budget.month == budget_data.month.replace(day=1)
+        )
+    )
     
     if existing:
         raise HTTPException(
@@ -138,8 +137,8 @@ async def create_budget(
         month=budget_data.month.replace(day=1)
     )
     db.add(budget)
-    db.commit()
-    db.refresh(budget)
+    await db.commit()
+    await db.refresh(budget)
     
     return budget
 
@@ -149,13 +148,15 @@ async def update_budget(
     budget_id: UUID,
     update_data: BudgetUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a budget's monthly limit."""
-    budget = db.query(Budget).filter(
-        Budget.id == budget_id,
-        Budget.user_id == current_user.id
-    ).first()
+    budget = await db.scalar(
+        select(Budget).where(
+            Budget.id == budget_id,
+            Budget.user_id == current_user.id
+        )
+    )
     
     if not budget:
         raise HTTPException(
@@ -164,8 +165,8 @@ async def update_budget(
         )
     
     budget.monthly_limit = update_data.monthly_limit
-    db.commit()
-    db.refresh(budget)
+    await db.commit()
+    await db.refresh(budget)
     
     return budget
 
@@ -174,13 +175,15 @@ async def update_budget(
 async def delete_budget(
     budget_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a budget."""
-    budget = db.query(Budget).filter(
-        Budget.id == budget_id,
-        Budget.user_id == current_user.id
-    ).first()
+    budget = await db.scalar(
+        select(Budget).where(
+            Budget.id == budget_id,
+            Budget.user_id == current_user.id
+        )
+    )
     
     if not budget:
         raise HTTPException(
@@ -188,5 +191,5 @@ async def delete_budget(
             detail="Budget not found"
         )
     
-    db.delete(budget)
-    db.commit()
+    await db.delete(budget)
+    await db.commit()
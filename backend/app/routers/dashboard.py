@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from datetime import date, timedelta
+from typing import Literal, Optional
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.models.transaction import Transaction
+from app.models.ledger import UserBalance
+from app.models.archive import ArchiveState
 from app.services.auth import get_current_user
+from app.services.coalesce import run_coalesced
+from app.services.result_cache import cached_response
+from app.services.timeseries import build_timeseries
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
@@ -14,11 +20,21 @@ router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 @router.get("/summary")
 async def get_dashboard_summary(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get dashboard summary including balance, income, expenses for current month.
+    Clients on /events receive dashboard_delta events that apply to these figures.
+    Cached per user data version; concurrent requests for the same user
+    (several open tabs) share one computation.
     """
+    return await cached_response(
+        db, "dashboard.summary", current_user.id,
+        lambda: _build_summary(db, current_user)
+    )
+
+
+async def _build_summary(db: AsyncSession, current_user: User) -> dict:
     today = date.today()
     first_of_month = today.replace(day=1)
     
@@ -30,37 +46,51 @@ async def get_dashboard_summary(
     last_of_prev_month = first_of_month - timedelta(days=1)
     
     # Current month income
-    current_income = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == current_user.id,
-        Transaction.date >= first_of_month,
-        Transaction.is_income == True
-    ).scalar() or 0
+    current_income = await db.scalar(
+        select(func.sum(Transaction.amount)).where(
+            Transaction.user_id == current_user.id,
+            Transaction.date >= first_of_month,
+            Transaction.is_income == True
+        )
+    ) or 0
     
     # Current month expenses
-    current_expenses = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == current_user.id,
-        Transaction.date >= first_of_month,
-        Transaction.is_income == False
-    ).scalar() or 0
+    current_expenses = await db.scalar(
+        select(func.sum(Transaction.amount)).where(
+            Transaction.user_id == current_user.id,
+            Transaction.date >= first_of_month,
+            Transaction.is_income == False
+        )
+    ) or 0
     
     # Previous month expenses for comparison
-    prev_expenses = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == current_user.id,
-        Transaction.date >= first_of_prev_month,
-        Transaction.date <= last_of_prev_month,
-        Transaction.is_income == False
-    ).scalar() or 0
+    prev_expenses = await db.scalar(
+        select(func.sum(Transaction.amount)).where(
+            Transaction.user_id == current_user.id,
+            Transaction.date >= first_of_prev_month,
+            Transaction.date <= last_of_prev_month,
+            Transaction.is_income == False
+        )
+    ) or 0
     
-    # Total balance (all-time income - expenses)
-    total_income = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == current_user.id,
-        Transaction.is_income == True
-    ).scalar() or 0
-    
-    total_expenses = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == current_user.id,
-        Transaction.is_income == False
-    ).scalar() or 0
+    # Total balance (all-time income - expenses), from the running ledger when it has a row
+    balance_row = await db.get(UserBalance, current_user.id)
+    if balance_row is not None:
+        total_income, total_expenses = balance_row.total_income, balance_row.total_expense
+    else:
+        total_income = await db.scalar(
+            select(func.sum(Transaction.amount)).where(
+                Transaction.user_id == current_user.id,
+                Transaction.is_income == True
+            )
+        ) or 0
+        
+        total_expenses = await db.scalar(
+            select(func.sum(Transaction.amount)).where(
+                Transaction.user_id == current_user.id,
+                Transaction.is_income == False
+            )
+        ) or 0
     
     balance = total_income - total_expenses
     
@@ -71,28 +101,41 @@ async def get_dashboard_summary(
         expense_change = 0
     
     # Category breakdown (all-time expenses by category)
-    category_breakdown = db.query(
-        Transaction.category,
-        func.sum(Transaction.amount).label('total')
-    ).filter(
-        Transaction.user_id == current_user.id,
-        Transaction.is_income == False
-    ).group_by(Transaction.category).all()
+    category_breakdown = (await db.execute(
+        select(
+            Transaction.category,
+            func.sum(Transaction.amount).label('total')
+        ).where(
+            Transaction.user_id == current_user.id,
+            Transaction.is_income == False
+        ).group_by(Transaction.category)
+    )).all()
+    
+    totals = {cat: int(total) for cat, total in category_breakdown}
+    
+    # Archived expenses are kept as per-category totals, so no archive scan here
+    archive = await db.get(ArchiveState, current_user.id)
+    if archive is not None:
+        for cat, total in archive.expense_by_category.items():
+            totals[cat] = totals.get(cat, 0) + total
     
     categories = [
-        {"category": cat, "amount": int(total)}
-        for cat, total in category_breakdown
+        {"category": cat, "amount": total}
+        for cat, total in totals.items()
     ]
     
     # Recent transactions
-    recent = db.query(Transaction).filter(
-        Transaction.user_id == current_user.id
-    ).order_by(Transaction.date.desc()).limit(5).all()
+    recent = (await db.scalars(
+        select(Transaction).where(
+            Transaction.user_id == current_user.id
+        ).order_by(Transaction.date.desc()).limit(5)
+    )).all()
     
     return {
         "balance": int(balance),
         "monthly_income": int(current_income),
         "monthly_expenses": int(current_expenses),
+        "previous_month_expenses": int(prev_expenses),
         "expense_change_percent": round(expense_change, 1),
         "category_breakdown": categories,
         "recent_transactions": [
@@ -108,3 +151,36 @@ async def get_dashboard_summary(
             for t in recent
         ]
     }
+
+
+
+@router.get("/timeseries")
+async def get_timeseries(
+    bucket: Literal["day", "week", "month"] = "month",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    split_categories: bool = False,
+    max_points: int = Query(200, ge=10, le=1000),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Income, expenses, net and running balance per day, week or month.
+    
+    - start/end: inclusive range (default: the year up to today)
+    - split_categories: add per-category expenses to each point
+    - max_points: upper bound on points; longer ranges merge adjacent buckets
+      and report how many in `bucket_size`
+    """
+    end = end or date.today()
+    start = start or end.replace(year=end.year - 1) + timedelta(days=1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    
+    return await cached_response(
+        db, "dashboard.timeseries", current_user.id,
+        lambda: run_coalesced(
+            db, build_timeseries, current_user.id, start, end, bucket, split_categories, max_points
+        ),
+        params=(start, end, bucket, split_categories, max_points)
+    )
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from typing import Optional
+
+from app.config import get_settings
+from app.models.user import User
+from app.responses import EventStreamResponse
+from app.schemas.user import StreamTicket
+from app.services import notifications
+from app.services.auth import authenticate_token, create_stream_ticket, get_current_user, redeem_stream_ticket
+
+settings = get_settings()
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+optional_bearer = HTTPBearer(auto_error=False)
+
+
+@router.post("/ticket", response_model=StreamTicket)
+async def create_ticket(current_user: User = Depends(get_current_user)):
+    """
+    Issue a short-lived, single-use ticket for opening the event stream.
+    
+    Browsers' EventSource cannot set headers, so it passes this ticket as
+    `?ticket=` rather than putting the access token in the URL.
+    """
+    return StreamTicket(
+        ticket=create_stream_ticket(current_user.id),
+        expires_in=settings.event_ticket_expire_seconds
+    )
+
+
+@router.get("")
+async def event_stream(
+    ticket: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer)
+):
+    """
+    Server-Sent Events stream of the current user's live updates.
+    
+    - budget_alert: a transaction write crossed 75/90/100% of a budget
+    - dashboard_delta: changes to the /dashboard/summary figures
+    
+    Authenticate with the Authorization header or a `?ticket=` from
+    POST /events/ticket.
+    """
+    # Authenticated without a request-scoped session, so the stream holds no connection
+    if credentials:
+        user = await authenticate_token(credentials.credentials)
+    else:
+        user = await redeem_stream_ticket(ticket) if ticket else None
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    subscription = notifications.subscribe(user.id)
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many open event streams"
+        )
+    
+    return EventStreamResponse(
+        notifications.stream(subscription),
+        on_close=lambda: notifications.unsubscribe(subscription),
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
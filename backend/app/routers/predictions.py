@@ -1,18 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from pydantic import BaseModel, Field
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.services.auth import get_current_user
-from app.services.ml_predictor import (
-    predict_next_month_spending,
-    predict_category_spending,
-    get_budget_alerts,
-    detect_anomalies,
-    get_spending_insights
-)
+from app.services.coalesce import run_coalesced
+from app.services.result_cache import cached_response
 from app.services.ml_constants import (
     DEFAULT_ANOMALY_DAYS,
     DEFAULT_Z_SCORE_THRESHOLD,
@@ -24,6 +19,13 @@ from app.services.ml_constants import (
 
 router = APIRouter(prefix="/predictions", tags=["Predictions"])
 
+# app.services.ml_predictor is imported inside each endpoint so it loads on
+# first use instead of at worker boot. Computations go through
+# run_coalesced: concurrent identical requests (several tabs, or the
+# frontend loading insights alongside spending and budget alerts) share one
+# in-flight result. Responses are cached per user data version
+# (app/services/result_cache.py).
+
 
 # Pydantic models for input validation
 class AnomalyParams(BaseModel):
@@ -45,14 +47,19 @@ class AnomalyParams(BaseModel):
 @router.get("/spending")
 async def get_spending_prediction(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get next month's spending prediction using ML.
     Uses moving average of last 3 months.
     """
+    from app.services.ml_predictor import predict_next_month_spending
+    
     try:
-        return predict_next_month_spending(db, current_user.id)
+        return await cached_response(
+            db, "predictions.spending", current_user.id,
+            lambda: run_coalesced(db, predict_next_month_spending, current_user.id)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
@@ -61,13 +68,19 @@ async def get_spending_prediction(
 async def get_category_prediction(
     category: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get spending prediction for a specific category.
     """
+    from app.services.ml_predictor import predict_category_spending
+    
     try:
-        return predict_category_spending(db, current_user.id, category)
+        return await cached_response(
+            db, "predictions.category", current_user.id,
+            lambda: run_coalesced(db, predict_category_spending, current_user.id, category),
+            params=(category,)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Category prediction failed: {str(e)}")
 
@@ -75,20 +88,25 @@ async def get_category_prediction(
 @router.get("/budget-alerts")
 async def get_budget_status(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get budget alerts and predictions for when limits will be exceeded.
     Returns alerts sorted by severity.
     """
-    try:
-        alerts = get_budget_alerts(db, current_user.id)
+    from app.services.ml_predictor import get_budget_alerts
+    
+    async def compute():
+        alerts = await run_coalesced(db, get_budget_alerts, current_user.id)
         return {
             "alerts": alerts,
             "total_alerts": len(alerts),
             "critical_count": sum(1 for a in alerts if a["alert_level"] == "critical"),
             "warning_count": sum(1 for a in alerts if a["alert_level"] == "warning")
         }
+    
+    try:
+        return await cached_response(db, "predictions.budget_alerts", current_user.id, compute)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Budget alerts failed: {str(e)}")
 
@@ -98,7 +116,7 @@ async def get_anomalous_transactions(
     days: int = DEFAULT_ANOMALY_DAYS,
     threshold: float = DEFAULT_Z_SCORE_THRESHOLD,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Detect unusual transactions using statistical anomaly detection.
@@ -106,17 +124,25 @@ async def get_anomalous_transactions(
     - days: Number of days to analyze (1-365, default: 90)
     - threshold: Z-score threshold for anomalies (1.0-5.0, default: 2.0)
     """
+    from app.services.ml_predictor import detect_anomalies
+    
     # Validate parameters
     params = AnomalyParams(days=days, threshold=threshold)
     
-    try:
-        anomalies = detect_anomalies(db, current_user.id, params.days, params.threshold)
+    async def compute():
+        anomalies = await run_coalesced(db, detect_anomalies, current_user.id, params.days, params.threshold)
         return {
             "anomalies": anomalies,
             "total_found": len(anomalies),
             "analysis_period_days": params.days,
             "threshold": params.threshold
         }
+    
+    try:
+        return await cached_response(
+            db, "predictions.anomalies", current_user.id, compute,
+            params=(params.days, params.threshold)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Anomaly detection failed: {str(e)}")
 
@@ -124,7 +150,7 @@ async def get_anomalous_transactions(
 @router.get("/insights")
 async def get_all_insights(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get comprehensive spending insights including:
@@ -132,7 +158,27 @@ async def get_all_insights(
     - Budget alerts
     - Anomalous transactions
     """
+    from app.services.ml_predictor import (
+        build_insights,
+        calculate_current_month_savings,
+        detect_anomalies,
+        get_budget_alerts,
+        predict_next_month_spending
+    )
+    
+    # Coalesced part by part, so they are shared with /spending, /budget-alerts and /anomalies
+    async def compute():
+        return build_insights(
+            await run_coalesced(db, predict_next_month_spending, current_user.id),
+            await run_coalesced(db, get_budget_alerts, current_user.id),
+            await run_coalesced(
+                db, detect_anomalies, current_user.id,
+                DEFAULT_ANOMALY_DAYS, DEFAULT_Z_SCORE_THRESHOLD
+            ),
+            await run_coalesced(db, calculate_current_month_savings, current_user.id)
+        )
+    
     try:
-        return get_spending_insights(db, current_user.id)
+        return await cached_response(db, "predictions.insights", current_user.id, compute)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Insights generation failed: {str(e)}")
@@ -1,92 +1,189 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, and_, func, case, select, insert, update, delete
+from sqlalchemy.exc import SQLAlchemyError
 from uuid import UUID
-from typing import Optional
+from typing import Optional, Literal
 from datetime import date
+from collections import defaultdict
 import csv
 import io
+import logging
+import uuid
 
-from app.database import get_db
+from app.database import get_async_db
+from app.responses import ORJSONResponse
 from app.models.user import User
 from app.models.transaction import Transaction, TRANSACTION_CATEGORIES
+from app.models.archive import ArchivedTransaction, ArchiveState
 from app.schemas.transaction import (
     TransactionCreate,
     TransactionUpdate,
     TransactionResponse,
     TransactionListResponse,
+    TransactionFilters,
+    TransactionBulkRequest,
+    TransactionBulkResponse,
+    BulkItemResult,
     CSVImportResponse
 )
+from app.services.archive import newest_first, reads_archive
 from app.services.auth import get_current_user
-from app.services.ml_categorizer import predict_category_ml, get_model_stats, retrain_model
+from app.services.data_versions import mark_user_data_changed
+from app.services.transaction_changes import (
+    SNAPSHOT_FIELDS,
+    TransactionChange,
+    record_changes,
+    snapshot_from_values
+)
+from app.services.export import (
+    EXPORT_FIELDS,
+    EXPORT_FORMATS,
+    build_export_query,
+    parquet_available,
+    stream_transactions
+)
 
 router = APIRouter(prefix="/transactions", tags=["Transactions"])
 
+logger = logging.getLogger(__name__)
+
+# Columns that can be requested through `fields=` on the list endpoint
+LIST_FIELDS = {name: getattr(Transaction, name) for name in TransactionResponse.model_fields}
+
+
+def parse_list_fields(fields: Optional[str]) -> list:
+    """Resolve a comma-separated `fields=` value to columns; id is always included."""
+    if not fields:
+        return list(LIST_FIELDS.values())
+    
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in LIST_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(LIST_FIELDS)}"
+        )
+    
+    if "id" not in names:
+        names.insert(0, "id")
+    return [LIST_FIELDS[name] for name in dict.fromkeys(names)]
+
+
+def apply_transaction_filters(query, filters: TransactionFilters, model=Transaction):
+    """
+    Apply the shared list/export filter set.
+    Works on any select (or legacy Query), since both expose .filter().
+    `model` is Transaction or ArchivedTransaction, which share these columns.
+    """
+    if filters.start_date:
+        query = query.filter(model.date >= filters.start_date)
+    if filters.end_date:
+        query = query.filter(model.date <= filters.end_date)
+    if filters.category:
+        query = query.filter(model.category == filters.category)
+    if filters.is_income is not None:
+        query = query.filter(model.is_income == filters.is_income)
+    if filters.min_amount:
+        query = query.filter(model.amount >= filters.min_amount)
+    if filters.max_amount:
+        query = query.filter(model.amount <= filters.max_amount)
+    if filters.search:
+        search_term = f"%{filters.search}%"
+        query = query.filter(
+            or_(
+                model.description.ilike(search_term),
+                model.merchant.ilike(search_term)
+            )
+        )
+    return query
+
 
 @router.get("", response_model=TransactionListResponse)
 async def list_transactions(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
-    category: Optional[str] = None,
-    is_income: Optional[bool] = None,
-    min_amount: Optional[int] = None,
-    max_amount: Optional[int] = None,
-    search: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,date,amount"),
+    filters: TransactionFilters = Depends(),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List transactions with filtering and pagination.
     
     - Filters: date range, category, income/expense, amount range, search
     - Search looks in description and merchant fields
+    - fields: only load and return these columns (id is always included)
     """
-    query = db.query(Transaction).filter(Transaction.user_id == current_user.id)
-    
-    # Apply filters
-    if start_date:
-        query = query.filter(Transaction.date >= start_date)
-    if end_date:
-        query = query.filter(Transaction.date <= end_date)
-    if category:
-        query = query.filter(Transaction.category == category)
-    if is_income is not None:
-        query = query.filter(Transaction.is_income == is_income)
-    if min_amount:
-        query = query.filter(Transaction.amount >= min_amount)
-    if max_amount:
-        query = query.filter(Transaction.amount <= max_amount)
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                Transaction.description.ilike(search_term),
-                Transaction.merchant.ilike(search_term)
-            )
-        )
+    names = [column.key for column in parse_list_fields(fields)]
+    
+    # Column-only query: rows come back as plain tuples, no ORM objects to hydrate
+    def build(model):
+        query = select(*(getattr(model, name) for name in names)).where(model.user_id == current_user.id)
+        return apply_transaction_filters(query, filters, model)
+    
+    # Archived history is only read when the date range reaches it
+    archive = await db.get(ArchiveState, current_user.id)
+    query = newest_first(build, names, reads_archive(archive, filters.start_date))
     
     # Get total count
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
     
-    # Apply pagination and ordering
-    transactions = (
+    # Apply pagination
+    rows = (await db.execute(
         query
-        .order_by(Transaction.date.desc(), Transaction.created_at.desc())
         .offset((page - 1) * page_size)
         .limit(page_size)
-        .all()
-    )
+    )).all()
     
     total_pages = (total + page_size - 1) // page_size
     
-    return TransactionListResponse(
-        transactions=transactions,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
+    # Rows are built straight into dicts and encoded by orjson, skipping
+    # per-row model validation (the response_model still documents the shape)
+    return ORJSONResponse({
+        "transactions": [dict(row._mapping) for row in rows],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages
+    })
+
+
+@router.get("/export")
+async def export_transactions(
+    format: Literal["csv", "ndjson", "parquet"] = "csv",
+    filters: TransactionFilters = Depends(),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stream the full (filtered) transaction history as a file download.
+    
+    - Accepts the same filters as the list endpoint
+    - csv matches the import layout (amount in rupees), ndjson/parquet use paise
+    - Rows are streamed in batches, so large histories don't need pagination
+    """
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parquet export is not available (pyarrow is not installed)"
+        )
+    
+    archive = await db.get(ArchiveState, current_user.id)
+    query = newest_first(
+        lambda model: apply_transaction_filters(build_export_query(current_user.id, model), filters, model),
+        EXPORT_FIELDS,
+        reads_archive(archive, filters.start_date)
+    )
+    media_type, extension = EXPORT_FORMATS[format]
+    
+    return StreamingResponse(
+        stream_transactions(query, format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="transactions.{extension}"'
+        }
     )
 
 
@@ -95,17 +192,21 @@ async def suggest_transaction_category(
     description: str,
     merchant: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get ML-based category suggestions for a transaction.
     Uses Naive Bayes classifier with TF-IDF trained on user's history.
     """
-    predictions = predict_category_ml(
-        description=description,
-        merchant=merchant,
-        db=db,
-        user_id=current_user.id
+    from app.services.ml_categorizer import predict_category_ml  # Loaded on first use
+    
+    predictions = await db.run_sync(
+        lambda session: predict_category_ml(
+            description=description,
+            merchant=merchant,
+            db=session,
+            user_id=current_user.id
+        )
     )
     
     return {
@@ -117,25 +218,29 @@ async def suggest_transaction_category(
 @router.get("/ml-stats")
 async def get_ml_model_stats(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get statistics about the ML model.
     Shows training status, number of transactions, vocabulary size, etc.
     """
-    return get_model_stats(db, current_user.id)
+    from app.services.ml_categorizer import get_model_stats
+    
+    return await db.run_sync(get_model_stats, current_user.id)
 
 
 @router.post("/retrain-model")
 async def retrain_ml_model(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Force retrain the ML model with latest transaction data.
     Useful after importing new transactions or correcting categories.
     """
-    success = retrain_model(db, current_user.id)
+    from app.services.ml_categorizer import retrain_model
+    
+    success = await db.run_sync(retrain_model, current_user.id)
     return {
         "success": success,
         "message": "Model retrained successfully" if success else "Not enough data to train"
@@ -146,7 +251,7 @@ async def retrain_ml_model(
 async def create_transaction(
     transaction_data: TransactionCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new transaction."""
     transaction = Transaction(
@@ -154,22 +259,169 @@ async def create_transaction(
         **transaction_data.model_dump()
     )
     db.add(transaction)
-    db.commit()
-    db.refresh(transaction)
+    await db.commit()
+    await db.refresh(transaction)
     return transaction
 
 
+async def _archived_ids(db: AsyncSession, user_id: UUID, ids) -> set:
+    """Which of `ids` are the user's archived (read-only) transactions."""
+    if not ids:
+        return set()
+    return set(await db.scalars(
+        select(ArchivedTransaction.id).where(
+            ArchivedTransaction.user_id == user_id,
+            ArchivedTransaction.id.in_(ids)
+        )
+    ))
+
+
+def _archived_conflict() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Transaction is archived and read-only"
+    )
+
+
+@router.post("/bulk", response_model=TransactionBulkResponse)
+async def bulk_transactions(
+    request: TransactionBulkRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Apply batched create/update/delete operations in a single transaction.
+    
+    - Creates are inserted with one multi-row INSERT
+    - Updates with identical changes share one UPDATE (e.g. recategorizing many rows)
+    - Deletes are a single DELETE
+    - Unknown ids are reported as not_found, archived (read-only) ones as archived;
+      everything else rolls back together on error
+    """
+    results = []
+    
+    # One lookup for every id referenced by updates and deletes; the current
+    # values also describe the change to write-time consumers (spend counters)
+    referenced_ids = [item.id for item in request.update] + list(request.delete)
+    existing = {}
+    if referenced_ids:
+        existing = {
+            row.id: snapshot_from_values(row) for row in await db.execute(
+                select(*(getattr(Transaction, field) for field in SNAPSHOT_FIELDS)).where(
+                    Transaction.user_id == current_user.id,
+                    Transaction.id.in_(referenced_ids)
+                )
+            )
+        }
+    owned_ids = set(existing)
+    archived_ids = await _archived_ids(
+        db, current_user.id, [txn_id for txn_id in referenced_ids if txn_id not in owned_ids]
+    )
+    changes = []
+    
+    try:
+        # Creates
+        if request.create:
+            rows = []
+            for index, item in enumerate(request.create):
+                transaction_id = uuid.uuid4()
+                rows.append({"id": transaction_id, "user_id": current_user.id, **item.model_dump()})
+                changes.append(TransactionChange(None, snapshot_from_values(rows[-1])))
+                results.append(BulkItemResult(op="create", index=index, id=transaction_id, status="created"))
+            await db.execute(insert(Transaction), rows)
+        
+        # Updates, grouped by identical change sets
+        update_groups = defaultdict(list)
+        for index, item in enumerate(request.update):
+            if item.id not in owned_ids:
+                status_value = "archived" if item.id in archived_ids else "not_found"
+                results.append(BulkItemResult(op="update", index=index, id=item.id, status=status_value))
+                continue
+            
+            values = item.model_dump(exclude_unset=True, exclude={"id"})
+            if values:
+                update_groups[tuple(sorted(values.items()))].append(item.id)
+                old_snapshot = existing[item.id]
+                changes.append(TransactionChange(old_snapshot, old_snapshot._replace(**{
+                    key: value for key, value in values.items() if key in SNAPSHOT_FIELDS
+                })))
+            results.append(BulkItemResult(op="update", index=index, id=item.id, status="updated"))
+        
+        for change_set, ids in update_groups.items():
+            values = dict(change_set)
+            # Same rule as the single update: only a real category change counts as an override
+            if 'category' in values:
+                values['is_category_overridden'] = case(
+                    (Transaction.category != values['category'], True),
+                    else_=Transaction.is_category_overridden
+                )
+            await db.execute(
+                update(Transaction)
+                .where(Transaction.user_id == current_user.id, Transaction.id.in_(ids))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        
+        # Deletes
+        delete_ids = [txn_id for txn_id in request.delete if txn_id in owned_ids]
+        changes.extend(TransactionChange(existing[txn_id], None) for txn_id in delete_ids)
+        for index, txn_id in enumerate(request.delete):
+            if txn_id in owned_ids:
+                status_value = "deleted"
+            else:
+                status_value = "archived" if txn_id in archived_ids else "not_found"
+            results.append(BulkItemResult(op="delete", index=index, id=txn_id, status=status_value))
+        
+        if delete_ids:
+            await db.execute(
+                delete(Transaction)
+                .where(Transaction.user_id == current_user.id, Transaction.id.in_(delete_ids))
+                .execution_options(synchronize_session=False)
+            )
+        
+        # Core statements bypass the flush hooks, so report them explicitly
+        mark_user_data_changed(db.sync_session, current_user.id)
+        record_changes(db.sync_session, changes)
+        await db.commit()
+    except SQLAlchemyError:
+        await db.rollback()
+        logger.exception("Bulk transaction request failed for user %s", current_user.id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bulk request could not be applied; no changes were made"
+        )
+    
+    return TransactionBulkResponse(
+        created=sum(1 for r in results if r.status == "created"),
+        updated=sum(1 for r in results if r.status == "updated"),
+        deleted=sum(1 for r in results if r.status == "deleted"),
+        not_found=sum(1 for r in results if r.status == "not_found"),
+        archived=sum(1 for r in results if r.status == "archived"),
+        results=results
+    )
+
+
 @router.get("/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction(
     transaction_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get a single transaction by ID."""
-    transaction = db.query(Transaction).filter(
-        Transaction.id == transaction_id,
-        Transaction.user_id == current_user.id
-    ).first()
+    """Get a single transaction by ID, including archived ones."""
+    transaction = await db.scalar(
+        select(Transaction).where(
+            Transaction.id == transaction_id,
+            Transaction.user_id == current_user.id
+        )
+    )
+    
+    if not transaction:
+        transaction = await db.scalar(
+            select(ArchivedTransaction).where(
+                ArchivedTransaction.id == transaction_id,
+                ArchivedTransaction.user_id == current_user.id
+            )
+        )
     
     if not transaction:
         raise HTTPException(
@@ -185,15 +437,19 @@ async def update_transaction(
     transaction_id: UUID,
     update_data: TransactionUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Update a transaction."""
-    transaction = db.query(Transaction).filter(
-        Transaction.id == transaction_id,
-        Transaction.user_id == current_user.id
-    ).first()
+    """Update a transaction. Archived transactions are read-only (409)."""
+    transaction = await db.scalar(
+        select(Transaction).where(
+            Transaction.id == transaction_id,
+            Transaction.user_id == current_user.id
+        )
+    )
     
     if not transaction:
+        if await _archived_ids(db, current_user.id, [transaction_id]):
+            raise _archived_conflict()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaction not found"
@@ -209,8 +465,8 @@ async def update_transaction(
     for field, value in update_dict.items():
         setattr(transaction, field, value)
     
-    db.commit()
-    db.refresh(transaction)
+    await db.commit()
+    await db.refresh(transaction)
     return transaction
 
 
@@ -218,29 +474,33 @@ async def update_transaction(
 async def delete_transaction(
     transaction_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Delete a transaction."""
-    transaction = db.query(Transaction).filter(
-        Transaction.id == transaction_id,
-        Transaction.user_id == current_user.id
-    ).first()
+    """Delete a transaction. Archived transactions are read-only (409)."""
+    transaction = await db.scalar(
+        select(Transaction).where(
+            Transaction.id == transaction_id,
+            Transaction.user_id == current_user.id
+        )
+    )
     
     if not transaction:
+        if await _archived_ids(db, current_user.id, [transaction_id]):
+            raise _archived_conflict()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaction not found"
         )
     
-    db.delete(transaction)
-    db.commit()
+    await db.delete(transaction)
+    await db.commit()
 
 
 @router.post("/import", response_model=CSVImportResponse)
 async def import_transactions(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Import transactions from a CSV file.
@@ -340,9 +600,9 @@ async def import_transactions(
             skipped += 1
     
     try:
-        db.commit()
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Database error: {str(e)}"
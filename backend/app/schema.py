@@ -0,0 +1,108 @@
+"""
+Schema revision management.
+Tables are created and changed only by Alembic migrations, applied with
+`python -m scripts.migrate`. The API and the maintenance scripts just
+check that the database is at the revision this code was written for,
+which is two small queries instead of create_all's per-table reflection.
+The head revision is read from the migration files' revision identifiers
+without importing Alembic, which only the migrate command loads.
+"""
+from typing import Dict, Optional, Tuple
+from pathlib import Path
+import ast
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.database import engine as default_engine
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+VERSIONS_DIR = ALEMBIC_INI.parent / "migrations" / "versions"
+
+# Revision matching the schema create_all produced before migrations existed
+# (users, transactions, budgets); later tables come from later revisions
+BASELINE_REVISION = "0001"
+
+_head: Optional[str] = None
+
+
+def alembic_config():
+    from alembic.config import Config
+
+    return Config(str(ALEMBIC_INI))
+
+
+def _revision_ids(path: Path) -> Dict[str, object]:
+    """The module-level `revision` and `down_revision` literals of a migration file."""
+    ids = {}
+    for node in ast.parse(path.read_text()).body:
+        if isinstance(node, ast.AnnAssign):
+            targets, value = [node.target], node.value
+        elif isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        else:
+            continue
+        for target in targets:
+            if isinstance(target, ast.Name) and target.id in ("revision", "down_revision"):
+                ids[target.id] = ast.literal_eval(value)
+    return ids
+
+
+def _parents(down_revision) -> Tuple[str, ...]:
+    if down_revision is None:
+        return ()
+    if isinstance(down_revision, str):
+        return (down_revision,)
+    return tuple(down_revision)  # Merge revision
+
+
+def head_revision() -> str:
+    """Latest revision in migrations/versions (cached for the process)."""
+    global _head
+    if _head is None:
+        revisions = [_revision_ids(path) for path in sorted(VERSIONS_DIR.glob("*.py"))]
+        revisions = [ids for ids in revisions if "revision" in ids]
+        parents = {parent for ids in revisions for parent in _parents(ids.get("down_revision"))}
+        heads = [ids["revision"] for ids in revisions if ids["revision"] not in parents]
+        if len(heads) != 1:
+            raise RuntimeError(f"Expected one head revision in {VERSIONS_DIR}, found {heads or 'none'}")
+        _head = heads[0]
+    return _head
+
+
+def current_revision(connection: Connection) -> Optional[str]:
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def verify_schema(engine: Engine = default_engine):
+    """Raise RuntimeError unless the database is at the head revision."""
+    expected = head_revision()
+    with engine.connect() as connection:
+        current = current_revision(connection)
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema is at revision {current or '(none)'}, this code needs {expected}. "
+            "Run `python -m scripts.migrate` first."
+        )
+
+
+def migrate(revision: str = "head", engine: Engine = default_engine) -> Optional[str]:
+    """
+    Upgrade to `revision`. A database created by create_all (tables but no
+    alembic_version) is stamped at the baseline first. Returns the revision
+    the database was at before.
+    """
+    from alembic import command
+
+    config = alembic_config()
+    with engine.connect() as connection:
+        before = current_revision(connection)
+        legacy = before is None and inspect(connection).has_table("users")
+
+    if legacy:
+        command.stamp(config, BASELINE_REVISION)
+        before = BASELINE_REVISION
+    command.upgrade(config, revision)
+    return before
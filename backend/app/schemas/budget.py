@@ -65,3 +65,16 @@ class BudgetStatusResponse(BaseModel):
     budgets: List[BudgetStatusItem]
     total_budgeted: int
     total_spent: int
+
+
+class BudgetAlertEventResponse(BaseModel):
+    """A budget threshold crossed by a transaction write."""
+    id: UUID
+    category: str
+    month: date
+    threshold: int
+    alert_level: str
+    message: str
+    spent: float  # In rupees, like the predictions alerts
+    limit: float
+    created_at: datetime
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from datetime import datetime, date
 from uuid import UUID
 from typing import Optional, List, Literal
@@ -37,6 +37,14 @@ class TransactionUpdate(BaseModel):
     category: Optional[str] = None
     is_income: Optional[bool] = None
     
+    @field_validator('date', 'amount', 'description', 'category', 'is_income')
+    @classmethod
+    def reject_null(cls, v, info):
+        # Omit a field to leave it unchanged; only merchant can be cleared with null
+        if v is None:
+            raise ValueError(f"{info.field_name} cannot be null")
+        return v
+    
     @field_validator('category')
     @classmethod
     def validate_category(cls, v):
@@ -83,3 +91,50 @@ class CSVImportResponse(BaseModel):
     imported: int
     skipped: int
     errors: List[str]
+
+
+# Upper bound on create + update + delete items in one bulk request
+MAX_BULK_OPERATIONS = 500
+
+
+class TransactionBulkUpdateItem(TransactionUpdate):
+    """A single update inside a bulk request."""
+    id: UUID
+
+
+class TransactionBulkRequest(BaseModel):
+    """Batched create/update/delete operations applied in one database transaction."""
+    create: List[TransactionCreate] = []
+    update: List[TransactionBulkUpdateItem] = []
+    delete: List[UUID] = []
+    
+    @model_validator(mode='after')
+    def validate_operations(self):
+        total = len(self.create) + len(self.update) + len(self.delete)
+        if total == 0:
+            raise ValueError("At least one operation is required")
+        if total > MAX_BULK_OPERATIONS:
+            raise ValueError(f"At most {MAX_BULK_OPERATIONS} operations are allowed per request")
+        
+        ids = [item.id for item in self.update] + list(self.delete)
+        if len(ids) != len(set(ids)):
+            raise ValueError("Each transaction id may appear only once per request")
+        return self
+
+
+class BulkItemResult(BaseModel):
+    """Outcome of one operation in a bulk request."""
+    op: Literal["create", "update", "delete"]
+    index: int
+    id: Optional[UUID] = None
+    status: Literal["created", "updated", "deleted", "not_found", "archived"]
+
+
+class TransactionBulkResponse(BaseModel):
+    """Response for bulk mutations."""
+    created: int
+    updated: int
+    deleted: int
+    not_found: int
+    archived: int  # Archived transactions are read-only
+    results: List[BulkItemResult]
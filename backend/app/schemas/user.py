@@ -36,11 +36,17 @@ class Token(BaseModel):
     token_type: str = "bearer"
 
 
+class StreamTicket(BaseModel):
+    """Short-lived ticket for opening the event stream."""
+    ticket: str
+    expires_in: int  # Seconds
+
+
 class TokenPayload(BaseModel):
     """JWT token payload."""
     sub: str  # User ID
     exp: datetime
-    type: str  # "access" or "refresh"
+    type: str  # "access", "refresh" or "stream"
 
 
 class RefreshTokenRequest(BaseModel):
@@ -0,0 +1,113 @@
+"""
+Hot/cold tiering of transaction history.
+archive_user() moves a user's transactions dated before the archive cutoff
+into transactions_archive, keeping the hot table and its indexes small.
+Before moving anything it closes the affected months (MonthSummary) and
+makes sure the user has a ledger row, so rollups and the balance are
+unchanged. ArchiveState records the watermark: list, search and export
+union the archive in only when their date range starts before it.
+Archived rows are read-only; new writes always go to the hot table.
+"""
+from typing import Callable, List, Optional, Sequence
+from datetime import date, datetime
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import insert_ignoring_conflict
+from app.models.archive import ArchivedTransaction, ArchiveState
+from app.models.ledger import UserBalance
+from app.models.transaction import Transaction
+from app.services.data_versions import mark_user_data_changed
+from app.services.ledger import LEDGER_FIELDS, aggregate_balances
+from app.services.month_summaries import close_months
+
+settings = get_settings()
+
+ARCHIVE_COLUMNS = [column.name for column in ArchivedTransaction.__table__.columns]
+
+
+def archive_cutoff(today: Optional[date] = None) -> Optional[date]:
+    """First day of the oldest month kept hot; None when archiving is disabled."""
+    if settings.archive_after_months <= 0:
+        return None
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - settings.archive_after_months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def archivable_users(session: Session, cutoff: date, user_ids: Optional[Sequence[UUID]] = None) -> List[UUID]:
+    query = select(Transaction.user_id).where(Transaction.date < cutoff).distinct()
+    if user_ids is not None:
+        query = query.where(Transaction.user_id.in_(user_ids))
+    return list(session.scalars(query))
+
+
+def archive_user(session: Session, user_id: UUID, cutoff: date) -> int:
+    """Move the user's transactions dated before `cutoff`; returns rows moved."""
+    close_months(session, [user_id])
+
+    if session.get(UserBalance, user_id) is None:
+        row = session.execute(aggregate_balances([user_id])).first()
+        if row is not None:
+            insert_ignoring_conflict(session, UserBalance, {
+                "user_id": user_id, **{field: getattr(row, field) for field in LEDGER_FIELDS}
+            })
+
+    old = (Transaction.user_id == user_id, Transaction.date < cutoff)
+    expenses = session.execute(
+        select(Transaction.category, func.sum(Transaction.amount))
+        .where(*old, Transaction.is_income == False)
+        .group_by(Transaction.category)
+    ).all()
+
+    moved = session.execute(
+        insert(ArchivedTransaction).from_select(
+            ARCHIVE_COLUMNS,
+            select(*(Transaction.__table__.c[name] for name in ARCHIVE_COLUMNS)).where(*old)
+        )
+    ).rowcount
+    if not moved:
+        return 0
+    session.execute(delete(Transaction).where(*old).execution_options(synchronize_session=False))
+
+    state = session.get(ArchiveState, user_id)
+    if state is None:
+        state = ArchiveState(user_id=user_id, archived_before=cutoff, transaction_count=0, expense_by_category={})
+        session.add(state)
+    totals = dict(state.expense_by_category or {})
+    for category, amount in expenses:
+        totals[category] = totals.get(category, 0) + int(amount)
+    state.expense_by_category = totals
+    state.archived_before = max(state.archived_before, cutoff)
+    state.transaction_count += moved
+    state.archived_at = datetime.utcnow()
+
+    mark_user_data_changed(session, user_id)
+    return moved
+
+
+def reads_archive(state: Optional[ArchiveState], start_date: Optional[date]) -> bool:
+    """Whether a read starting at `start_date` (None: all time) can reach archived rows."""
+    return state is not None and (start_date is None or start_date < state.archived_before)
+
+
+def newest_first(build: Callable, names: List[str], include_archive: bool):
+    """
+    Rows from build(model), which selects `names` from one table, ordered
+    newest first. With include_archive the hot and archived selects are
+    combined with UNION ALL, so filters and pagination apply to both.
+    """
+    if not include_archive:
+        return build(Transaction).order_by(Transaction.date.desc(), Transaction.created_at.desc())
+
+    combined = union_all(*(
+        build(model).add_columns(model.date.label("sort_date"), model.created_at.label("sort_created"))
+        for model in (Transaction, ArchivedTransaction)
+    )).subquery()
+    return (
+        select(*(combined.c[name] for name in names))
+        .order_by(combined.c.sort_date.desc(), combined.c.sort_created.desc())
+    )
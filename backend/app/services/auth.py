@@ -1,25 +1,42 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from jose import JWTError, jwt
-import bcrypt
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from app.config import get_settings
-from app.database import get_db
+from app.database import get_async_db, AsyncSessionLocal
 from app.models.user import User
+from app.services.cache import TTLCache, TTLSet
 
 settings = get_settings()
 
 # JWT bearer scheme
 security = HTTPBearer()
 
+# Decoded access-token claims keyed by token, and active-user column snapshots
+# keyed by user id. Both skip work that get_current_user repeats on every call.
+_token_cache = TTLCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
+_user_cache = TTLCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
+
+# Ids of redeemed stream tickets, kept at least until the tickets expire;
+# not size-bounded, so a replay can't outlive its entry
+_redeemed_tickets = TTLSet(settings.event_ticket_expire_seconds)
+
+
+# jose (with its crypto backends) and bcrypt are imported on first use rather
+# than at worker boot; see app/services/startup.py for preloading them
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
+    import bcrypt
+    
     return bcrypt.checkpw(
         plain_password.encode('utf-8'), 
         hashed_password.encode('utf-8')
@@ -28,12 +45,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     """Generate password hash."""
+    import bcrypt
+    
     salt = bcrypt.gensalt()
     return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
 
 
 def create_access_token(user_id: UUID) -> str:
     """Create JWT access token."""
+    from jose import jwt
+    
     expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
     to_encode = {
         "sub": str(user_id),
@@ -45,6 +66,8 @@ def create_access_token(user_id: UUID) -> str:
 
 def create_refresh_token(user_id: UUID) -> str:
     """Create JWT refresh token."""
+    from jose import jwt
+    
     expire = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
     to_encode = {
         "sub": str(user_id),
@@ -54,8 +77,28 @@ def create_refresh_token(user_id: UUID) -> str:
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
+def create_stream_ticket(user_id: UUID) -> str:
+    """
+    Create a single-use JWT that opens the event stream.
+    EventSource can't send headers, so the stream is authenticated by a
+    ticket in its URL; this keeps access tokens out of URLs and logs.
+    """
+    from jose import jwt
+    
+    expire = datetime.utcnow() + timedelta(seconds=settings.event_ticket_expire_seconds)
+    to_encode = {
+        "sub": str(user_id),
+        "exp": expire,
+        "type": "stream",
+        "jti": uuid4().hex
+    }
+    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+
+
 def decode_token(token: str) -> Optional[dict]:
     """Decode and validate a JWT token."""
+    from jose import JWTError, jwt
+    
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         return payload
@@ -63,9 +106,75 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
+def invalidate_cached_user(user_id: UUID):
+    """Drop a user's cached record so the next request reloads it."""
+    _user_cache.delete(user_id)
+
+
+def get_auth_cache_stats() -> dict:
+    """Hit/miss counters for the token and user caches."""
+    return {
+        "enabled": settings.auth_cache_enabled,
+        "tokens": _token_cache.stats(),
+        "users": _user_cache.stats()
+    }
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_user_change(mapper, connection, target):
+    """Deactivation or a password change must not be served from the cache."""
+    state = inspect(target)
+    if (state.attrs.is_active.history.has_changes()
+            or state.attrs.password_hash.history.has_changes()):
+        invalidate_cached_user(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_delete(mapper, connection, target):
+    invalidate_cached_user(target.id)
+
+
+def _decode_access_token(token: str) -> Optional[dict]:
+    """decode_token with caching of valid claims until the token expires."""
+    if not settings.auth_cache_enabled:
+        return decode_token(token)
+    
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return payload
+    
+    payload = decode_token(token)
+    if payload is not None and payload.get("exp"):
+        ttl = min(settings.auth_cache_ttl_seconds, payload["exp"] - time.time())
+        _token_cache.set(token, payload, ttl)
+    return payload
+
+
+async def _load_user(db: AsyncSession, user_uuid: UUID) -> Optional[User]:
+    """
+    Load the user, serving active users from the cache.
+    A cache hit is attached to the session without emitting SQL.
+    """
+    if not settings.auth_cache_enabled:
+        return await db.get(User, user_uuid)
+    
+    snapshot = _user_cache.get(user_uuid)
+    if snapshot is not None:
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+    
+    user = await db.get(User, user_uuid)
+    if user is not None and user.is_active:
+        _user_cache.set(user_uuid, {
+            column.key: getattr(user, column.key) for column in User.__mapper__.column_attrs
+        })
+    return user
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     Dependency that validates JWT and returns the current user.
@@ -78,7 +187,7 @@ async def get_current_user(
     )
     
     token = credentials.credentials
-    payload = decode_token(token)
+    payload = _decode_access_token(token)
     
     if payload is None:
         raise credentials_exception
@@ -95,7 +204,7 @@ async def get_current_user(
     except ValueError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_uuid).first()
+    user = await _load_user(db, user_uuid)
     
     if user is None:
         raise credentials_exception
@@ -107,3 +216,66 @@ async def get_current_user(
         )
     
     return user
+
+
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Dependency for /admin endpoints.
+    Admins are the accounts listed in the ADMIN_EMAILS setting.
+    """
+    if current_user.email.lower() not in settings.admin_email_list:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+
+async def _load_active_user(user_id) -> Optional[User]:
+    """The active user for a token's subject, on a session released before returning."""
+    try:
+        user_uuid = UUID(user_id)
+    except (ValueError, TypeError):
+        return None
+    
+    async with AsyncSessionLocal() as db:
+        user = await _load_user(db, user_uuid)
+    
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+async def authenticate_token(token: str) -> Optional[User]:
+    """
+    Resolve an access token to its active user outside dependency injection
+    (middleware, long-lived streams). Uses the same token and user caches as
+    get_current_user and releases its session before returning.
+    """
+    payload = _decode_access_token(token)
+    if payload is None or payload.get("type") != "access":
+        return None
+    
+    return await _load_active_user(payload.get("sub"))
+
+
+async def redeem_stream_ticket(ticket: str) -> Optional[User]:
+    """
+    Resolve a stream ticket to its active user, at most once.
+    Redeemed tickets are remembered per worker, so within its short
+    lifetime a ticket could be replayed once on each other worker.
+    """
+    payload = decode_token(ticket)
+    if payload is None or payload.get("type") != "stream" or not payload.get("jti"):
+        return None
+    
+    if not _redeemed_tickets.add(payload["jti"]):
+        return None
+    
+    return await _load_active_user(payload.get("sub"))
+
+
+async def is_admin_token(token: str) -> bool:
+    """Admin check for middleware."""
+    user = await authenticate_token(token)
+    return user is not None and user.email.lower() in settings.admin_email_list
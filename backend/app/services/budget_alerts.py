@@ -0,0 +1,170 @@
+"""
+Write-time budget threshold checks.
+Transaction writes adjust a per-(user, category, month) expense counter in
+the same database transaction; when the new total crosses one of the
+BUDGET_*_THRESHOLD percentages of that month's budget, a BudgetAlertEvent
+is stored and, after commit, pushed to the user's connected clients.
+Each check is a counter update plus one budget lookup by its unique key.
+"""
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+from datetime import date, datetime
+from uuid import UUID
+import uuid
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.database import insert_ignoring_conflict
+from app.models.archive import ArchivedTransaction
+from app.models.budget import Budget
+from app.models.spend import BudgetAlertEvent, CategoryMonthSpend
+from app.models.transaction import Transaction
+from app.services import notifications
+from app.services.budget_evaluation import month_bounds
+from app.services.ml_constants import (
+    BUDGET_CAUTION_THRESHOLD,
+    BUDGET_WARNING_THRESHOLD,
+    BUDGET_CRITICAL_THRESHOLD
+)
+from app.services.transaction_changes import TransactionChange, after_commit, on_commit
+
+# Ascending; the highest threshold crossed by a write names the alert
+THRESHOLDS = [
+    (BUDGET_CAUTION_THRESHOLD, "info"),
+    (BUDGET_WARNING_THRESHOLD, "warning"),
+    (BUDGET_CRITICAL_THRESHOLD, "critical"),
+]
+
+
+def spend_deltas(changes: List[TransactionChange]) -> Dict[Tuple[UUID, str, date], int]:
+    """Net expense change per (user, category, month)."""
+    deltas = defaultdict(int)
+    for change in changes:
+        for snapshot, sign in ((change.old, -1), (change.new, 1)):
+            if snapshot is not None and not snapshot.is_income:
+                key = (snapshot.user_id, snapshot.category, snapshot.date.replace(day=1))
+                deltas[key] += sign * snapshot.amount
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def _month_total(session: Session, user_id: UUID, category: str, month: date) -> int:
+    start, end = month_bounds(month)
+    # Archived rows count too, as in the ledger and month summaries
+    return sum(
+        session.scalar(
+            select(func.coalesce(func.sum(model.amount), 0)).where(
+                model.user_id == user_id,
+                model.category == category,
+                model.date >= start,
+                model.date < end,
+                model.is_income == False
+            )
+        )
+        for model in (Transaction, ArchivedTransaction)
+    )
+
+
+def apply_spend_delta(session: Session, user_id: UUID, category: str, month: date, delta: int) -> int:
+    """
+    Add `delta` to the counter and return the new total.
+    A missing counter is initialised from the transaction and archive
+    tables, which already include this write because the session has flushed.
+    """
+    key = (
+        CategoryMonthSpend.user_id == user_id,
+        CategoryMonthSpend.category == category,
+        CategoryMonthSpend.month == month
+    )
+    increment = (
+        update(CategoryMonthSpend)
+        .where(*key)
+        .values(amount=CategoryMonthSpend.amount + delta)
+        .returning(CategoryMonthSpend.amount)
+        .execution_options(synchronize_session=False)
+    )
+
+    total = session.scalar(increment)
+    if total is not None:
+        return total
+
+    total = _month_total(session, user_id, category, month)
+    values = {"user_id": user_id, "category": category, "month": month, "amount": total}
+    if insert_ignoring_conflict(session, CategoryMonthSpend, values):
+        return total
+    # Another transaction created it first; its total excludes our uncommitted rows
+    return session.scalar(increment)
+
+
+def crossed_threshold(old_total: int, new_total: int, monthly_limit: int) -> Optional[Tuple[int, str]]:
+    """Highest threshold that old_total was below and new_total reaches."""
+    if monthly_limit <= 0 or new_total <= old_total:
+        return None
+    old_pct = old_total / monthly_limit * 100
+    new_pct = new_total / monthly_limit * 100
+    crossed = [(threshold, level) for threshold, level in THRESHOLDS if old_pct < threshold <= new_pct]
+    return crossed[-1] if crossed else None
+
+
+@on_commit
+def _update_counters_and_check(session: Session, changes: List[TransactionChange]):
+    events = []
+    for (user_id, category, month), delta in spend_deltas(changes).items():
+        new_total = apply_spend_delta(session, user_id, category, month, delta)
+        if delta < 0:
+            continue
+
+        monthly_limit = session.scalar(
+            select(Budget.monthly_limit).where(
+                Budget.user_id == user_id,
+                Budget.category == category,
+                Budget.month == month
+            )
+        )
+        if monthly_limit is None:
+            continue
+
+        crossed = crossed_threshold(new_total - delta, new_total, monthly_limit)
+        if crossed:
+            threshold, level = crossed
+            events.append({
+                "id": uuid.uuid4(), "user_id": user_id, "category": category,
+                "month": month, "threshold": threshold, "alert_level": level,
+                "spent": new_total, "monthly_limit": monthly_limit,
+                "created_at": datetime.utcnow(),
+            })
+
+    if events:
+        session.execute(insert(BudgetAlertEvent), events)
+        session.info.setdefault("budget_alert_events", []).extend(events)
+
+
+@after_commit
+def _deliver_alerts(session: Session, changes: List[TransactionChange]):
+    for alert in session.info.pop("budget_alert_events", ()):
+        notifications.publish(alert["user_id"], "budget_alert", alert_payload(alert))
+
+
+def alert_payload(alert) -> dict:
+    """JSON-ready form of an alert event (a row or the dict inserted above)."""
+    if not isinstance(alert, dict):
+        alert = {column.key: getattr(alert, column.key) for column in BudgetAlertEvent.__table__.columns}
+    threshold = alert["threshold"]
+    spent_rupees = alert["spent"] / 100
+    limit_rupees = alert["monthly_limit"] / 100
+    if threshold >= BUDGET_CRITICAL_THRESHOLD:
+        message = f"Budget exceeded by ₹{spent_rupees - limit_rupees:.2f}"
+    else:
+        message = f"{threshold}% of budget used (₹{limit_rupees - spent_rupees:.2f} remaining)"
+    return {
+        "id": str(alert["id"]),
+        "category": alert["category"],
+        "month": alert["month"].isoformat(),
+        "threshold": threshold,
+        "alert_level": alert["alert_level"],
+        "message": message,
+        "spent": round(spent_rupees, 2),
+        "limit": round(limit_rupees, 2),
+        "created_at": alert["created_at"].isoformat()
+    }
+
@@ -0,0 +1,134 @@
+"""
+Budget evaluation shared by /budgets/status and the budget alerts.
+One query joins a month's budgets to that month's spend per category; the
+result is cached per (user, data version, month), so a committed change to
+the user's transactions or budgets in any worker retires it. Closed months that have a MonthSummary take their spend
+from it instead of the transactions table. Burn rate and projection depend
+on today's date, so they are derived on every call rather than cached.
+"""
+from typing import Dict, List, Optional, Tuple
+from datetime import date, timedelta
+from uuid import UUID
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.budget import Budget
+from app.models.summary import MonthSummary
+from app.models.transaction import Transaction
+from app.services.cache import TTLCache
+from app.services import data_versions
+
+settings = get_settings()
+
+# (user_id, data version, month) -> [(category, monthly_limit, spent)], amounts in paise
+_month_cache = TTLCache(settings.budget_cache_max_entries, settings.budget_cache_ttl_seconds)
+
+
+def month_bounds(month: date) -> Tuple[date, date]:
+    """First day of the month and first day of the next month (exclusive bound)."""
+    start = month.replace(day=1)
+    if start.month == 12:
+        return start, start.replace(year=start.year + 1, month=1)
+    return start, start.replace(month=start.month + 1)
+
+
+def get_budget_cache_stats() -> dict:
+    return _month_cache.stats()
+
+
+def _month_spend(db: Session, user_id: UUID, start: date, end: date) -> List[Tuple[str, int, int]]:
+    key = None
+    if settings.budget_cache_enabled:
+        key = (user_id, data_versions.get_data_version(db, user_id), start)
+        cached = _month_cache.get(key)
+        if cached is not None:
+            return cached
+
+    summary = db.get(MonthSummary, (user_id, start)) if end <= date.today().replace(day=1) else None
+    if summary is not None:
+        # Closed month: spend comes from its summary, limits from the budgets as they are now
+        budgets = db.execute(
+            select(Budget.category, Budget.monthly_limit)
+            .where(Budget.user_id == user_id, Budget.month == start)
+            .order_by(Budget.category)
+        ).all()
+        result = [
+            (category, limit, summary.categories.get(category, {}).get("total", 0))
+            for category, limit in budgets
+        ]
+        if key is not None:
+            _month_cache.set(key, result)
+        return result
+
+    spent = func.coalesce(func.sum(Transaction.amount), 0)
+    rows = db.execute(
+        select(Budget.category, Budget.monthly_limit, spent)
+        .select_from(Budget)
+        .outerjoin(Transaction, and_(
+            Transaction.user_id == Budget.user_id,
+            Transaction.category == Budget.category,
+            Transaction.date >= start,
+            Transaction.date < end,
+            Transaction.is_income == False
+        ))
+        .where(Budget.user_id == user_id, Budget.month == start)
+        .group_by(Budget.id, Budget.category, Budget.monthly_limit)
+        .order_by(Budget.category)
+    ).all()
+
+    result = [(category, limit, int(total)) for category, limit, total in rows]
+    if key is not None:
+        _month_cache.set(key, result)
+    return result
+
+
+def evaluate_budgets(db: Session, user_id: UUID, month: Optional[date] = None, today: Optional[date] = None) -> Dict:
+    """
+    Spend, limits, burn rate and month-end projection for each budget.
+    Amounts are in paise; percentages are unrounded.
+    """
+    today = today or date.today()
+    start, end = month_bounds(month or today)
+    days_in_month = (end - timedelta(days=1)).day
+
+    if today >= end:
+        days_elapsed = days_in_month
+    elif today < start:
+        days_elapsed = 0
+    else:
+        days_elapsed = today.day
+    days_remaining = days_in_month - days_elapsed
+
+    items = []
+    for category, monthly_limit, spent in _month_spend(db, user_id, start, end):
+        remaining = monthly_limit - spent
+        daily_rate = spent / days_elapsed if days_elapsed > 0 else 0
+        if daily_rate > 0 and remaining > 0:
+            days_until_exceeded = remaining / daily_rate
+        else:
+            days_until_exceeded = None
+
+        items.append({
+            "category": category,
+            "monthly_limit": monthly_limit,
+            "spent": spent,
+            "remaining": remaining,
+            "percentage_used": (spent / monthly_limit * 100) if monthly_limit > 0 else 0,
+            "is_over_budget": spent > monthly_limit,
+            "daily_rate": daily_rate,
+            "projected_total": daily_rate * days_in_month,
+            "days_until_exceeded": days_until_exceeded
+        })
+
+    return {
+        "month": start,
+        "days_in_month": days_in_month,
+        "days_elapsed": days_elapsed,
+        "days_remaining": days_remaining,
+        "budgets": items,
+        "total_budgeted": sum(item["monthly_limit"] for item in items),
+        "total_spent": sum(item["spent"] for item in items)
+    }
+
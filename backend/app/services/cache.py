@@ -0,0 +1,109 @@
+"""
+Small in-process caching primitives.
+TTLCache entries expire after a TTL and the least recently used entry is
+evicted once the cache is full. TTLSet members are never evicted early,
+for bookkeeping that must hold for the whole TTL. Both are per worker process.
+"""
+from typing import Any, Dict, Hashable, Optional
+from collections import OrderedDict
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Thread-safe TTL + LRU cache with hit/miss/eviction counters.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a value; ttl_seconds overrides the default TTL for this entry."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Counters since process start."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class TTLSet:
+    """
+    Thread-safe set whose members expire after a fixed TTL, never sooner.
+    Unbounded: members all share the TTL, so expired ones are pruned from
+    the oldest end on each add and the size tracks the recent add rate.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._expiry: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key: Hashable) -> bool:
+        """Add `key`; returns False if it was already a live member."""
+        now = time.monotonic()
+        with self._lock:
+            while self._expiry:
+                oldest, expires_at = next(iter(self._expiry.items()))
+                if expires_at > now:
+                    break
+                del self._expiry[oldest]
+            if key in self._expiry:
+                return False
+            self._expiry[key] = now + self.ttl_seconds
+            return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._expiry)
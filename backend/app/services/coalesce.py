@@ -0,0 +1,81 @@
+"""
+Single-flight coalescing of expensive per-user computations.
+Concurrent identical calls in one worker (same computation, user,
+arguments and data version) share one in-flight result instead of each
+running the queries: the first caller computes, the others await it.
+Nothing outlives the call, so a request arriving after it finished
+computes afresh, and a committed write bumps the user's data version
+(app/services/data_versions.py) so later callers never join a
+computation that started before it. Results are shared between requests and must not be mutated.
+"""
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services import data_versions
+
+_in_flight: Dict[Hashable, asyncio.Future] = {}
+_stats = {"computed": 0, "shared": 0, "retried": 0}
+
+
+class _LeaderCancelled(Exception):
+    """The computing request went away (client disconnect); followers compute themselves."""
+
+
+async def single_flight(
+    db: AsyncSession,
+    computation: str,
+    user_id,
+    compute: Callable[[], Awaitable[Any]],
+    params: tuple = ()
+) -> Any:
+    """Run `compute()` unless an identical call is already in flight, then share its result."""
+    # Requests routed to a replica and to the primary never share a result
+    use_replica = db.sync_session.info.get("use_replica", False)
+    version = await db.run_sync(data_versions.get_data_version, user_id)
+    key = (computation, user_id, version, params, use_replica)
+
+    future = _in_flight.get(key)
+    if future is not None:
+        try:
+            result = await asyncio.shield(future)
+        except _LeaderCancelled:
+            _stats["retried"] += 1
+            return await single_flight(db, computation, user_id, compute, params)
+        _stats["shared"] += 1
+        return result
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[key] = future
+    _stats["computed"] += 1
+    try:
+        result = await compute()
+    except asyncio.CancelledError:
+        _fail(future, _LeaderCancelled())
+        raise
+    except Exception as exc:
+        _fail(future, exc)
+        raise
+    finally:
+        del _in_flight[key]
+    future.set_result(result)
+    return result
+
+
+def _fail(future: asyncio.Future, exc: Exception):
+    future.set_exception(exc)
+    future.exception()  # Mark it retrieved, so no warning when nobody was waiting
+
+
+async def run_coalesced(db: AsyncSession, fn: Callable, user_id, *args) -> Any:
+    """`await db.run_sync(fn, user_id, *args)`, coalesced on fn and its arguments."""
+    return await single_flight(
+        db, f"{fn.__module__}.{fn.__name__}", user_id,
+        lambda: db.run_sync(fn, user_id, *args), args
+    )
+
+
+def get_coalescing_stats() -> Dict:
+    """Per-worker counters: computations run, results shared, retries after a cancelled leader."""
+    return {"in_flight": len(_in_flight), **_stats}
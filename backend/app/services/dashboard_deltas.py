@@ -0,0 +1,90 @@
+"""
+Incremental updates for /dashboard/summary, built from committed
+transaction changes. One dashboard_delta event per user and commit carries
+additive changes to every summary figure plus the changed rows, so a
+connected client can keep its view current without refetching the summary.
+"""
+from typing import Dict, List
+from collections import defaultdict
+from datetime import date, timedelta
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.services import notifications
+from app.services.budget_evaluation import month_bounds
+from app.services.transaction_changes import TransactionChange, TransactionSnapshot, after_commit
+
+# Changed rows sent per event; beyond this the client is told to refetch its list
+MAX_ROWS_PER_EVENT = 10
+
+
+def transaction_payload(snapshot: TransactionSnapshot) -> dict:
+    """Same shape as the summary's recent_transactions items."""
+    return {
+        "id": str(snapshot.id),
+        "date": snapshot.date.isoformat(),
+        "amount": snapshot.amount,
+        "description": snapshot.description,
+        "merchant": snapshot.merchant,
+        "category": snapshot.category,
+        "is_income": snapshot.is_income
+    }
+
+
+def build_delta(changes: List[TransactionChange], today: date) -> dict:
+    """Summary deltas for one user's changes (amounts in paise)."""
+    # Same windows as the summary: "this month" has no upper bound
+    this_month = today.replace(day=1)
+    previous_month, _ = month_bounds(this_month - timedelta(days=1))
+
+    delta = {
+        "balance": 0,
+        "monthly_income": 0,
+        "monthly_expenses": 0,
+        "previous_month_expenses": 0,
+        "category_breakdown": defaultdict(int),
+        "upserted": [],
+        "removed": [],
+        "truncated": False
+    }
+
+    for change in changes:
+        for snapshot, sign in ((change.old, -1), (change.new, 1)):
+            if snapshot is None:
+                continue
+            amount = sign * snapshot.amount
+            if snapshot.is_income:
+                delta["balance"] += amount
+                if snapshot.date >= this_month:
+                    delta["monthly_income"] += amount
+            else:
+                delta["balance"] -= amount
+                delta["category_breakdown"][snapshot.category] += amount
+                if snapshot.date >= this_month:
+                    delta["monthly_expenses"] += amount
+                elif previous_month <= snapshot.date < this_month:
+                    delta["previous_month_expenses"] += amount
+
+        if change.new is not None:
+            delta["upserted"].append(transaction_payload(change.new))
+        else:
+            delta["removed"].append(str(change.old.id))
+
+    delta["category_breakdown"] = {
+        category: amount for category, amount in delta["category_breakdown"].items() if amount
+    }
+    if len(delta["upserted"]) + len(delta["removed"]) > MAX_ROWS_PER_EVENT:
+        delta["upserted"], delta["removed"], delta["truncated"] = [], [], True
+    return delta
+
+
+@after_commit
+def _publish_deltas(session: Session, changes: List[TransactionChange]):
+    by_user: Dict[UUID, List[TransactionChange]] = defaultdict(list)
+    for change in changes:
+        by_user[change.user_id].append(change)
+
+    today = date.today()
+    for user_id, user_changes in by_user.items():
+        notifications.publish(user_id, "dashboard_delta", build_delta(user_changes, today))
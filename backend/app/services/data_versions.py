@@ -0,0 +1,75 @@
+"""
+Per-user data versions.
+A counter in user_data_versions is bumped in the same database transaction
+as every write to a user's transactions or budgets. Cached results (budget
+months, single-flight keys, cached responses) are keyed on it, so a write committed by any
+worker or script invalidates them in every worker, and a read that raced a
+write is cached under the old version, which no later read asks for.
+"""
+from itertools import chain
+from uuid import UUID
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from app.database import insert_ignoring_conflict
+from app.models.budget import Budget
+from app.models.ledger import UserDataVersion
+from app.models.transaction import Transaction
+
+
+def mark_user_data_changed(session: Session, user_id: UUID):
+    """
+    Bump the user's data version when `session` commits.
+    Needed for Core insert/update/delete statements, which the flush
+    hook below doesn't see.
+    """
+    session.info.setdefault("data_changed_users", set()).add(user_id)
+
+
+def get_data_version(session: Session, user_id: UUID) -> int:
+    """The user's current version, read once per session transaction."""
+    versions = session.info.setdefault("data_versions", {})
+    if user_id not in versions:
+        versions[user_id] = session.execute(
+            select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)
+        ).scalar() or 0
+    return versions[user_id]
+
+
+def bump_data_version(session: Session, user_id: UUID):
+    increment = (
+        update(UserDataVersion)
+        .where(UserDataVersion.user_id == user_id)
+        .values(version=UserDataVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if session.execute(increment).rowcount:
+        return
+    if not insert_ignoring_conflict(session, UserDataVersion, {"user_id": user_id, "version": 1}):
+        session.execute(increment)  # Another transaction created the row first
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (Transaction, Budget)) and obj.user_id is not None:
+            mark_user_data_changed(session, obj.user_id)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_on_commit(session):
+    session.flush()  # Pending ORM writes report their users now
+    for user_id in session.info.pop("data_changed_users", ()):
+        bump_data_version(session, user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_versions(session):
+    session.info.pop("data_versions", None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    for key in ("data_changed_users", "data_versions"):
+        session.info.pop(key, None)
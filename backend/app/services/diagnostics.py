@@ -0,0 +1,181 @@
+"""
+Opt-in query diagnostics (DIAGNOSTICS_ENABLED=true).
+Records statements slower than a threshold, with parameter shapes, the
+originating route and the EXPLAIN plan on PostgreSQL, and flags handlers
+that repeat the same statement shape within one request (N+1 patterns).
+Findings are kept in a bounded in-memory buffer per worker process.
+"""
+from typing import Dict, List, Optional
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import os
+import re
+import threading
+import time
+
+from app.config import get_settings
+
+settings = get_settings()
+
+_findings: deque = deque(maxlen=settings.diagnostics_max_findings)
+_findings_lock = threading.Lock()
+
+
+class RequestQueries:
+    """Statements seen during one request, grouped by shape."""
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.shapes = Counter()
+        self.statements: Dict[str, set] = {}
+
+    @property
+    def route(self) -> Optional[str]:
+        route = self.scope.get("route")
+        return getattr(route, "path", None)
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Structural fingerprint: the statement up to its WHERE clause.
+    Catches both classic N+1 (same query, different ids) and runs of
+    near-identical aggregates that differ only in their filters.
+    """
+    normalized = re.sub(r"\s+", " ", statement).strip()
+    return re.split(r" WHERE ", normalized, maxsplit=1, flags=re.IGNORECASE)[0]
+
+
+def parameter_shape(parameters, executemany: bool):
+    """Types of the bound parameters, never their values."""
+    if executemany and parameters:
+        return {"rows": len(parameters), "row": parameter_shape(parameters[0], False)}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _record(finding: Dict):
+    finding["recorded_at"] = datetime.utcnow().isoformat()
+    finding["pid"] = os.getpid()
+    with _findings_lock:
+        _findings.append(finding)
+
+
+def _explain(conn, statement: str, parameters) -> Optional[List[str]]:
+    """
+    EXPLAIN (no ANALYZE) on a separate cursor, so the original results are
+    untouched. It runs in the request's transaction, inside a savepoint, so
+    a failing EXPLAIN is rolled back without aborting that transaction.
+    """
+    if conn.dialect.name != "postgresql":
+        return None
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")):
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT diagnostics_explain")
+        try:
+            cursor.execute("EXPLAIN " + statement, parameters)
+            plan = [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT diagnostics_explain")
+            plan = [f"EXPLAIN failed: {e}"]
+        cursor.execute("RELEASE SAVEPOINT diagnostics_explain")
+        return plan
+    except Exception as e:
+        return [f"EXPLAIN failed: {e}"]
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("diagnostics_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = _current.get()
+    starts = conn.info.get("diagnostics_start")
+    if queries is None or not starts:
+        return
+
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    shape = statement_shape(statement)
+    queries.shapes[shape] += 1
+    queries.statements.setdefault(shape, set()).add(statement)
+
+    if elapsed_ms >= settings.diagnostics_slow_query_ms:
+        _record({
+            "type": "slow_query",
+            "route": queries.route,
+            "method": queries.scope.get("method"),
+            "duration_ms": round(elapsed_ms, 2),
+            "statement": statement,
+            "parameters": parameter_shape(parameters, executemany),
+            "plan": _explain(conn, statement, parameters) if not executemany else None
+        })
+
+
+def install():
+    """Attach engine listeners; called once at startup when diagnostics are enabled."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def start_request(scope: dict) -> RequestQueries:
+    queries = RequestQueries(scope)
+    _current.set(queries)
+    return queries
+
+
+def finish_request(queries: RequestQueries):
+    """Flag statement shapes repeated at least N times in this request."""
+    for shape, count in queries.shapes.items():
+        if count >= settings.diagnostics_repeat_threshold:
+            _record({
+                "type": "repeated_statement",
+                "route": queries.route,
+                "method": queries.scope.get("method"),
+                "count": count,
+                "distinct_statements": len(queries.statements[shape]),
+                "statement_shape": shape
+            })
+
+
+def get_findings(finding_type: Optional[str] = None, route: Optional[str] = None, limit: int = 100) -> Dict:
+    """Most recent findings first, optionally filtered, plus per-route totals."""
+    with _findings_lock:
+        findings = list(_findings)
+
+    if finding_type:
+        findings = [f for f in findings if f["type"] == finding_type]
+    if route:
+        findings = [f for f in findings if f["route"] == route]
+
+    summary = Counter((f["type"], f["route"]) for f in findings)
+    return {
+        "enabled": settings.diagnostics_enabled,
+        "slow_query_ms": settings.diagnostics_slow_query_ms,
+        "repeat_threshold": settings.diagnostics_repeat_threshold,
+        "total": len(findings),
+        "summary": [
+            {"type": finding_type, "route": route, "count": count}
+            for (finding_type, route), count in summary.most_common()
+        ],
+        "findings": list(reversed(findings))[:limit]
+    }
+
+
+def clear_findings():
+    with _findings_lock:
+        _findings.clear()
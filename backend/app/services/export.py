@@ -0,0 +1,193 @@
+"""
+Streaming export of transaction history.
+Rows are read with a server-side cursor and encoded in fixed-size batches,
+so memory stays constant regardless of how many transactions a user has.
+"""
+from typing import Iterator, Dict, List
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+import csv
+import importlib
+import io
+import json
+
+from app.database import SessionLocal
+from app.models.transaction import Transaction
+
+# Rows fetched per round trip (server-side cursor on PostgreSQL)
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+EXPORT_FIELDS = ["id", "date", "amount", "description", "merchant", "category", "is_income"]
+
+
+def build_export_query(user_id, model=Transaction):
+    """
+    Base Core select for an export from one table (hot or archive); callers
+    apply the list filters and ordering on top.
+    """
+    return select(*(getattr(model, name) for name in EXPORT_FIELDS)).where(model.user_id == user_id)
+
+
+def _iter_batches(db: Session, query) -> Iterator[List]:
+    """Yield lists of rows using yield_per so only one batch is held in memory."""
+    result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for partition in result.partitions():
+        yield partition
+
+
+def _stream_csv(db: Session, query) -> Iterator[bytes]:
+    """
+    CSV uses the same column layout as /transactions/import (amount in rupees),
+    so an export can be re-imported as-is.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["id", "date", "amount", "description", "merchant", "category", "is_income"])
+
+    for rows in _iter_batches(db, query):
+        for row in rows:
+            writer.writerow([
+                str(row.id),
+                row.date.isoformat(),
+                f"{row.amount / 100:.2f}",
+                row.description,
+                row.merchant or "",
+                row.category,
+                "true" if row.is_income else "false"
+            ])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    # Header only, when there were no rows
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _row_to_dict(row) -> Dict:
+    """NDJSON keeps amounts in paise like the rest of the API."""
+    return {
+        "id": str(row.id),
+        "date": row.date.isoformat(),
+        "amount": row.amount,
+        "description": row.description,
+        "merchant": row.merchant,
+        "category": row.category,
+        "is_income": bool(row.is_income)
+    }
+
+
+def _stream_ndjson(db: Session, query) -> Iterator[bytes]:
+    for rows in _iter_batches(db, query):
+        chunk = "".join(json.dumps(_row_to_dict(row), ensure_ascii=False) + "\n" for row in rows)
+        yield chunk.encode("utf-8")
+
+
+class _ChunkSink:
+    """
+    Write-only file object for ParquetWriter.
+    Keeps a running offset for tell() while letting us drain written bytes
+    after every row group, which is what keeps parquet output streamable.
+    """
+
+    def __init__(self):
+        self._buffer = io.BytesIO()
+        self._offset = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        written = self._buffer.write(data)
+        self._offset += written
+        return written
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate(0)
+        return data
+
+
+def _stream_parquet(db: Session, query) -> Iterator[bytes]:
+    """Each fetched batch becomes one parquet row group."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.string()),
+        ("date", pa.date32()),
+        ("amount", pa.int64()),
+        ("description", pa.string()),
+        ("merchant", pa.string()),
+        ("category", pa.string()),
+        ("is_income", pa.bool_()),
+    ])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for rows in _iter_batches(db, query):
+            batch = pa.record_batch([
+                pa.array([str(r.id) for r in rows], pa.string()),
+                pa.array([r.date for r in rows], pa.date32()),
+                pa.array([r.amount for r in rows], pa.int64()),
+                pa.array([r.description for r in rows], pa.string()),
+                pa.array([r.merchant for r in rows], pa.string()),
+                pa.array([r.category for r in rows], pa.string()),
+                pa.array([bool(r.is_income) for r in rows], pa.bool_()),
+            ], schema=schema)
+            writer.write_batch(batch)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+
+    yield sink.drain()
+
+
+def parquet_available() -> bool:
+    """Parquet export needs pyarrow, which is an optional dependency."""
+    try:
+        importlib.import_module("pyarrow.parquet")  # Imports pyarrow too
+    except ImportError:
+        return False
+    return True
+
+
+_STREAMERS = {
+    "csv": _stream_csv,
+    "ndjson": _stream_ndjson,
+    "parquet": _stream_parquet,
+}
+
+
+def stream_transactions(query, export_format: str) -> Iterator[bytes]:
+    """
+    Encode the rows selected by `query` in the requested format.
+    Uses its own sync session: Starlette iterates sync generators in a
+    threadpool, and the body is produced after the request's session is closed.
+    """
+    streamer = _STREAMERS.get(export_format)
+    if streamer is None:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    db = SessionLocal()
+    try:
+        yield from streamer(db, query)
+    finally:
+        db.close()
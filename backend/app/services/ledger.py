@@ -0,0 +1,172 @@
+"""
+Per-user running balance ledger.
+Each commit that touches transactions adjusts the user's UserBalance row in
+the same database transaction: income and expense totals, transaction
+count and the first/last transaction dates. A missing row is created from
+the transactions table on the user's next write, so rows never need a
+separate backfill. verify_ledger() and rebuild_ledger() (scripts/ledger.py)
+detect and repair drift from writes that bypass the session. Archived
+transactions (services/archive.py) stay part of every total.
+"""
+from typing import Dict, List, Optional, Sequence
+from collections import defaultdict
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import case, func, insert, or_, select, union_all, update
+from sqlalchemy.orm import Session
+
+from app.database import insert_ignoring_conflict
+from app.models.archive import ArchivedTransaction
+from app.models.ledger import UserBalance
+from app.models.transaction import Transaction
+from app.services.transaction_changes import TransactionChange, on_commit
+
+LEDGER_FIELDS = ("total_income", "total_expense", "transaction_count", "first_date", "last_date")
+
+
+def all_transactions(user_ids: Optional[Sequence[UUID]] = None):
+    """Hot and archived transactions as one subquery (the ledger covers both)."""
+    parts = []
+    for model in (Transaction, ArchivedTransaction):
+        part = select(model.user_id, model.id, model.date, model.amount, model.is_income)
+        if user_ids is not None:
+            part = part.where(model.user_id.in_(user_ids))
+        parts.append(part)
+    return union_all(*parts).subquery()
+
+
+def aggregate_balances(user_ids: Optional[Sequence[UUID]] = None):
+    """Ledger values computed from the transaction tables, one row per user."""
+    rows = all_transactions(user_ids)
+    return select(
+        rows.c.user_id,
+        func.coalesce(func.sum(case((rows.c.is_income == True, rows.c.amount), else_=0)), 0).label("total_income"),
+        func.coalesce(func.sum(case((rows.c.is_income == False, rows.c.amount), else_=0)), 0).label("total_expense"),
+        func.count(rows.c.id).label("transaction_count"),
+        func.min(rows.c.date).label("first_date"),
+        func.max(rows.c.date).label("last_date")
+    ).group_by(rows.c.user_id)
+
+
+def ledger_deltas(changes: List[TransactionChange]) -> Dict[UUID, dict]:
+    deltas = defaultdict(lambda: {"income": 0, "expense": 0, "count": 0, "added": set(), "removed": set()})
+    for change in changes:
+        delta = deltas[change.user_id]
+        for snapshot, sign in ((change.old, -1), (change.new, 1)):
+            if snapshot is None:
+                continue
+            delta["count"] += sign
+            delta["income" if snapshot.is_income else "expense"] += sign * snapshot.amount
+            delta["added" if sign > 0 else "removed"].add(snapshot.date)
+    return deltas
+
+
+def apply_ledger_delta(session: Session, user_id: UUID, delta: dict):
+    values = {
+        "total_income": UserBalance.total_income + delta["income"],
+        "total_expense": UserBalance.total_expense + delta["expense"],
+        "transaction_count": UserBalance.transaction_count + delta["count"],
+        "updated_at": datetime.utcnow()
+    }
+    if delta["added"]:
+        earliest, latest = min(delta["added"]), max(delta["added"])
+        values["first_date"] = case(
+            (or_(UserBalance.first_date.is_(None), UserBalance.first_date > earliest), earliest),
+            else_=UserBalance.first_date
+        )
+        values["last_date"] = case(
+            (or_(UserBalance.last_date.is_(None), UserBalance.last_date < latest), latest),
+            else_=UserBalance.last_date
+        )
+
+    increment = (
+        update(UserBalance)
+        .where(UserBalance.user_id == user_id)
+        .values(**values)
+        .returning(UserBalance.first_date, UserBalance.last_date)
+        .execution_options(synchronize_session=False)
+    )
+
+    bounds = session.execute(increment).first()
+    if bounds is None:
+        # First write since the ledger existed: the flushed table already includes it
+        row = session.execute(aggregate_balances([user_id])).first()
+        if row is None:
+            return
+        values = {field: getattr(row, field) for field in LEDGER_FIELDS}
+        if insert_ignoring_conflict(session, UserBalance, {"user_id": user_id, **values}):
+            return
+        bounds = session.execute(increment).first()
+
+    # Removing the row at either end of the range: find the new ends (index lookups)
+    if delta["removed"] & {bounds.first_date, bounds.last_date}:
+        ends = [
+            session.execute(
+                select(func.min(model.date), func.max(model.date)).where(model.user_id == user_id)
+            ).one()
+            for model in (Transaction, ArchivedTransaction)
+        ]
+        first_date = min((first for first, _ in ends if first is not None), default=None)
+        last_date = max((last for _, last in ends if last is not None), default=None)
+        session.execute(
+            update(UserBalance)
+            .where(UserBalance.user_id == user_id)
+            .values(first_date=first_date, last_date=last_date)
+            .execution_options(synchronize_session=False)
+        )
+
+
+@on_commit
+def _update_ledger(session: Session, changes: List[TransactionChange]):
+    for user_id, delta in ledger_deltas(changes).items():
+        apply_ledger_delta(session, user_id, delta)
+
+
+def verify_ledger(session: Session, user_ids: Optional[Sequence[UUID]] = None) -> List[Dict]:
+    """Ledger rows that disagree with the transactions table."""
+    actual = {row.user_id: row for row in session.execute(aggregate_balances(user_ids))}
+    query = select(UserBalance)
+    if user_ids is not None:
+        query = query.where(UserBalance.user_id.in_(user_ids))
+
+    drift = []
+    for ledger in session.scalars(query):
+        row = actual.get(ledger.user_id)
+        for field in LEDGER_FIELDS:
+            expected = getattr(row, field) if row is not None else (0 if field not in ("first_date", "last_date") else None)
+            if getattr(ledger, field) != expected:
+                drift.append({
+                    "user_id": ledger.user_id,
+                    "field": field,
+                    "ledger": getattr(ledger, field),
+                    "actual": expected
+                })
+    return drift
+
+
+def rebuild_ledger(session: Session, user_ids: Optional[Sequence[UUID]] = None) -> int:
+    """Recompute ledger rows from transactions; returns the number of rows written."""
+    clear = UserBalance.__table__.delete()
+    if user_ids is not None:
+        clear = clear.where(UserBalance.user_id.in_(user_ids))
+    session.execute(clear)
+
+    result = session.execute(
+        insert(UserBalance).from_select(["user_id", *LEDGER_FIELDS], aggregate_balances(user_ids))
+    )
+    return result.rowcount
+
+
+def recently_active_users(session: Session, limit: int, days: int, min_transactions: int = 0) -> List[UUID]:
+    """Users with at least `min_transactions` who wrote one in the last `days`, most recent first."""
+    since = datetime.utcnow() - timedelta(days=days)
+    return list(session.scalars(
+        select(UserBalance.user_id)
+        .where(
+            UserBalance.updated_at >= since,
+            UserBalance.transaction_count >= min_transactions
+        )
+        .order_by(UserBalance.updated_at.desc())
+        .limit(limit)
+    ))
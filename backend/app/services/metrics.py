@@ -0,0 +1,134 @@
+"""
+Prometheus metrics for the API.
+When PROMETHEUS_MULTIPROC_DIR is set (see gunicorn.conf.py) every worker
+writes to shared files and /metrics aggregates all live workers, so a
+scrape that lands on any one worker still sees the whole server.
+"""
+from typing import Dict
+import os
+
+from prometheus_client import (
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    CONTENT_TYPE_LATEST,
+    generate_latest,
+    multiprocess,
+)
+
+REQUEST_LATENCY = Histogram(
+    "finpulse_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+REQUESTS_IN_FLIGHT = Gauge(
+    "finpulse_requests_in_flight",
+    "Requests currently being handled",
+    multiprocess_mode="livesum",
+)
+
+SERVICE_DURATION = Histogram(
+    "finpulse_service_duration_seconds",
+    "Duration of named service spans (categorizer train/predict, predictor calls)",
+    ["span"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "finpulse_db_pool_checked_out",
+    "Connections currently checked out",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_OVERFLOW = Gauge(
+    "finpulse_db_pool_overflow",
+    "Overflow connections currently open",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_CHECKOUTS = Gauge(
+    "finpulse_db_pool_checkouts",
+    "Pool checkouts since worker start",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_TIMEOUTS = Gauge(
+    "finpulse_db_pool_timeouts",
+    "Pool checkout timeouts since worker start",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_MAX_WAIT = Gauge(
+    "finpulse_db_pool_max_wait_seconds",
+    "Longest pool checkout wait seen by any live worker",
+    ["engine"],
+    multiprocess_mode="livemax",
+)
+
+# Cumulative per worker; hit ratio = hits / (hits + misses)
+CACHE_HITS = Gauge(
+    "finpulse_cache_hits",
+    "Cache hits since worker start",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+
+CACHE_MISSES = Gauge(
+    "finpulse_cache_misses",
+    "Cache misses since worker start",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+
+CACHE_EVICTIONS = Gauge(
+    "finpulse_cache_evictions",
+    "Cache evictions since worker start",
+    ["cache"],
+    multiprocess_mode="livesum",
+)
+
+
+def observe_request(method: str, route: str, status_code: int, seconds: float):
+    REQUEST_LATENCY.labels(method, route, str(status_code)).observe(seconds)
+
+
+def observe_span(name: str, seconds: float):
+    SERVICE_DURATION.labels(name).observe(seconds)
+
+
+def update_pool_gauges(pool_stats: Dict[str, dict]):
+    """Publish this worker's pool stats (output of database.get_pool_stats)."""
+    for engine_name, stats in pool_stats.items():
+        DB_POOL_CHECKED_OUT.labels(engine_name).set(stats.get("checked_out", 0))
+        DB_POOL_OVERFLOW.labels(engine_name).set(stats.get("overflow", 0))
+        DB_POOL_CHECKOUTS.labels(engine_name).set(stats.get("checkouts", 0))
+        DB_POOL_TIMEOUTS.labels(engine_name).set(stats.get("timeouts", 0))
+        DB_POOL_MAX_WAIT.labels(engine_name).set(stats.get("max_wait_ms", 0.0) / 1000)
+
+
+def update_cache_gauges(cache_stats: Dict[str, dict]):
+    """Publish this worker's cache counters, keyed by cache name."""
+    for cache_name, stats in cache_stats.items():
+        CACHE_HITS.labels(cache_name).set(stats.get("hits", 0))
+        CACHE_MISSES.labels(cache_name).set(stats.get("misses", 0))
+        CACHE_EVICTIONS.labels(cache_name).set(stats.get("evictions", 0))
+
+
+def render_metrics() -> bytes:
+    """Exposition text for all live workers (or this process outside gunicorn)."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
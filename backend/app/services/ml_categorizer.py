@@ -1,14 +1,26 @@
 """
 Machine Learning-based transaction categorization using Naive Bayes with TF-IDF.
 This is a proper ML implementation suitable for resume/portfolio projects.
+
+Each user gets their own model, trained from their history on first use
+and kept in a per-worker cache. warm_up() trains models for given users ahead
+of traffic; app/services/startup.py picks the recently active users and
+imports this module only when there are any.
 """
 from typing import Dict, List, Optional, Tuple
 from collections import defaultdict, Counter
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 import math
 import re
 
+from app.config import get_settings
 from app.models.transaction import Transaction, TRANSACTION_CATEGORIES
+from app.services.cache import TTLCache
+from app.services.ml_constants import MIN_TRAINING_TRANSACTIONS
+from app.services.timing import span
+
+settings = get_settings()
 
 
 class NaiveBayesClassifier:
@@ -144,34 +156,53 @@ class NaiveBayesClassifier:
         return sorted(word_scores, key=lambda x: x[1], reverse=True)[:top_n]
 
 
-# Global classifier instance
-_classifier = NaiveBayesClassifier()
+# Trained models by user id (per worker; inherited from the master when preloaded)
+_models = TTLCache(
+    max_entries=settings.categorizer_max_models,
+    ttl_seconds=settings.categorizer_model_ttl_seconds
+)
 
 
+@span("categorizer.train")
 def train_classifier(db: Session, user_id) -> bool:
     """
     Train the ML classifier on user's transaction history.
     Returns True if training was successful.
     """
     # Get user's transactions
-    transactions = db.query(Transaction).filter(
-        Transaction.user_id == user_id
+    rows = db.execute(
+        select(Transaction.description, Transaction.merchant, Transaction.category)
+        .where(Transaction.user_id == user_id)
     ).all()
     
-    if len(transactions) < 10:  # Need minimum data
+    if len(rows) < MIN_TRAINING_TRANSACTIONS:  # Need minimum data
+        _models.delete(user_id)
         return False
     
     # Prepare training data
-    documents = []
-    for txn in transactions:
-        text = f"{txn.description} {txn.merchant or ''}"
-        documents.append((text, txn.category))
+    documents = [
+        (f"{description} {merchant or ''}", category)
+        for description, merchant, category in rows
+    ]
     
     # Train the model
-    _classifier.train(documents)
+    classifier = NaiveBayesClassifier()
+    classifier.train(documents)
+    _models.set(user_id, classifier)
     return True
 
 
+def get_classifier(db: Optional[Session], user_id) -> Optional[NaiveBayesClassifier]:
+    """The user's trained model, training it on a cache miss; None without enough data."""
+    if user_id is None:
+        return None
+    classifier = _models.get(user_id)
+    if classifier is None and db is not None and train_classifier(db, user_id):
+        classifier = _models.get(user_id)
+    return classifier
+
+
+@span("categorizer.predict")
 def predict_category_ml(
     description: str,
     merchant: Optional[str] = None,
@@ -182,17 +213,15 @@ def predict_category_ml(
     Predict category using ML model.
     Returns list of predictions with confidence scores.
     """
-    # Train if not already trained
-    if db and user_id and not _classifier.trained:
-        train_classifier(db, user_id)
+    classifier = get_classifier(db, user_id)
     
-    if not _classifier.trained:
+    if classifier is None:
         # Fallback to rule-based if not enough data
         return [{"category": "Other", "confidence": 50.0, "method": "rule-based"}]
     
     # Predict
     text = f"{description} {merchant or ''}"
-    predictions = _classifier.predict(text, top_n=3)
+    predictions = classifier.predict(text, top_n=3)
     
     # Format results
     results = []
@@ -208,20 +237,19 @@ def predict_category_ml(
 
 def get_model_stats(db: Session, user_id) -> Dict:
     """Get statistics about the ML model for the user."""
-    if not _classifier.trained:
-        train_classifier(db, user_id)
+    classifier = get_classifier(db, user_id)
     
-    if not _classifier.trained:
+    if classifier is None:
         return {
             "trained": False,
-            "message": "Need at least 10 transactions to train the model"
+            "message": f"Need at least {MIN_TRAINING_TRANSACTIONS} transactions to train the model"
         }
     
     return {
         "trained": True,
-        "total_transactions": _classifier.total_docs,
-        "vocabulary_size": len(_classifier.vocabulary),
-        "categories": dict(_classifier.category_counts),
+        "total_transactions": classifier.total_docs,
+        "vocabulary_size": len(classifier.vocabulary),
+        "categories": dict(classifier.category_counts),
         "model_type": "Naive Bayes with TF-IDF"
     }
 
@@ -229,3 +257,12 @@ def get_model_stats(db: Session, user_id) -> Dict:
 def retrain_model(db: Session, user_id) -> bool:
     """Force retrain the model with latest data."""
     return train_classifier(db, user_id)
+
+
+def warm_up(db: Session, user_ids: List) -> int:
+    """Train models for `user_ids` ahead of their first request; returns how many trained."""
+    return sum(1 for user_id in user_ids if train_classifier(db, user_id))
+
+
+def get_model_cache_stats() -> Dict:
+    return _models.stats()
@@ -7,6 +7,7 @@ Extracted magic numbers for better maintainability.
 MIN_TRANSACTIONS_FOR_PREDICTION = 2  # Minimum months of data for spending prediction
 MIN_TRANSACTIONS_FOR_ANOMALY = 5     # Minimum transactions for anomaly detection
 MIN_CATEGORY_TRANSACTIONS = 3        # Minimum transactions per category for prediction
+MIN_TRAINING_TRANSACTIONS = 10       # Minimum transactions to train a user's categorizer
 
 # Time periods
 DEFAULT_ANOMALY_DAYS = 90            # Default days to analyze for anomalies
@@ -4,34 +4,22 @@ Provides spending forecasts, budget alerts, and anomaly detection.
 """
 from typing import List, Dict, Optional
 from datetime import date, datetime, timedelta
-from collections import defaultdict
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 import statistics
 
 from app.models.transaction import Transaction
-from app.models.budget import Budget
+from app.services.budget_evaluation import evaluate_budgets
+from app.services.month_summaries import monthly_expense_totals
+from app.services.timing import span
 
 
 def get_monthly_spending(db: Session, user_id, months: int = 6) -> Dict[str, float]:
-    """Get monthly spending totals for the last N months."""
-    today = date.today()
-    start_date = today - timedelta(days=months * 30)
-    
-    transactions = db.query(Transaction).filter(
-        Transaction.user_id == user_id,
-        Transaction.date >= start_date,
-        Transaction.is_income == False
-    ).all()
-    
-    monthly_totals = defaultdict(float)
-    for txn in transactions:
-        month_key = txn.date.strftime('%Y-%m')
-        monthly_totals[month_key] += txn.amount / 100  # Convert to rupees
-    
-    return dict(monthly_totals)
+    """Get monthly spending totals for the last N calendar months (including this one)."""
+    totals = monthly_expense_totals(db, user_id, months)
+    return {month_key: total / 100 for month_key, total in totals.items()}  # Convert to rupees
 
 
+@span("predictor.forecast")
 def predict_next_month_spending(db: Session, user_id) -> Dict:
     """
     Predict next month's spending using moving average.
@@ -80,19 +68,12 @@ def predict_next_month_spending(db: Session, user_id) -> Dict:
     }
 
 
+@span("predictor.category_forecast")
 def predict_category_spending(db: Session, user_id, category: str) -> Dict:
     """Predict next month's spending for a specific category."""
-    today = date.today()
-    start_date = today - timedelta(days=180)  # 6 months
-    
-    transactions = db.query(Transaction).filter(
-        Transaction.user_id == user_id,
-        Transaction.category == category,
-        Transaction.date >= start_date,
-        Transaction.is_income == False
-    ).all()
+    monthly_totals = monthly_expense_totals(db, user_id, 6, category=category)
     
-    if not transactions:
+    if not monthly_totals:
         return {
             "category": category,
             "prediction": 0,
@@ -100,14 +81,8 @@ def predict_category_spending(db: Session, user_id, category: str) -> Dict:
             "message": "No transactions in this category"
         }
     
-    # Group by month
-    monthly_totals = defaultdict(float)
-    for txn in transactions:
-        month_key = txn.date.strftime('%Y-%m')
-        monthly_totals[month_key] += txn.amount / 100
-    
     # Calculate average
-    values = list(monthly_totals.values())
+    values = [total / 100 for total in monthly_totals.values()]
     prediction = sum(values) / len(values)
     
     return {
@@ -118,59 +93,25 @@ def predict_category_spending(db: Session, user_id, category: str) -> Dict:
     }
 
 
+@span("predictor.budget_alerts")
 def get_budget_alerts(db: Session, user_id) -> List[Dict]:
     """
     Check budget status and predict when limits will be hit.
     Returns alerts for budgets at risk.
     """
-    today = date.today()
-    current_month = today.replace(day=1)
-    days_in_month = (current_month.replace(month=current_month.month % 12 + 1, day=1) - timedelta(days=1)).day
-    days_elapsed = today.day
-    days_remaining = days_in_month - days_elapsed
-    
-    # Get budgets for current month
-    budgets = db.query(Budget).filter(
-        Budget.user_id == user_id,
-        Budget.month == current_month
-    ).all()
-    
-    if not budgets:
-        return []
-    
-    # OPTIMIZED: Single query to get spending by category
-    spending_by_category = dict(
-        db.query(
-            Transaction.category,
-            func.sum(Transaction.amount).label('total')
-        ).filter(
-            Transaction.user_id == user_id,
-            Transaction.category.in_([b.category for b in budgets]),
-            Transaction.date >= current_month,
-            Transaction.is_income == False
-        ).group_by(Transaction.category).all()
-    )
+    evaluation = evaluate_budgets(db, user_id)
+    days_remaining = evaluation["days_remaining"]
     
     alerts = []
     
-    for budget in budgets:
-        # Get spending from pre-fetched data
-        spent = spending_by_category.get(budget.category, 0)
-        
-        spent_rupees = spent / 100
-        limit_rupees = budget.monthly_limit / 100
-        percentage_used = (spent_rupees / limit_rupees * 100) if limit_rupees > 0 else 0
-        
-        # Calculate daily burn rate
-        daily_rate = spent_rupees / days_elapsed if days_elapsed > 0 else 0
-        projected_total = daily_rate * days_in_month
-        
-        # Predict when budget will be exceeded
-        remaining_budget = limit_rupees - spent_rupees
-        if daily_rate > 0 and remaining_budget > 0:
-            days_until_exceeded = remaining_budget / daily_rate
-        else:
-            days_until_exceeded = None
+    for item in evaluation["budgets"]:
+        spent_rupees = item["spent"] / 100
+        limit_rupees = item["monthly_limit"] / 100
+        percentage_used = item["percentage_used"]
+        daily_rate = item["daily_rate"] / 100
+        projected_total = item["projected_total"] / 100
+        remaining_budget = item["remaining"] / 100
+        days_until_exceeded = item["days_until_exceeded"]
         
         # Create alert if at risk
         alert_level = None
@@ -191,7 +132,7 @@ def get_budget_alerts(db: Session, user_id) -> List[Dict]:
         
         if alert_level:
             alerts.append({
-                "category": budget.category,
+                "category": item["category"],
                 "alert_level": alert_level,
                 "message": message,
                 "spent": round(spent_rupees, 2),
@@ -206,6 +147,7 @@ def get_budget_alerts(db: Session, user_id) -> List[Dict]:
     return sorted(alerts, key=lambda x: {"critical": 0, "warning": 1, "caution": 2, "info": 3}[x["alert_level"]])
 
 
+@span("predictor.anomalies")
 def detect_anomalies(db: Session, user_id, days: int = 90, threshold: float = 2.0) -> List[Dict]:
     """
     Detect unusual transactions using Z-score method.
@@ -253,6 +195,7 @@ def detect_anomalies(db: Session, user_id, days: int = 90, threshold: float = 2.
     return sorted(anomalies, key=lambda x: x["z_score"], reverse=True)
 
 
+@span("predictor.savings")
 def calculate_current_month_savings(db: Session, user_id) -> Dict:
     """Calculate savings rate for the current month."""
     today = date.today()
@@ -285,10 +228,20 @@ def get_spending_insights(db: Session, user_id) -> Dict:
     Generate comprehensive spending insights.
     Combines predictions, alerts, anomalies, and savings rate.
     """
+    return build_insights(
+        predict_next_month_spending(db, user_id),
+        get_budget_alerts(db, user_id),
+        detect_anomalies(db, user_id),
+        calculate_current_month_savings(db, user_id)
+    )
+
+
+def build_insights(prediction: Dict, alerts: List[Dict], anomalies: List[Dict], savings: Dict) -> Dict:
+    """Assemble the insights response from its separately computed parts."""
     return {
-        "next_month_prediction": predict_next_month_spending(db, user_id),
-        "budget_alerts": get_budget_alerts(db, user_id),
-        "anomalies": detect_anomalies(db, user_id)[:5],  # Top 5 anomalies
-        "savings_analysis": calculate_current_month_savings(db, user_id),
+        "next_month_prediction": prediction,
+        "budget_alerts": alerts,
+        "anomalies": anomalies[:5],  # Top 5 anomalies
+        "savings_analysis": savings,
         "generated_at": datetime.utcnow().isoformat()
     }
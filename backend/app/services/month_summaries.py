@@ -0,0 +1,218 @@
+"""
+Closed-month summaries.
+Once a month is over, close_months() freezes its totals, per-category
+expense statistics and budget outcome into one MonthSummary row. Reads of
+past months (budget status, forecasts) use those rows and touch raw
+transactions only for the current month or months not yet closed. A
+committed write dated in a closed month recomputes just that month's row
+in the same transaction.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+from collections import defaultdict
+from datetime import date, datetime
+from uuid import UUID
+import math
+
+from sqlalchemy import Float, cast, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.archive import ArchivedTransaction
+from app.models.budget import Budget
+from app.models.summary import MonthSummary
+from app.models.transaction import Transaction
+from app.services.budget_evaluation import month_bounds
+from app.services.transaction_changes import TransactionChange, on_commit
+
+
+def current_month(today: Optional[date] = None) -> date:
+    return (today or date.today()).replace(day=1)
+
+
+def is_closed(month: date, today: Optional[date] = None) -> bool:
+    return month.replace(day=1) < current_month(today)
+
+
+def month_start(session: Session, column):
+    """SQL expression truncating a date column to the first of its month."""
+    if session.get_bind().dialect.name == "postgresql":
+        return cast(func.date_trunc("month", column), column.type)
+    return func.date(column, "start of month")
+
+
+def category_stats(entry: dict) -> dict:
+    """Mean and population standard deviation from a stored category entry (paise)."""
+    count = entry["count"]
+    mean = entry["total"] / count if count else 0
+    variance = max(0.0, entry["sum_squares"] / count - mean * mean) if count else 0
+    return {**entry, "mean": mean, "stddev": math.sqrt(variance)}
+
+
+def compute_month_summary(session: Session, user_id: UUID, month: date) -> dict:
+    """Column values for a month's summary, from per-category aggregates plus the month's budgets."""
+    start, end = month_bounds(month)
+    values = {
+        "user_id": user_id, "month": start,
+        "income_total": 0, "income_count": 0, "expense_total": 0, "expense_count": 0,
+        "categories": {}, "budgets": {}, "closed_at": datetime.utcnow()
+    }
+
+    # Archived rows count too: a late write to an archived month recomputes it
+    for model in (Transaction, ArchivedTransaction):
+        amount = cast(model.amount, Float)
+        rows = session.execute(
+            select(
+                model.category,
+                model.is_income,
+                func.count(model.id).label("count"),
+                func.sum(model.amount).label("total"),
+                func.min(model.amount).label("min"),
+                func.max(model.amount).label("max"),
+                func.sum(amount * amount).label("sum_squares")
+            )
+            .where(model.user_id == user_id, model.date >= start, model.date < end)
+            .group_by(model.category, model.is_income)
+        ).all()
+
+        for row in rows:
+            if row.is_income:
+                values["income_total"] += int(row.total)
+                values["income_count"] += row.count
+                continue
+            values["expense_total"] += int(row.total)
+            values["expense_count"] += row.count
+            entry = values["categories"].get(row.category)
+            if entry is None:
+                values["categories"][row.category] = {
+                    "total": int(row.total), "count": row.count,
+                    "min": row.min, "max": row.max, "sum_squares": float(row.sum_squares)
+                }
+            else:
+                entry["total"] += int(row.total)
+                entry["count"] += row.count
+                entry["min"] = min(entry["min"], row.min)
+                entry["max"] = max(entry["max"], row.max)
+                entry["sum_squares"] += float(row.sum_squares)
+
+    budgets = session.execute(
+        select(Budget.category, Budget.monthly_limit)
+        .where(Budget.user_id == user_id, Budget.month == start)
+    ).all()
+    for category, monthly_limit in budgets:
+        spent = values["categories"].get(category, {}).get("total", 0)
+        values["budgets"][category] = {
+            "limit": monthly_limit, "spent": spent, "over_budget": spent > monthly_limit
+        }
+    return values
+
+
+def close_month(session: Session, user_id: UUID, month: date):
+    """Write (or rewrite) the summary for one closed month."""
+    values = compute_month_summary(session, user_id, month)
+    session.execute(
+        delete(MonthSummary)
+        .where(MonthSummary.user_id == user_id, MonthSummary.month == values["month"])
+        .execution_options(synchronize_session=False)
+    )
+    session.execute(insert(MonthSummary).values(**values))
+
+
+def close_months(session: Session, user_ids: Optional[Sequence[UUID]] = None, today: Optional[date] = None) -> int:
+    """Summarise every completed month that has transactions but no summary yet."""
+    month = month_start(session, Transaction.date)
+    query = (
+        select(Transaction.user_id, month.label("month"))
+        .where(Transaction.date < current_month(today))
+        .group_by(Transaction.user_id, month)
+    )
+    existing = select(MonthSummary.user_id, MonthSummary.month)
+    if user_ids is not None:
+        query = query.where(Transaction.user_id.in_(user_ids))
+        existing = existing.where(MonthSummary.user_id.in_(user_ids))
+
+    closed = set(session.execute(existing).all())
+    count = 0
+    for user_id, month_value in session.execute(query).all():
+        if isinstance(month_value, str):  # SQLite returns the date() result as text
+            month_value = date.fromisoformat(month_value)
+        if (user_id, month_value) in closed:
+            continue
+        close_month(session, user_id, month_value)
+        count += 1
+    return count
+
+
+def load_summaries(session: Session, user_id: UUID, months: Iterable[date]) -> Dict[date, MonthSummary]:
+    months = list(months)
+    if not months:
+        return {}
+    rows = session.scalars(
+        select(MonthSummary).where(MonthSummary.user_id == user_id, MonthSummary.month.in_(months))
+    )
+    return {row.month: row for row in rows}
+
+
+def recent_months(count: int, today: Optional[date] = None) -> List[date]:
+    """First days of the last `count` calendar months, oldest first, ending with the current one."""
+    month = current_month(today)
+    months = [month]
+    for _ in range(count - 1):
+        month = month_bounds(date.fromordinal(month.toordinal() - 1))[0]
+        months.append(month)
+    return list(reversed(months))
+
+
+def monthly_expense_totals(session: Session, user_id: UUID, months: int, category: Optional[str] = None) -> Dict[str, int]:
+    """
+    Expense totals in paise keyed 'YYYY-MM' for the last `months` calendar
+    months, only months with at least one expense. Closed months come from
+    summaries; the rest from one grouped query over their date range.
+    """
+    window = recent_months(months)
+    summaries = load_summaries(session, user_id, [m for m in window if is_closed(m)])
+
+    totals = {}
+    for month, summary in summaries.items():
+        if category is None:
+            total, count = summary.expense_total, summary.expense_count
+        else:
+            entry = summary.categories.get(category, {})
+            total, count = entry.get("total", 0), entry.get("count", 0)
+        if count:
+            totals[month.strftime('%Y-%m')] = total
+
+    uncovered = [m for m in window if m not in summaries]
+    if uncovered:
+        month = month_start(session, Transaction.date)
+        query = (
+            select(month.label("month"), func.sum(Transaction.amount).label("total"))
+            .where(
+                Transaction.user_id == user_id,
+                Transaction.date >= uncovered[0],
+                Transaction.date < month_bounds(window[-1])[1],
+                Transaction.is_income == False
+            )
+            .group_by(month)
+        )
+        if category is not None:
+            query = query.where(Transaction.category == category)
+        for month_value, total in session.execute(query).all():
+            if isinstance(month_value, str):
+                month_value = date.fromisoformat(month_value)
+            if month_value in uncovered:
+                totals[month_value.strftime('%Y-%m')] = int(total)
+
+    return dict(sorted(totals.items()))
+
+
+@on_commit
+def _recompute_closed_months(session: Session, changes: List[TransactionChange]):
+    """A write dated in a closed month reopens it: recompute that summary if one exists."""
+    touched = defaultdict(set)
+    for change in changes:
+        for snapshot in (change.old, change.new):
+            if snapshot is not None and is_closed(snapshot.date):
+                touched[snapshot.user_id].add(snapshot.date.replace(day=1))
+
+    for user_id, months in touched.items():
+        for month in load_summaries(session, user_id, months):
+            close_month(session, user_id, month)
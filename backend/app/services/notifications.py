@@ -0,0 +1,222 @@
+"""
+Per-user push channel for connected clients (Server-Sent Events).
+Each open stream owns a bounded queue, and a user may hold only a few
+streams per worker, so a slow or greedy client drops its oldest events
+rather than growing memory.
+
+Events reach streams through a broker. The "local" broker delivers within
+this worker process, which is enough for a single worker. The "postgres"
+broker relays every event over LISTEN/NOTIFY, so a write handled by one
+gunicorn worker reaches the user's streams on all of them; each worker
+only fans a message out to its own subscribers of that user.
+"""
+from typing import AsyncIterator, Dict, Optional, Set
+from uuid import UUID
+import asyncio
+import json
+import logging
+import threading
+
+from app.config import get_settings
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "finpulse_events"
+
+
+class Subscription:
+    """One connected client."""
+
+    def __init__(self, user_id: UUID):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.event_queue_size)
+        self.dropped = 0
+
+    def put(self, message: str):
+        """Enqueue on the subscriber's loop, dropping the oldest event when full."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+_subscriptions: Dict[UUID, Set[Subscription]] = {}
+_lock = threading.Lock()
+
+
+def subscribe(user_id: UUID) -> Optional[Subscription]:
+    """None when the user already has the maximum number of streams here."""
+    with _lock:
+        subscribers = _subscriptions.setdefault(user_id, set())
+        if len(subscribers) >= settings.event_max_streams_per_user:
+            return None
+        subscription = Subscription(user_id)
+        subscribers.add(subscription)
+    return subscription
+
+
+def unsubscribe(subscription: Subscription):
+    with _lock:
+        subscribers = _subscriptions.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del _subscriptions[subscription.user_id]
+
+
+def format_event(event_type: str, data: dict) -> str:
+    """One SSE message."""
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def deliver(user_id: UUID, event_type: str, data: dict):
+    """Fan out to this worker's streams for the user; safe from any thread."""
+    with _lock:
+        subscribers = list(_subscriptions.get(user_id, ()))
+    if not subscribers:
+        return
+    message = format_event(event_type, data)
+    for subscription in subscribers:
+        subscription.loop.call_soon_threadsafe(subscription.put, message)
+
+
+class LocalBroker:
+    """Delivers in-process only."""
+
+    name = "local"
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def publish(self, user_id: UUID, event_type: str, data: dict):
+        deliver(user_id, event_type, data)
+
+
+class PostgresBroker:
+    """
+    Relays events through PostgreSQL NOTIFY on a dedicated asyncpg
+    connection per worker, which also LISTENs for everyone's events.
+    Publishing never blocks the caller: messages go through a bounded
+    outbox drained by a sender task.
+    """
+
+    name = "postgres"
+    MAX_PAYLOAD = 7900  # NOTIFY payloads must stay under 8000 bytes
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self.loop = None
+        self._connection = None
+        self._outbox: Optional[asyncio.Queue] = None
+        self._sender = None
+        self.dropped = 0
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self._outbox = asyncio.Queue(maxsize=settings.event_outbox_size)
+        self._sender = asyncio.create_task(self._send_loop())
+
+    async def stop(self):
+        if self._sender:
+            self._sender.cancel()
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    def publish(self, user_id: UUID, event_type: str, data: dict):
+        if self.loop is None:  # Not started (scripts, tests): no streams to reach anyway
+            deliver(user_id, event_type, data)
+            return
+        payload = json.dumps({"user_id": str(user_id), "event": event_type, "data": data}, default=str)
+        if len(payload.encode()) > self.MAX_PAYLOAD:
+            logger.warning("Event %s for %s too large to relay (%d bytes)", event_type, user_id, len(payload))
+            return
+        self.loop.call_soon_threadsafe(self._enqueue, payload)
+
+    def _enqueue(self, payload: str):
+        if self._outbox.full():
+            self.dropped += 1
+            return
+        self._outbox.put_nowait(payload)
+
+    async def _connect(self):
+        import asyncpg  # Only needed with this broker
+
+        connection = await asyncpg.connect(self.dsn)
+        await connection.add_listener(CHANNEL, self._on_notify)
+        connection.add_termination_listener(self._on_terminated)
+        self._connection = connection
+
+    def _on_terminated(self, connection):
+        self._connection = None
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+            deliver(UUID(message["user_id"]), message["event"], message["data"])
+        except (ValueError, KeyError) as e:
+            logger.warning("Ignoring malformed event notification: %s", e)
+
+    async def _send_loop(self):
+        while True:
+            try:
+                # Reconnecting also restores LISTEN, so check even when idle
+                if self._connection is None:
+                    await self._connect()
+                try:
+                    payload = await asyncio.wait_for(self._outbox.get(), timeout=5)
+                except asyncio.TimeoutError:
+                    continue
+                await self._connection.execute("SELECT pg_notify($1, $2)", CHANNEL, payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Event broker connection failed, retrying: %s", e)
+                self._connection = None
+                await asyncio.sleep(1)
+
+
+def _create_broker():
+    if settings.event_broker == "postgres":
+        url = settings.async_database_url or settings.database_url
+        return PostgresBroker(url.replace("postgresql+asyncpg://", "postgresql://", 1))
+    return LocalBroker()
+
+
+broker = _create_broker()
+
+
+def publish(user_id: UUID, event_type: str, data: dict):
+    """Send an event to all of the user's streams, on every worker."""
+    broker.publish(user_id, event_type, data)
+
+
+async def stream(subscription: Subscription) -> AsyncIterator[str]:
+    """
+    SSE body: queued events, with a comment line as keep-alive when idle.
+    The caller unsubscribes when the response ends (EventStreamResponse).
+    """
+    yield "retry: 5000\n\n"
+    while True:
+        try:
+            message = await asyncio.wait_for(
+                subscription.queue.get(), timeout=settings.event_heartbeat_seconds
+            )
+        except asyncio.TimeoutError:
+            message = ": keep-alive\n\n"
+        yield message
+
+
+def get_connection_stats() -> dict:
+    with _lock:
+        return {
+            "broker": broker.name,
+            "users": len(_subscriptions),
+            "connections": sum(len(subs) for subs in _subscriptions.values())
+        }
@@ -0,0 +1,139 @@
+"""
+Monthly or quarterly range partitions of `transactions` on PostgreSQL.
+Migration 0002 turns the table into one partitioned by date, so
+date-bounded queries only scan (and vacuum only touches) the partitions
+they need. ensure_partitions() keeps partitions ready for the next few
+periods; it runs at startup and from scripts/partitions.py. Rows outside
+every range land in transactions_default and are moved into their own
+partition once it is created. On SQLite every function here is a no-op.
+
+The primary key is (id, date), since PostgreSQL requires the partition key
+in every unique index, so it can't enforce unique ids by itself. Ids are
+uuid4s assigned by the application. Each partition also gets a unique index
+on id, which catches duplicates within one period.
+"""
+from typing import List, Optional, Set
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.config import get_settings
+
+settings = get_settings()
+
+TABLE = "transactions"
+DEFAULT_PARTITION = "transactions_default"
+
+# Arbitrary key for pg_advisory_xact_lock: serialises workers creating partitions
+_LOCK_KEY = 804512
+
+
+def period_start(day: date, interval: str) -> date:
+    if interval == "quarter":
+        return date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+    return day.replace(day=1)
+
+
+def next_period(start: date, interval: str) -> date:
+    index = start.year * 12 + start.month - 1 + (3 if interval == "quarter" else 1)
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(start: date, interval: str) -> str:
+    if interval == "quarter":
+        return f"{TABLE}_y{start.year}q{(start.month - 1) // 3 + 1}"
+    return f"{TABLE}_y{start.year}m{start.month:02d}"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    kind = connection.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": TABLE}
+    ).scalar()
+    return kind == "p"
+
+
+def existing_partitions(connection: Connection) -> Set[str]:
+    return set(connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table)"
+    ), {"table": TABLE}).scalars())
+
+
+def create_unique_id_index(connection: Connection, name: str):
+    connection.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {name}_id_key ON {name} (id)"))
+
+
+def create_partition(connection: Connection, start: date, interval: str) -> str:
+    """Create one range partition, moving any of its rows out of the default partition."""
+    name = partition_name(start, interval)
+    end = next_period(start, interval)
+    bounds = {"start": start, "end": end}
+
+    stranded = connection.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end)"),
+        bounds
+    ).scalar()
+    if not stranded:
+        connection.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        create_unique_id_index(connection, name)
+        return name
+
+    # Attaching a range the default partition still holds rows for fails, so move them first
+    connection.execute(text(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)"))
+    connection.execute(
+        text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end"),
+        bounds
+    )
+    connection.execute(
+        text(f"DELETE FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end"), bounds
+    )
+    connection.execute(text(
+        f"ALTER TABLE {TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    create_unique_id_index(connection, name)
+    return name
+
+
+def ensure_partitions(
+    connection: Connection,
+    since: Optional[date] = None,
+    today: Optional[date] = None,
+    interval: Optional[str] = None,
+    ahead: Optional[int] = None
+) -> List[str]:
+    """
+    Create missing partitions from `since` (default: the current period)
+    through `ahead` periods past today. Returns the names created.
+    """
+    if not is_partitioned(connection):
+        return []
+    interval = interval or settings.transaction_partition_interval
+    ahead = settings.transaction_partitions_ahead if ahead is None else ahead
+    today = today or date.today()
+
+    periods = [period_start(since or today, interval)]
+    last = period_start(today, interval)
+    for _ in range(ahead):
+        last = next_period(last, interval)
+    while periods[-1] < last:
+        periods.append(next_period(periods[-1], interval))
+
+    existing = existing_partitions(connection)
+    if all(partition_name(start, interval) in existing for start in periods):
+        return []
+
+    # Several workers start at once: one creates, the others find the work done
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+    existing = existing_partitions(connection)
+    return [
+        create_partition(connection, start, interval)
+        for start in periods
+        if partition_name(start, interval) not in existing
+    ]
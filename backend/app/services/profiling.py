@@ -0,0 +1,159 @@
+"""
+On-demand request profiling.
+"sample" mode samples the event-loop thread's stack every few milliseconds
+and produces folded stacks (flamegraph.pl / speedscope compatible);
+"trace" mode runs cProfile and stores a pstats report. Profiles are written
+to PROFILE_DIR with a JSON sidecar so any worker can serve them.
+Both modes are loop-wide: the event loop is shared, so whatever else runs
+on it (concurrent requests, background tasks) appears in a profile too.
+cProfile installs one profile hook per thread, so only one trace runs at a
+time; a trace requested meanwhile is taken in sample mode instead.
+"""
+from typing import Dict, List, Optional
+from collections import Counter
+from datetime import datetime
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from app.config import get_settings
+
+settings = get_settings()
+
+PROFILE_MODES = ("sample", "trace")
+
+_PROFILE_ID = re.compile(r"^[0-9]+-[0-9a-f]{8}$")
+
+# Held while a cProfile trace is running on the event-loop thread
+_trace_lock = threading.Lock()
+
+
+def profile_dir() -> str:
+    return settings.profile_dir or os.path.join(tempfile.gettempdir(), "finpulse-profiles")
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a background thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and return folded stacks, one 'stack count' per line."""
+        self._stop.set()
+        self._thread.join()
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+class RequestProfiler:
+    """Profiles the current thread from start() until stop()."""
+
+    def __init__(self, mode: str):
+        self.requested_mode = mode if mode in PROFILE_MODES else "sample"
+        self.mode = self.requested_mode
+        self._sampler = None
+        self._profile = None
+
+    def start(self):
+        if self.mode == "trace" and not _trace_lock.acquire(blocking=False):
+            self.mode = "sample"  # Another trace owns this thread's profile hook
+        if self.mode == "trace":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = StackSampler(threading.get_ident(), settings.profile_interval_ms / 1000)
+            self._sampler.start()
+
+    def stop(self) -> str:
+        if self.mode == "trace":
+            self._profile.disable()
+            _trace_lock.release()
+            output = io.StringIO()
+            pstats.Stats(self._profile, stream=output).sort_stats("cumulative").print_stats(60)
+            return output.getvalue()
+        return self._sampler.stop()
+
+
+def save_profile(content: str, meta: Dict) -> str:
+    """Write a profile and its metadata; returns the profile id. Blocking file I/O."""
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    profile_id = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+    meta = {**meta, "id": profile_id, "created_at": datetime.utcnow().isoformat(), "pid": os.getpid()}
+
+    with open(os.path.join(directory, f"{profile_id}.prof"), "w") as f:
+        f.write(content)
+    with open(os.path.join(directory, f"{profile_id}.json"), "w") as f:
+        json.dump(meta, f)
+
+    _prune(directory)
+    return profile_id
+
+
+def _prune(directory: str):
+    """Keep only the newest PROFILE_MAX_FILES profiles."""
+    ids = sorted(name[:-5] for name in os.listdir(directory) if name.endswith(".json"))
+    for profile_id in ids[:-settings.profile_max_files]:
+        for extension in (".prof", ".json"):
+            try:
+                os.remove(os.path.join(directory, profile_id + extension))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(limit: int = 50) -> List[Dict]:
+    """Newest first."""
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+        if len(profiles) >= limit:
+            break
+    return profiles
+
+
+def load_profile(profile_id: str) -> Optional[str]:
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    try:
+        with open(os.path.join(profile_dir(), f"{profile_id}.prof")) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,204 @@
+"""
+Cached responses for expensive per-user reads: the dashboard summary,
+budget status and the prediction endpoints.
+
+Entries are keyed on the user's data version (app/services/data_versions.py),
+a database counter bumped in the same transaction as every write to their
+transactions or budgets. A write committed by any worker therefore retires
+all of a user's entries in every worker, and the stale ones age out. Bodies
+are stored as encoded JSON and served as-is on a hit.
+
+Backends (RESULT_CACHE_BACKEND):
+- "memory": TTL + LRU per worker process (the default);
+- "redis": any server speaking the Redis protocol at RESULT_CACHE_URL,
+  shared by every worker, so a result computed by one worker serves the
+  others. scripts/cache_server.py is a local stand-in for development and
+  tests. If the server is unreachable, reads fall through to the database.
+
+On a miss one caller computes and the others wait for its result:
+single-flight within a worker (app/services/coalesce.py) and a short-lived
+lock key across workers (the redis backend).
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional
+from datetime import date
+import asyncio
+import logging
+import time
+
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.services.cache import TTLCache
+from app.services import coalesce, data_versions
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "finpulse:"
+_POLL_SECONDS = 0.025
+
+
+class MemoryBackend:
+    """Per-process cache."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._entries = TTLCache(max_entries, ttl_seconds)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float):
+        self._entries.set(key, value, ttl_seconds)
+
+    async def add(self, key: str, value: bytes, ttl_seconds: float) -> bool:
+        # Workers don't share this cache and single-flight already covers one worker
+        return True
+
+    async def delete(self, key: str):
+        self._entries.delete(key)
+
+    def stats(self) -> Dict:
+        return self._entries.stats()
+
+
+class RedisBackend:
+    """
+    Shared cache on a Redis-protocol server, through the asyncio client so
+    a slow server never blocks the event loop. Errors are logged and
+    counted and the call behaves like a miss; after one, the server is left
+    alone for a few seconds so an outage doesn't add a timeout to every
+    request.
+    """
+
+    name = "redis"
+    retry_after_seconds = 5.0
+
+    def __init__(self, url: str):
+        import redis.asyncio  # Optional dependency, only needed for this backend
+
+        self._errors = (redis.asyncio.RedisError, OSError, asyncio.TimeoutError)
+        # RESP2: spoken by every Redis-protocol server, including the local stand-in
+        self._client = redis.asyncio.Redis.from_url(url, protocol=2, socket_timeout=1, socket_connect_timeout=1)
+        self._counts = {"hits": 0, "misses": 0, "errors": 0}
+        self._down_until = 0.0
+
+    def _failed(self, action: str, exc: Exception):
+        self._counts["errors"] += 1
+        self._down_until = time.monotonic() + self.retry_after_seconds
+        logger.warning("Result cache %s failed, bypassing it for %ss: %s", action, self.retry_after_seconds, exc)
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    async def _call(self, method: str, *args, **kwargs):
+        if not self._available():
+            return None
+        try:
+            return await getattr(self._client, method)(*args, **kwargs)
+        except self._errors as exc:
+            self._failed(method, exc)
+            return None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = await self._call("get", PREFIX + key)
+        self._counts["hits" if value is not None else "misses"] += 1
+        return value
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float):
+        await self._call("set", PREFIX + key, value, px=int(ttl_seconds * 1000))
+
+    async def add(self, key: str, value: bytes, ttl_seconds: float) -> bool:
+        """Set only if absent (SET NX); True when this caller now holds the key."""
+        if not self._available():
+            return True  # Nobody can hold the lock either; compute rather than wait
+        try:
+            return bool(await self._client.set(PREFIX + key, value, px=int(ttl_seconds * 1000), nx=True))
+        except self._errors as exc:
+            self._failed("add", exc)
+            return True
+
+    async def delete(self, key: str):
+        await self._call("delete", PREFIX + key)
+
+    def stats(self) -> Dict:
+        """This worker's lookups; server-side figures are left to the server's own monitoring."""
+        lookups = self._counts["hits"] + self._counts["misses"]
+        return {
+            **self._counts,
+            "hit_rate": round(self._counts["hits"] / lookups, 4) if lookups else 0.0
+        }
+
+
+def _create_backend():
+    if settings.result_cache_backend == "redis":
+        return RedisBackend(settings.result_cache_url)
+    return MemoryBackend(settings.result_cache_max_entries, settings.result_cache_ttl_seconds)
+
+
+backend = _create_backend()
+
+
+def _json_response(body: bytes, status: str) -> Response:
+    return Response(content=body, media_type="application/json", headers={"X-Cache": status})
+
+
+async def _fill(key: str, compute: Callable[[], Awaitable[Any]]) -> bytes:
+    """Compute and store, unless another worker already is: then wait for its entry."""
+    lock_key = f"lock:{key}"
+    if not await backend.add(lock_key, b"1", settings.result_cache_lock_seconds):
+        deadline = time.monotonic() + settings.result_cache_lock_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(_POLL_SECONDS)
+            body = await backend.get(key)
+            if body is not None:
+                return body
+        # The computing worker died or is slow: compute here too
+
+    try:
+        body = orjson.dumps(jsonable_encoder(await compute()))
+        await backend.set(key, body, settings.result_cache_ttl_seconds)
+    finally:
+        await backend.delete(lock_key)
+    return body
+
+
+async def cached_response(
+    db: AsyncSession,
+    name: str,
+    user_id,
+    compute: Callable[[], Awaitable[Any]],
+    params: tuple = ()
+) -> Response:
+    """
+    JSON response for `compute()`, served from the cache while the user's
+    data version, `params` and the date are unchanged. With the cache
+    disabled, returns compute()'s result itself.
+    """
+    if not settings.result_cache_enabled:
+        return await compute()
+
+    # Replica reads may lag the primary; never serve them to primary readers
+    use_replica = db.sync_session.info.get("use_replica", False)
+    version = await db.run_sync(data_versions.get_data_version, user_id)
+    parts = [name, str(user_id), str(version), date.today().isoformat()]
+    parts += [str(param) for param in params]
+    if use_replica:
+        parts.append("replica")
+    key = ":".join(parts)
+
+    body = await backend.get(key)
+    if body is not None:
+        return _json_response(body, "hit")
+
+    body = await coalesce.single_flight(db, f"cache:{name}", user_id, lambda: _fill(key, compute), params)
+    return _json_response(body, "miss")
+
+
+def get_result_cache_stats() -> Dict:
+    return {"enabled": settings.result_cache_enabled, "backend": backend.name, **backend.stats()}
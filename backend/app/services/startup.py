@@ -0,0 +1,161 @@
+"""
+Worker startup report and pre-fork preloading.
+The report records how long importing the app and each startup phase took
+in this process, and which of the lazily imported heavy modules are
+loaded; it is logged once per worker and served at /api/admin/startup.
+
+With PRELOAD_IN_MASTER=true, gunicorn.conf.py calls preload() in the
+master before forking: the app, the lazily imported modules and shared
+read-only state (the schema head revision) are loaded once and inherited
+copy-on-write by every worker, so each worker's boot only runs the
+startup hook. That includes the categorizer warm-up: models trained in the
+master are shared by the workers instead of trained once per worker.
+"""
+from typing import Dict
+from contextlib import contextmanager
+import gc
+import json
+import logging
+import os
+import sys
+import time
+
+from app.config import get_settings
+
+settings = get_settings()
+
+logger = logging.getLogger("finpulse.startup")
+
+# Heavy modules kept off the import path of app.main (loaded on first use)
+LAZY_MODULES = (
+    "jose.jwt",
+    "bcrypt",
+    "app.services.ml_categorizer",
+    "app.services.ml_predictor",
+    "pyarrow",
+)
+
+_report = {
+    "import_started": time.perf_counter(),
+    "import_seconds": None,
+    "import_pid": os.getpid(),
+    "preloaded": False,
+    "phases": {},
+}
+
+# Categorizer warm-up; shared with workers when it ran in the preloaded master
+_warmup = {"status": "pending"}
+
+
+def mark_imported():
+    """Called at the end of app.main's module body."""
+    if _report["import_seconds"] is None:
+        _report["import_seconds"] = time.perf_counter() - _report["import_started"]
+
+
+@contextmanager
+def phase(name: str):
+    """Time one startup step."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _report["phases"][name] = time.perf_counter() - start
+
+
+def preload():
+    """Import the app and warm shared state; runs in the gunicorn master."""
+    start = time.perf_counter()
+    import app.main  # noqa: F401
+    from app.schema import head_revision
+
+    for name in LAZY_MODULES:
+        try:
+            __import__(name)
+        except ImportError:  # Optional dependency (pyarrow) not installed
+            pass
+    head_revision()
+    warm_categorizer()
+
+    # Keep the cycle collector from touching (and un-sharing) the pages of
+    # everything loaded so far once workers fork
+    gc.freeze()
+
+    _report["preloaded"] = True
+    _report["preload_seconds"] = time.perf_counter() - start
+
+
+def warm_categorizer():
+    """
+    Train categorizer models for recently active users, unless already done
+    before fork. The categorizer is imported only when someone qualifies.
+    """
+    if _warmup["status"] in ("ready", "disabled"):
+        return
+    if settings.categorizer_warmup_users <= 0:
+        _warmup.update(status="disabled")
+        return
+    from app.database import SessionLocal
+    from app.services.ledger import recently_active_users
+    from app.services.ml_constants import MIN_TRAINING_TRANSACTIONS
+
+    start = time.perf_counter()
+    _warmup.update(status="running", pid=os.getpid())
+    trained = 0
+    with SessionLocal() as db:
+        user_ids = recently_active_users(
+            db, settings.categorizer_warmup_users, settings.categorizer_warmup_days, MIN_TRAINING_TRANSACTIONS
+        )
+        if user_ids:
+            from app.services import ml_categorizer
+
+            trained = ml_categorizer.warm_up(db, user_ids)
+    _warmup.update(
+        status="ready",
+        users=len(user_ids),
+        trained=trained,
+        seconds=round(time.perf_counter() - start, 4)
+    )
+
+
+def get_categorizer_stats() -> Dict:
+    """Categorizer readiness for /health, without importing the categorizer."""
+    warmup = dict(_warmup)
+    if "pid" in warmup:
+        # Warmed in a different process: inherited from the preloaded master
+        warmup["in_master"] = warmup.pop("pid") != os.getpid()
+    module = sys.modules.get("app.services.ml_categorizer")
+    return {
+        "ready": warmup["status"] in ("ready", "disabled"),
+        "warmup": warmup,
+        "models": module.get_model_cache_stats() if module else None
+    }
+
+
+def get_startup_report() -> Dict:
+    pid = os.getpid()
+    report = {
+        "pid": pid,
+        # Imported in a different process: this worker was forked from a preloaded master
+        "preloaded": _report["preloaded"] and _report["import_pid"] != pid,
+        "import_seconds": _report["import_seconds"],
+        "phases": {name: round(seconds, 4) for name, seconds in _report["phases"].items()},
+        "startup_seconds": round(sum(_report["phases"].values()), 4),
+        "modules_loaded": len(sys.modules),
+        "lazy_modules_loaded": [name for name in LAZY_MODULES if name in sys.modules],
+    }
+    if report["import_seconds"] is not None:
+        report["import_seconds"] = round(report["import_seconds"], 4)
+    if "preload_seconds" in _report:
+        report["preload_seconds"] = round(_report["preload_seconds"], 4)
+    return report
+
+
+def log_startup_report():
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    logger.info(json.dumps({"event": "worker_started", **get_startup_report()}))
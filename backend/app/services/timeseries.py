@@ -0,0 +1,155 @@
+"""
+Bucketed income/expense series for dashboard charts.
+One GROUP BY query assigns every transaction to a bucket index; rows
+before the range fall into bucket -1, which becomes the opening balance.
+When the range holds more buckets than max_points, consecutive buckets
+are merged (e.g. 2-week buckets) so a payload never exceeds max_points.
+Users with archived history get the same query against the archive table.
+"""
+from typing import Dict, List
+from collections import defaultdict
+from datetime import date, timedelta
+import math
+
+from sqlalchemy import Integer, case, cast, func, literal, select
+from sqlalchemy.orm import Session
+
+from app.models.archive import ArchivedTransaction, ArchiveState
+from app.models.transaction import Transaction
+from app.services.timing import span
+
+def align_start(start: date, bucket: str) -> date:
+    if bucket == "week":
+        return start - timedelta(days=start.weekday())  # Monday
+    if bucket == "month":
+        return start.replace(day=1)
+    return start
+
+
+def _month_index(day: date) -> int:
+    return day.year * 12 + day.month - 1
+
+
+def _add_months(day: date, months: int) -> date:
+    index = _month_index(day) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _unit_count(start: date, end: date, bucket: str) -> int:
+    """Base buckets (days, weeks or months) from start through end."""
+    if bucket == "month":
+        return _month_index(end) - _month_index(start) + 1
+    days = (end - start).days + 1
+    return math.ceil(days / 7) if bucket == "week" else days
+
+
+def _bucket_offset(dialect: str, start: date, bucket: str, model=Transaction):
+    """SQL expression: base buckets between `start` and the transaction date."""
+    if bucket == "month":
+        if dialect == "postgresql":
+            year = cast(func.extract("year", model.date), Integer)
+            month = cast(func.extract("month", model.date), Integer)
+        else:
+            year = cast(func.strftime("%Y", model.date), Integer)
+            month = cast(func.strftime("%m", model.date), Integer)
+        return year * 12 + month - 1 - _month_index(start)
+
+    if dialect == "postgresql":
+        days = model.date - literal(start)  # date - date is an integer
+    else:
+        days = cast(func.julianday(model.date) - func.julianday(literal(start.isoformat())), Integer)
+    return days // 7 if bucket == "week" else days
+
+
+@span("dashboard.timeseries")
+def build_timeseries(
+    db: Session,
+    user_id,
+    start: date,
+    end: date,
+    bucket: str = "month",
+    split_categories: bool = False,
+    max_points: int = 200
+) -> Dict:
+    """
+    Income, expenses, net and running balance per bucket from start to end
+    (inclusive), optionally with expenses split by category. Amounts in paise.
+    """
+    start = align_start(start, bucket)
+    units = _unit_count(start, end, bucket)
+    size = max(1, math.ceil(units / max_points))  # Base buckets per point
+    points_count = math.ceil(units / size)
+
+    dialect = db.get_bind().dialect.name
+    models = [Transaction]
+    if db.get(ArchiveState, user_id) is not None:
+        models.append(ArchivedTransaction)  # Needed at least for the opening balance
+
+    rows = []
+    for model in models:
+        index = case(
+            (model.date < start, -1),
+            else_=_bucket_offset(dialect, start, bucket, model) // size
+        ).label("bucket")
+
+        columns = [index, model.is_income, func.sum(model.amount).label("total")]
+        group_by = [index, model.is_income]
+        if split_categories:
+            columns.append(model.category)
+            group_by.append(model.category)
+
+        rows += db.execute(
+            select(*columns)
+            .where(model.user_id == user_id, model.date <= end)
+            .group_by(*group_by)
+        ).all()
+
+    opening_balance = 0
+    income = defaultdict(int)
+    expenses = defaultdict(int)
+    categories: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    for row in rows:
+        total = int(row.total or 0)
+        if row.bucket < 0:
+            opening_balance += total if row.is_income else -total
+        elif row.is_income:
+            income[row.bucket] += total
+        else:
+            expenses[row.bucket] += total
+            if split_categories:
+                categories[row.bucket][row.category] += total
+
+    points: List[Dict] = []
+    balance = opening_balance
+    for i in range(points_count):
+        if bucket == "month":
+            point_start = _add_months(start, i * size)
+            point_end = _add_months(point_start, size) - timedelta(days=1)
+        else:
+            days = size * (7 if bucket == "week" else 1)
+            point_start = start + timedelta(days=i * days)
+            point_end = point_start + timedelta(days=days - 1)
+
+        net = income[i] - expenses[i]
+        balance += net
+        point = {
+            "start": point_start,
+            "end": min(point_end, end),
+            "income": income[i],
+            "expenses": expenses[i],
+            "net": net,
+            "balance": balance
+        }
+        if split_categories:
+            point["categories"] = dict(categories[i])
+        points.append(point)
+
+    return {
+        "bucket": bucket,
+        "bucket_size": size,
+        "start": start,
+        "end": end,
+        "opening_balance": opening_balance,
+        "points": points
+    }
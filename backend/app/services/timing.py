@@ -0,0 +1,124 @@
+"""
+Per-request timing: total time, database time and statement count, and
+named service spans. Collected through a context variable so sync service
+code (including code run via AsyncSession.run_sync) reports into the
+request that called it. Outside a request only span durations are kept
+(in the Prometheus histogram).
+"""
+from typing import Dict, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import json
+import logging
+import time
+
+from app.services.metrics import observe_span
+
+logger = logging.getLogger("finpulse.requests")
+
+
+class RequestTimings:
+    """Mutable timing record shared by everything running for one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_time = 0.0
+        self.db_count = 0
+        self.spans: Dict[str, list] = {}  # name -> [seconds, count]
+
+    def add_span(self, name: str, seconds: float):
+        entry = self.spans.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.start
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request() -> RequestTimings:
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str):
+    """
+    Time a named block of service code, e.g. span("categorizer.train").
+    Always feeds the service duration histogram; also reported in the
+    current request's timings when there is one.
+    """
+    timings = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        observe_span(name, seconds)
+        if timings is not None:
+            timings.add_span(name, seconds)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    starts = conn.info.get("query_start")
+    if timings is None or not starts:
+        return
+    timings.db_time += time.perf_counter() - starts.pop()
+    timings.db_count += 1
+
+
+def server_timing_header(timings: RequestTimings) -> str:
+    """Render a Server-Timing header value (durations in milliseconds)."""
+    parts = [
+        f"total;dur={timings.total * 1000:.1f}",
+        f'db;dur={timings.db_time * 1000:.1f};desc="{timings.db_count} queries"',
+    ]
+    for name, (seconds, count) in timings.spans.items():
+        parts.append(f'{name};dur={seconds * 1000:.1f};desc="{count}x"')
+    return ", ".join(parts)
+
+
+def log_request(timings: RequestTimings, method: str, path: str, route: Optional[str], status_code: int):
+    """Emit one JSON line per request on the finpulse.requests logger."""
+    logger.info(json.dumps({
+        "method": method,
+        "path": path,
+        "route": route,
+        "status": status_code,
+        "total_ms": round(timings.total * 1000, 2),
+        "db_ms": round(timings.db_time * 1000, 2),
+        "db_queries": timings.db_count,
+        "spans": {
+            name: {"ms": round(seconds * 1000, 2), "count": count}
+            for name, (seconds, count) in timings.spans.items()
+        }
+    }))
+
+
+def configure_request_log():
+    """Send request lines to stderr even when the root logger is unconfigured."""
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
@@ -0,0 +1,138 @@
+"""
+Change capture for transaction writes.
+Every committed insert, update or delete of a transaction is described as
+an (old, new) pair of snapshots. ORM writes are captured at flush time;
+Core statements (the bulk endpoint) report theirs with record_changes().
+
+Two kinds of handlers consume the changes:
+- commit handlers run inside the committing transaction, after a final
+  flush, so derived tables (spend counters, ledgers) commit atomically
+  with the rows they summarise;
+- after-commit handlers run once the commit succeeded, for side effects
+  such as notifying connected clients.
+"""
+from typing import Callable, List, NamedTuple, Optional
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.transaction import Transaction
+
+
+class TransactionSnapshot(NamedTuple):
+    id: UUID
+    user_id: UUID
+    date: date
+    category: str
+    amount: int  # In paise
+    is_income: bool
+    description: str
+    merchant: Optional[str]
+
+
+class TransactionChange(NamedTuple):
+    old: Optional[TransactionSnapshot]  # None for inserts
+    new: Optional[TransactionSnapshot]  # None for deletes
+
+    @property
+    def user_id(self) -> UUID:
+        return (self.new or self.old).user_id
+
+
+SNAPSHOT_FIELDS = TransactionSnapshot._fields
+
+_commit_handlers: List[Callable] = []
+_after_commit_handlers: List[Callable] = []
+
+
+def on_commit(handler: Callable):
+    """Register handler(session, changes), run in-transaction before COMMIT."""
+    _commit_handlers.append(handler)
+    return handler
+
+
+def after_commit(handler: Callable):
+    """Register handler(session, changes), run after a successful COMMIT."""
+    _after_commit_handlers.append(handler)
+    return handler
+
+
+def snapshot_from_values(values) -> TransactionSnapshot:
+    """Snapshot from a mapping or row with the snapshot fields (is_income may be None)."""
+    if not isinstance(values, dict):
+        values = values._mapping
+    snapshot = TransactionSnapshot(**{field: values.get(field) for field in SNAPSHOT_FIELDS})
+    return snapshot._replace(is_income=bool(snapshot.is_income))
+
+
+def record_changes(session: Session, changes: List[TransactionChange]):
+    """Report changes made with Core statements, which the flush hook can't see."""
+    session.info.setdefault("transaction_changes", []).extend(changes)
+
+
+def _load_before_set(target, value, oldvalue, initiator):
+    pass  # Registered only for active_history
+
+
+# Setting an expired (e.g. just committed) attribute normally skips loading
+# the old value, which would leave no history for the update's old snapshot
+for _field in SNAPSHOT_FIELDS:
+    event.listen(getattr(Transaction, _field), "set", _load_before_set, active_history=True)
+
+
+def _snapshot(obj: Transaction, previous: bool) -> TransactionSnapshot:
+    """Current values, or with previous=True the values before this flush."""
+    state = inspect(obj)
+    values = {}
+    for field in SNAPSHOT_FIELDS:
+        value = getattr(obj, field)
+        if previous:
+            history = state.attrs[field].history
+            if history.deleted:
+                value = history.deleted[0]
+        values[field] = value
+    return snapshot_from_values(values)
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_flushed(session, flush_context):
+    changes = []
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            changes.append(TransactionChange(None, _snapshot(obj, previous=False)))
+    for obj in session.dirty:
+        if isinstance(obj, Transaction) and session.is_modified(obj, include_collections=False):
+            old, new = _snapshot(obj, previous=True), _snapshot(obj, previous=False)
+            if old != new:
+                changes.append(TransactionChange(old, new))
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            changes.append(TransactionChange(_snapshot(obj, previous=True), None))
+    if changes:
+        record_changes(session, changes)
+
+
+@event.listens_for(Session, "before_commit")
+def _run_commit_handlers(session):
+    if not _commit_handlers:
+        return
+    session.flush()  # Pending ORM writes report their changes now
+    changes = session.info.get("transaction_changes")
+    if changes:
+        for handler in _commit_handlers:
+            handler(session, changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_handlers(session):
+    changes = session.info.pop("transaction_changes", None)
+    if changes:
+        for handler in _after_commit_handlers:
+            handler(session, changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("transaction_changes", None)
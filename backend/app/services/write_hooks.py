@@ -0,0 +1,17 @@
+"""
+Registers every write-path hook. Each module below attaches its handlers
+(SQLAlchemy session listeners, transaction_changes on_commit/after_commit)
+when imported. The app package imports this module before anything else,
+so any process that uses app.* - the API, scripts, background workers -
+keeps the balance ledger, month summaries, budget alerts, data versions
+and live deltas in step with its writes, whichever module it imports first.
+"""
+from app.services import (
+    budget_alerts,
+    dashboard_deltas,
+    data_versions,
+    ledger,
+    month_summaries,
+)
+
+__all__ = ["budget_alerts", "dashboard_deltas", "data_versions", "ledger", "month_summaries"]
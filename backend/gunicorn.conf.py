@@ -0,0 +1,44 @@
+"""
+Gunicorn settings picked up automatically from the working directory.
+Prepares the shared directory prometheus_client uses to aggregate
+metrics across workers, and cleans up after workers that exit. With
+PRELOAD_IN_MASTER=true the master loads the app before forking
+(app/services/startup.py).
+"""
+import os
+import shutil
+import tempfile
+
+
+def on_starting(server):
+    """Runs in the master before any worker is forked."""
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not metrics_dir:
+        metrics_dir = os.path.join(tempfile.gettempdir(), "finpulse-metrics")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+
+    # Stale files from a previous run would be counted as live data
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+    # After the metrics directory is set: metrics are created at import
+    from app.config import get_settings
+    if get_settings().preload_in_master:
+        from app.services.startup import preload
+        preload()
+        server.log.info("Preloaded app in master")
+
+
+def post_fork(server, worker):
+    """Connections opened by the master's preload must not be shared with workers."""
+    from app.config import get_settings
+    if get_settings().preload_in_master:
+        from app.database import engine, async_engine
+        engine.dispose(close=False)
+        async_engine.sync_engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """Drop the exited worker's live gauges from the aggregate."""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
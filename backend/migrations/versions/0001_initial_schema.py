@@ -0,0 +1,81 @@
+"""Initial schema: the users, transactions and budgets tables create_all built before migrations.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('users',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_table('budgets',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('monthly_limit', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'category', 'month', name='unique_user_category_month')
+    )
+    op.create_index('ix_budgets_user_id', 'budgets', ['user_id'])
+    op.create_table('transactions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('merchant', sa.String(length=255), nullable=True),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('is_income', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('category_confidence', sa.Integer(), nullable=True),
+    sa.Column('is_category_overridden', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_user_category', 'transactions', ['user_id', 'category'])
+    op.create_index('idx_user_date', 'transactions', ['user_id', 'date'])
+    op.create_index('idx_user_date_income', 'transactions', ['user_id', 'date', 'is_income'])
+    op.create_index('ix_transactions_category', 'transactions', ['category'])
+    op.create_index('ix_transactions_date', 'transactions', ['date'])
+    op.create_index('ix_transactions_user_id', 'transactions', ['user_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_user_id', table_name='transactions')
+    op.drop_index('ix_transactions_date', table_name='transactions')
+    op.drop_index('ix_transactions_category', table_name='transactions')
+    op.drop_index('idx_user_date_income', table_name='transactions')
+    op.drop_index('idx_user_date', table_name='transactions')
+    op.drop_index('idx_user_category', table_name='transactions')
+    op.drop_table('transactions')
+    op.drop_index('ix_budgets_user_id', table_name='budgets')
+    op.drop_table('budgets')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
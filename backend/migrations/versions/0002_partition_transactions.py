@@ -0,0 +1,141 @@
+"""Partition transactions by date range on PostgreSQL.
+
+Rebuilds `transactions` as a table partitioned by RANGE (date), one
+partition per month or quarter (TRANSACTION_PARTITION_INTERVAL) from the
+oldest row through a few periods ahead, plus a default partition. The
+primary key becomes (id, date) because PostgreSQL requires the partition
+key in every unique index; each partition also gets a unique index on id.
+SQLite keeps the plain table.
+
+The partition DDL is inlined rather than imported from
+app/services/partitions.py, so this revision keeps doing what it did when
+it was written. Names and bounds must match that module's.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+from datetime import date
+import os
+
+from alembic import op
+from dotenv import dotenv_values
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEFAULT_PARTITION = "transactions_default"
+
+COLUMNS = (
+    "id, user_id, date, amount, description, merchant, category, is_income, "
+    "created_at, updated_at, category_confidence, is_category_overridden"
+)
+
+
+def _create_table(**kwargs):
+    op.create_table('transactions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('merchant', sa.String(length=255), nullable=True),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('is_income', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('category_confidence', sa.Integer(), nullable=True),
+    sa.Column('is_category_overridden', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    **kwargs
+    )
+
+
+def _create_indexes():
+    # Built after the copy (and after the old table's indexes are gone with it)
+    op.create_index('idx_user_category', 'transactions', ['user_id', 'category'])
+    op.create_index('idx_user_date', 'transactions', ['user_id', 'date'])
+    op.create_index('idx_user_date_income', 'transactions', ['user_id', 'date', 'is_income'])
+    op.create_index('ix_transactions_category', 'transactions', ['category'])
+    op.create_index('ix_transactions_date', 'transactions', ['date'])
+    op.create_index('ix_transactions_user_id', 'transactions', ['user_id'])
+
+
+def _setting(name: str, default: str) -> str:
+    """Same precedence as app.config: the environment, then .env."""
+    return os.environ.get(name) or dotenv_values(".env").get(name) or default
+
+
+def _next_period(start: date, interval: str) -> date:
+    index = start.year * 12 + start.month - 1 + (3 if interval == "quarter" else 1)
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partitions(since: date):
+    """One partition per period from `since` through a few periods past today."""
+    interval = _setting("TRANSACTION_PARTITION_INTERVAL", "month").lower()
+    ahead = int(_setting("TRANSACTION_PARTITIONS_AHEAD", "3"))
+
+    def period_start(day: date) -> date:
+        if interval == "quarter":
+            return date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+        return day.replace(day=1)
+
+    last = period_start(date.today())
+    for _ in range(ahead):
+        last = _next_period(last, interval)
+
+    start = period_start(since)
+    while start <= last:
+        if interval == "quarter":
+            name = f"transactions_y{start.year}q{(start.month - 1) // 3 + 1}"
+        else:
+            name = f"transactions_y{start.year}m{start.month:02d}"
+        end = _next_period(start, interval)
+        op.execute(
+            f"CREATE TABLE {name} PARTITION OF transactions "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        op.execute(f"CREATE UNIQUE INDEX {name}_id_key ON {name} (id)")
+        start = end
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.rename_table('transactions', 'transactions_unpartitioned')
+    _create_table(postgresql_partition_by='RANGE (date)')
+    op.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF transactions DEFAULT")
+    op.execute(f"CREATE UNIQUE INDEX {DEFAULT_PARTITION}_id_key ON {DEFAULT_PARTITION} (id)")
+
+    oldest = bind.execute(sa.text("SELECT min(date) FROM transactions_unpartitioned")).scalar()
+    _create_partitions(oldest or date.today())
+
+    op.execute(f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM transactions_unpartitioned")
+    op.drop_table('transactions_unpartitioned')
+    op.create_primary_key('transactions_pkey', 'transactions', ['id', 'date'])
+    _create_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.rename_table('transactions', 'transactions_partitioned')
+    _create_table()
+
+    op.execute(f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM transactions_partitioned")
+    op.drop_table('transactions_partitioned')  # Drops every partition with it
+    op.create_primary_key('transactions_pkey', 'transactions', ['id'])
+    _create_indexes()
@@ -0,0 +1,116 @@
+"""Tables for derived data: balance ledger, spend counters and alerts, month summaries and the archive.
+
+They were added while the schema was still built by create_all, so a
+database stamped at the 0001 baseline gets them here. Tables that already
+exist (created by an earlier draft of 0001) are left alone.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'archive_states' not in existing:
+        op.create_table('archive_states',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('archived_before', sa.Date(), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('expense_by_category', sa.JSON(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+        )
+    if 'budget_alert_events' not in existing:
+        op.create_table('budget_alert_events',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('threshold', sa.Integer(), nullable=False),
+        sa.Column('alert_level', sa.String(length=20), nullable=False),
+        sa.Column('spent', sa.Integer(), nullable=False),
+        sa.Column('monthly_limit', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('idx_alert_user_created', 'budget_alert_events', ['user_id', 'created_at'])
+    if 'category_month_spend' not in existing:
+        op.create_table('category_month_spend',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'category', 'month')
+        )
+    if 'month_summaries' not in existing:
+        op.create_table('month_summaries',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('income_total', sa.BigInteger(), nullable=False),
+        sa.Column('income_count', sa.Integer(), nullable=False),
+        sa.Column('expense_total', sa.BigInteger(), nullable=False),
+        sa.Column('expense_count', sa.Integer(), nullable=False),
+        sa.Column('categories', sa.JSON(), nullable=False),
+        sa.Column('budgets', sa.JSON(), nullable=False),
+        sa.Column('closed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'month')
+        )
+    if 'transactions_archive' not in existing:
+        op.create_table('transactions_archive',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('merchant', sa.String(length=255), nullable=True),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('is_income', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('category_confidence', sa.Integer(), nullable=True),
+        sa.Column('is_category_overridden', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('idx_archive_user_date', 'transactions_archive', ['user_id', 'date'])
+    if 'user_balances' not in existing:
+        op.create_table('user_balances',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('total_income', sa.BigInteger(), nullable=False),
+        sa.Column('total_expense', sa.BigInteger(), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('first_date', sa.Date(), nullable=True),
+        sa.Column('last_date', sa.Date(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_balances')
+    op.drop_index('idx_archive_user_date', table_name='transactions_archive')
+    op.drop_table('transactions_archive')
+    op.drop_table('month_summaries')
+    op.drop_table('category_month_spend')
+    op.drop_index('idx_alert_user_created', table_name='budget_alert_events')
+    op.drop_table('budget_alert_events')
+    op.drop_table('archive_states')
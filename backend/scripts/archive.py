@@ -0,0 +1,52 @@
+"""
+Move transactions older than ARCHIVE_AFTER_MONTHS into transactions_archive.
+Each user is archived and committed separately, after their months are
+closed into month_summaries, so totals, budgets and forecasts are unchanged.
+Safe to run repeatedly (e.g. monthly from cron).
+
+Usage (from backend/):
+    python -m scripts.archive
+    python -m scripts.archive --email a@example.com
+"""
+import argparse
+import time
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.schema import verify_schema
+from app.models import User
+from app.services.archive import archivable_users, archive_cutoff, archive_user
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old transactions")
+    parser.add_argument("--email", action="append", help="Limit to these users (repeatable)")
+    args = parser.parse_args()
+
+    cutoff = archive_cutoff()
+    if cutoff is None:
+        raise SystemExit("Archiving is disabled (ARCHIVE_AFTER_MONTHS=0)")
+
+    verify_schema()
+    started = time.perf_counter()
+
+    with SessionLocal() as db:
+        user_ids = None
+        if args.email:
+            user_ids = list(db.scalars(select(User.id).where(User.email.in_(args.email))))
+            if not user_ids:
+                raise SystemExit("No matching users")
+
+        users = archivable_users(db, cutoff, user_ids)
+        moved = 0
+        for user_id in users:
+            moved += archive_user(db, user_id, cutoff)
+            db.commit()
+
+    print(f"Archived {moved} transactions before {cutoff} for {len(users)} users "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+HTTP benchmark harness for a running FinPulse API.
+Logs in as seeded users (see scripts/seed.py), drives each scenario at a
+fixed concurrency and reports throughput and latency percentiles, compared
+against a stored baseline.
+
+Usage (from backend/, with the API running, e.g. `uvicorn app.main:app`):
+    python -m scripts.benchmark --requests 300 --concurrency 16
+    python -m scripts.benchmark --save-baseline          # record a new baseline
+    python -m scripts.benchmark --fail-on-regression     # exit 1 on regression (CI)
+"""
+from typing import Callable, Dict, List
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+import httpx
+
+from scripts.seed import PASSWORD, user_email
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+
+SEARCH_TERMS = ["swiggy", "uber", "amazon", "netflix", "salary", "bill"]
+
+
+def _import_csv(rng: random.Random) -> bytes:
+    rows = ["date,amount,description,category,merchant"]
+    for _ in range(20):
+        rows.append(f"2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)},{rng.randint(50, 3000)}.00,Bench import,Shopping,Amazon")
+    return ("\n".join(rows) + "\n").encode()
+
+
+# name -> builds (method, path, request kwargs)
+SCENARIOS: Dict[str, Callable] = {
+    "dashboard": lambda rng: ("GET", "/api/dashboard/summary", {}),
+    "list": lambda rng: ("GET", "/api/transactions", {"params": {"page": rng.randint(1, 20), "page_size": 50}}),
+    "search": lambda rng: ("GET", "/api/transactions", {"params": {"search": rng.choice(SEARCH_TERMS)}}),
+    "budget_status": lambda rng: ("GET", "/api/budgets/status", {}),
+    "predictions": lambda rng: ("GET", "/api/predictions/insights", {}),
+    "import": lambda rng: ("POST", "/api/transactions/import", {"files": {"file": ("bench.csv", _import_csv(rng), "text/csv")}}),
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def login_users(client: httpx.AsyncClient, users: int) -> List[str]:
+    tokens = []
+    for index in range(users):
+        response = await client.post("/api/auth/login", json={"email": user_email(index), "password": PASSWORD})
+        if response.status_code != 200:
+            raise SystemExit(f"Login failed for {user_email(index)}: {response.status_code}. Run scripts.seed first.")
+        tokens.append(response.json()["access_token"])
+    return tokens
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, tokens: List[str], requests: int, concurrency: int, seed: int) -> Dict:
+    build = SCENARIOS[name]
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            method, path, kwargs = build(rng)
+            headers = {"Authorization": f"Bearer {rng.choice(tokens)}"}
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, headers=headers, **kwargs)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions: throughput down or p99 up by more than `tolerance` (fraction)."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} rps")
+        if current["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {previous['p99_ms']} -> {current['p99_ms']} ms")
+    return regressions
+
+
+def print_report(results: Dict, baseline: Dict):
+    header = f"{'scenario':<14}{'rps':>8}{'p50':>9}{'p90':>9}{'p99':>9}{'errors':>8}   vs baseline (rps / p99)"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        delta = ""
+        if previous and previous["throughput_rps"] and previous["p99_ms"]:
+            rps_change = (r["throughput_rps"] / previous["throughput_rps"] - 1) * 100
+            p99_change = (r["p99_ms"] / previous["p99_ms"] - 1) * 100
+            delta = f"{rps_change:+.0f}% / {p99_change:+.0f}%"
+        print(f"{name:<14}{r['throughput_rps']:>8}{r['p50_ms']:>9}{r['p90_ms']:>9}{r['p99_ms']:>9}{r['errors']:>8}   {delta}")
+
+
+async def run(args) -> int:
+    scenarios = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)}")
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        tokens = await login_users(client, args.users)
+        results = {}
+        for name in scenarios:
+            # Short warm-up so first-request effects (model training, pool fill) don't skew numbers
+            await run_scenario(client, name, tokens, args.concurrency, args.concurrency, args.seed)
+            results[name] = await run_scenario(client, name, tokens, args.requests, args.concurrency, args.seed)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"{args.requests} requests per scenario, concurrency {args.concurrency}, {args.users} users\n")
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "users": args.users,
+                "scenarios": results
+            }, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions beyond tolerance:")
+        for line in regressions:
+            print(f"  {line}")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a running FinPulse API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=10, help="Seeded users to log in as")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenarios", default="", help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression as a fraction (0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Local stand-in for a Redis server, for developing and testing the "redis"
+result cache backend without installing Redis. It speaks enough of the
+Redis protocol (RESP2) for the commands the backend sends, keeps keys in
+memory with millisecond expiry, and evicts the least recently used key
+beyond --max-keys. Not for production.
+
+Usage (from backend/):
+    python -m scripts.cache_server
+    python -m scripts.cache_server --port 6380 --max-keys 1000
+
+Then run the API with RESULT_CACHE_BACKEND=redis (and RESULT_CACHE_URL
+pointing at the port if it isn't 6379).
+"""
+from typing import List, Optional
+from collections import OrderedDict
+import argparse
+import asyncio
+import time
+
+
+class Store:
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.entries: "OrderedDict[bytes, tuple]" = OrderedDict()  # key -> (value, expires_at or None)
+        self.evicted = 0
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: bytes) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def store(self, key: bytes, value: bytes, expires_at: Optional[float]):
+        self.entries[key] = (value, expires_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_keys:
+            self.entries.popitem(last=False)
+            self.evicted += 1
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _error(message: str) -> bytes:
+    return f"-ERR {message}\r\n".encode()
+
+
+def execute(store: Store, args: List[bytes]) -> bytes:
+    command = args[0].upper()
+    if command == b"PING":
+        return b"+PONG\r\n"
+
+    if command == b"GET":
+        value = store.lookup(args[1])
+        if value is None:
+            store.misses += 1
+        else:
+            store.hits += 1
+        return _bulk(value)
+
+    if command == b"SET":
+        key, value, options = args[1], args[2], [arg.upper() for arg in args[3:]]
+        expires_at = None
+        if b"PX" in options:
+            expires_at = time.monotonic() + int(args[3 + options.index(b"PX") + 1]) / 1000
+        elif b"EX" in options:
+            expires_at = time.monotonic() + int(args[3 + options.index(b"EX") + 1])
+        if b"NX" in options and store.lookup(key) is not None:
+            return _bulk(None)
+        store.store(key, value, expires_at)
+        return b"+OK\r\n"
+
+    if command == b"DEL":
+        removed = 0
+        for key in args[1:]:
+            if store.lookup(key) is not None:
+                del store.entries[key]
+                removed += 1
+        return b":%d\r\n" % removed
+
+    if command in (b"INCR", b"INCRBY"):
+        current = store.lookup(args[1])
+        expires_at = store.entries[args[1]][1] if current is not None else None
+        try:
+            number = int(current or 0) + (int(args[2]) if command == b"INCRBY" else 1)
+        except ValueError:
+            return _error("value is not an integer or out of range")
+        store.store(args[1], str(number).encode(), expires_at)
+        return b":%d\r\n" % number
+
+    if command in (b"PEXPIRE", b"EXPIRE"):
+        value = store.lookup(args[1])
+        if value is None:
+            return b":0\r\n"
+        seconds = int(args[2]) / (1000 if command == b"PEXPIRE" else 1)
+        store.store(args[1], value, time.monotonic() + seconds)
+        return b":1\r\n"
+
+    if command == b"FLUSHDB":
+        store.entries.clear()
+        return b"+OK\r\n"
+
+    if command == b"INFO":
+        info = (
+            f"# Stats\r\nkeyspace_hits:{store.hits}\r\nkeyspace_misses:{store.misses}\r\n"
+            f"evicted_keys:{store.evicted}\r\n# Keyspace\r\ndb0:keys={len(store.entries)}\r\n"
+        )
+        return _bulk(info.encode())
+
+    # CLIENT SETINFO and friends: clients treat an error reply as "not supported"
+    return _error(f"unknown command '{command.decode(errors='replace')}'")
+
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    """One RESP array of bulk strings (what clients send), or None at EOF."""
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        return line.split()  # Inline command, e.g. from telnet
+    args = []
+    for _ in range(int(line[1:])):
+        length = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(length + 2))[:-2])
+    return args
+
+
+async def serve(store: Store, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            args = await read_command(reader)
+            if args is None:
+                break
+            if args:
+                writer.write(execute(store, args))
+                await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run(host: str, port: int, max_keys: int):
+    store = Store(max_keys)
+    server = await asyncio.start_server(lambda r, w: serve(store, r, w), host, port)
+    print(f"Cache stand-in listening on {host}:{port} (max {max_keys} keys)")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Redis-protocol stand-in for the result cache")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--max-keys", type=int, default=100000, help="LRU eviction beyond this many keys")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args.host, args.port, args.max_keys))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Close completed months: write a MonthSummary for every past month that has
+transactions but no summary yet. Safe to run repeatedly (e.g. daily from
+cron); already closed months are skipped, and late edits to a closed month
+are folded into its summary by the write path.
+
+Usage (from backend/):
+    python -m scripts.close_months
+    python -m scripts.close_months --email a@example.com
+"""
+import argparse
+import time
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.schema import verify_schema
+from app.models import User
+from app.services.month_summaries import close_months
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise completed months")
+    parser.add_argument("--email", action="append", help="Limit to these users (repeatable)")
+    args = parser.parse_args()
+
+    verify_schema()
+    started = time.perf_counter()
+
+    with SessionLocal() as db:
+        user_ids = None
+        if args.email:
+            user_ids = list(db.scalars(select(User.id).where(User.email.in_(args.email))))
+            if not user_ids:
+                raise SystemExit("No matching users")
+
+        count = close_months(db, user_ids)
+        db.commit()
+        print(f"Closed {count} months in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
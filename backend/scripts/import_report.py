@@ -0,0 +1,65 @@
+"""
+Import-time report for the API: what importing app.main costs a fresh
+worker, by package and by module (python -X importtime underneath), and
+whether any module that should load lazily was pulled in at import.
+
+Usage (from backend/):
+    python -m scripts.import_report
+    python -m scripts.import_report --top 30
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from app.services.startup import LAZY_MODULES
+
+
+def measure():
+    """[(module, self_us, cumulative_us)] in import order."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    if result.returncode != 0:
+        raise SystemExit(result.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report what importing the API costs")
+    parser.add_argument("--top", type=int, default=15, help="Rows per table")
+    args = parser.parse_args()
+
+    rows = measure()
+    total = sum(self_us for _, self_us, _ in rows)
+    print(f"import app.main: {total / 1000:.1f} ms, {len(rows)} modules\n")
+
+    packages = defaultdict(int)
+    for name, self_us, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    print("By package (self time):")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+    print("\nApp modules (cumulative):")
+    app_rows = [row for row in rows if row[0].startswith("app.")]
+    for name, _, cumulative_us in sorted(app_rows, key=lambda row: -row[2])[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    imported = {name for name, _, _ in rows}
+    eager = [name for name in LAZY_MODULES if name in imported]
+    print("\nLazy modules imported at startup:", ", ".join(eager) if eager else "none")
+    raise SystemExit(1 if eager else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Verify or rebuild the per-user balance ledger (user_balances).
+Writes that bypass the API session (manual SQL, scripts/seed.py) are not
+reflected in the ledger; `verify` reports any drift and `rebuild`
+recomputes rows from the transactions table.
+
+Usage (from backend/):
+    python -m scripts.ledger verify               # exit 1 if any row drifted
+    python -m scripts.ledger rebuild              # all users
+    python -m scripts.ledger rebuild --email a@example.com
+"""
+import argparse
+import time
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.schema import verify_schema
+from app.models import User
+from app.services.ledger import rebuild_ledger, verify_ledger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify or rebuild the balance ledger")
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    parser.add_argument("--email", action="append", help="Limit to these users (repeatable)")
+    args = parser.parse_args()
+
+    verify_schema()
+    started = time.perf_counter()
+
+    with SessionLocal() as db:
+        user_ids = None
+        if args.email:
+            user_ids = list(db.scalars(select(User.id).where(User.email.in_(args.email))))
+            if not user_ids:
+                raise SystemExit("No matching users")
+
+        if args.command == "verify":
+            drift = verify_ledger(db, user_ids)
+            for item in drift:
+                print(f"{item['user_id']} {item['field']}: ledger={item['ledger']} actual={item['actual']}")
+            users = len({item["user_id"] for item in drift})
+            print(f"{users} users with drift ({time.perf_counter() - started:.1f}s)")
+            raise SystemExit(1 if drift else 0)
+
+        rows = rebuild_ledger(db, user_ids)
+        db.commit()
+        print(f"Rebuilt {rows} ledger rows in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
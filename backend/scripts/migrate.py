@@ -0,0 +1,39 @@
+"""
+Apply database migrations. Run once per deploy, before starting the API
+(the Procfile's release phase does this); workers refuse to start on an
+out-of-date schema instead of creating tables themselves.
+
+Usage (from backend/):
+    python -m scripts.migrate             # upgrade to the latest revision
+    python -m scripts.migrate --check     # exit 1 if migrations are pending
+    python -m scripts.migrate --revision 0001
+"""
+import argparse
+import time
+
+from app.database import engine
+from app.schema import current_revision, head_revision, migrate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply database migrations")
+    parser.add_argument("--revision", default="head", help="Target revision (default: head)")
+    parser.add_argument("--check", action="store_true", help="Only report whether migrations are pending")
+    args = parser.parse_args()
+
+    if args.check:
+        with engine.connect() as connection:
+            current = current_revision(connection)
+        head = head_revision()
+        print(f"Database at {current or '(none)'}, latest is {head}")
+        raise SystemExit(0 if current == head else 1)
+
+    started = time.perf_counter()
+    before = migrate(args.revision)
+    with engine.connect() as connection:
+        after = current_revision(connection)
+    print(f"Migrated {before or '(empty)'} -> {after} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
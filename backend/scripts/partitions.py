@@ -0,0 +1,33 @@
+"""
+Create upcoming monthly/quarterly partitions of `transactions` (PostgreSQL).
+The API does this at startup too; run it from cron when workers can stay
+up for longer than TRANSACTION_PARTITIONS_AHEAD periods.
+
+Usage (from backend/):
+    python -m scripts.partitions
+    python -m scripts.partitions --ahead 12
+"""
+import argparse
+
+from app.database import engine
+from app.services.partitions import ensure_partitions, existing_partitions, is_partitioned
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create upcoming transaction partitions")
+    parser.add_argument("--ahead", type=int, help="Periods past the current one (default: TRANSACTION_PARTITIONS_AHEAD)")
+    args = parser.parse_args()
+
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            raise SystemExit("transactions is not partitioned (PostgreSQL, after alembic upgrade head)")
+        created = ensure_partitions(connection, ahead=args.ahead)
+        total = len(existing_partitions(connection))
+
+    for name in created:
+        print(f"Created {name}")
+    print(f"{len(created)} created, {total} partitions in total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Scale data seeder for load testing.
+Generates N users x M transactions plus monthly budgets with bulk inserts,
+straight into DATABASE_URL (bypassing the API).
+
+Usage (from backend/):
+    python -m scripts.seed --users 50 --transactions 2000 --months 24
+All seeded users share the password printed at the end.
+"""
+from datetime import date, datetime, timedelta
+import argparse
+import random
+import time
+import uuid
+
+from sqlalchemy import delete, insert, select
+
+from app.database import engine
+from app.schema import verify_schema
+from app.models import User, Transaction, Budget, CategoryMonthSpend, BudgetAlertEvent, UserBalance, MonthSummary, ArchivedTransaction, ArchiveState
+from app.models.transaction import TRANSACTION_CATEGORIES
+from app.services.auth import get_password_hash
+
+EMAIL_PREFIX = "bench-user-"
+EMAIL_DOMAIN = "example.com"
+PASSWORD = "benchmark123"
+BATCH_SIZE = 5000
+
+# (description, merchant, typical amount in rupees) per category
+MERCHANTS = {
+    "Food & Dining": [("Swiggy order", "Swiggy", 450), ("Zomato order", "Zomato", 520), ("Cafe Coffee Day", "CCD", 250)],
+    "Transport": [("Uber trip", "Uber", 320), ("Ola ride", "Ola", 280), ("Metro card recharge", "DMRC", 500)],
+    "Shopping": [("Amazon purchase", "Amazon", 1800), ("Flipkart order", "Flipkart", 1500), ("Myntra order", "Myntra", 2200)],
+    "Bills & Utilities": [("Electricity bill", "BESCOM", 1900), ("Airtel postpaid", "Airtel", 799), ("Broadband", "ACT", 1100)],
+    "Entertainment": [("Netflix subscription", "Netflix", 649), ("BookMyShow tickets", "BookMyShow", 700)],
+    "Healthcare": [("Apollo pharmacy", "Apollo", 600), ("Doctor consultation", "Practo", 800)],
+    "Travel": [("IndiGo flight", "IndiGo", 6500), ("MakeMyTrip hotel", "MakeMyTrip", 4500)],
+    "Other": [("ATM withdrawal", None, 2000), ("Gift", None, 1500)],
+}
+EXPENSE_CATEGORIES = [c for c in TRANSACTION_CATEGORIES if c != "Income"]
+
+
+def user_email(index: int) -> str:
+    return f"{EMAIL_PREFIX}{index}@{EMAIL_DOMAIN}"
+
+
+def first_of_month(day: date, months_back: int = 0) -> date:
+    month_index = day.year * 12 + day.month - 1 - months_back
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def generate_transactions(user_id, count: int, months: int, rng: random.Random):
+    """About one income row per ten; amounts vary +/-60% around each merchant's typical value."""
+    today = date.today()
+    span_days = months * 30
+    now = datetime.utcnow()
+
+    for _ in range(count):
+        txn_date = today - timedelta(days=rng.randrange(span_days))
+        if rng.random() < 0.1:
+            yield {
+                "id": uuid.uuid4(), "user_id": user_id, "date": txn_date,
+                "amount": rng.randrange(3_000_000, 12_000_000),
+                "description": "Salary credit", "merchant": "Employer",
+                "category": "Income", "is_income": True,
+                "created_at": now, "updated_at": now, "is_category_overridden": False,
+            }
+            continue
+
+        category = rng.choice(EXPENSE_CATEGORIES)
+        description, merchant, typical = rng.choice(MERCHANTS[category])
+        amount = max(100, int(typical * rng.uniform(0.4, 1.6) * 100))
+        yield {
+            "id": uuid.uuid4(), "user_id": user_id, "date": txn_date,
+            "amount": amount, "description": description, "merchant": merchant,
+            "category": category, "is_income": False,
+            "created_at": now, "updated_at": now, "is_category_overridden": False,
+        }
+
+
+def reset(conn):
+    """Remove previously seeded users and their data."""
+    user_ids = [row.id for row in conn.execute(select(User.id).where(User.email.like(f"{EMAIL_PREFIX}%")))]
+    for start in range(0, len(user_ids), 500):
+        chunk = user_ids[start:start + 500]
+        conn.execute(delete(Transaction).where(Transaction.user_id.in_(chunk)))
+        conn.execute(delete(Budget).where(Budget.user_id.in_(chunk)))
+        conn.execute(delete(CategoryMonthSpend).where(CategoryMonthSpend.user_id.in_(chunk)))
+        conn.execute(delete(BudgetAlertEvent).where(BudgetAlertEvent.user_id.in_(chunk)))
+        conn.execute(delete(UserBalance).where(UserBalance.user_id.in_(chunk)))
+        conn.execute(delete(MonthSummary).where(MonthSummary.user_id.in_(chunk)))
+        conn.execute(delete(ArchivedTransaction).where(ArchivedTransaction.user_id.in_(chunk)))
+        conn.execute(delete(ArchiveState).where(ArchiveState.user_id.in_(chunk)))
+        conn.execute(delete(User).where(User.id.in_(chunk)))
+    return len(user_ids)
+
+
+def seed(users: int, transactions: int, months: int, budget_months: int, seed_value: int):
+    rng = random.Random(seed_value)
+    verify_schema()
+    password_hash = get_password_hash(PASSWORD)  # bcrypt once, shared by all seeded users
+    started = time.perf_counter()
+
+    with engine.begin() as conn:
+        removed = reset(conn)
+        if removed:
+            print(f"Removed {removed} previously seeded users")
+
+        now = datetime.utcnow()
+        user_rows = [
+            {"id": uuid.uuid4(), "email": user_email(i), "password_hash": password_hash,
+             "is_active": True, "created_at": now, "updated_at": now}
+            for i in range(users)
+        ]
+        conn.execute(insert(User), user_rows)
+
+        total = 0
+        for user in user_rows:
+            batch = []
+            for row in generate_transactions(user["id"], transactions, months, rng):
+                batch.append(row)
+                if len(batch) >= BATCH_SIZE:
+                    conn.execute(insert(Transaction), batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                conn.execute(insert(Transaction), batch)
+                total += len(batch)
+
+        budget_rows = [
+            {"id": uuid.uuid4(), "user_id": user["id"], "category": category,
+             "monthly_limit": rng.randrange(200_000, 2_000_000, 10_000),
+             "month": first_of_month(date.today(), back), "created_at": now, "updated_at": now}
+            for user in user_rows
+            for back in range(budget_months)
+            for category in EXPENSE_CATEGORIES
+        ]
+        conn.execute(insert(Budget), budget_rows)
+
+    elapsed = time.perf_counter() - started
+    print(f"Seeded {users} users, {total} transactions, {len(budget_rows)} budgets in {elapsed:.1f}s")
+    print(f"Login as {user_email(0)} ... {user_email(users - 1)} with password '{PASSWORD}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed FinPulse with synthetic load-test data")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--transactions", type=int, default=1000, help="Transactions per user")
+    parser.add_argument("--months", type=int, default=24, help="History length in months")
+    parser.add_argument("--budget-months", type=int, default=3, help="Months of budgets per user")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducible data")
+    args = parser.parse_args()
+    seed(args.users, args.transactions, args.months, args.budget_months, args.seed)
+
+
+if __name__ == "__main__":
+    main()
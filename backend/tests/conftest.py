@@ -0,0 +1,39 @@
+"""
+Test fixtures: a throwaway SQLite database migrated to head, and a fresh
+user per test. DATABASE_URL must be set before anything imports app.*.
+"""
+import os
+import tempfile
+import uuid
+
+import pytest
+
+_db_dir = tempfile.mkdtemp(prefix="finpulse-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+
+from app.database import SessionLocal  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schema import migrate  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    migrate()
+    yield
+
+
+@pytest.fixture
+def session():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def user(session):
+    user = User(email=f"{uuid.uuid4().hex}@example.com", password_hash="x")
+    session.add(user)
+    session.commit()
+    return user
@@ -0,0 +1,183 @@
+"""
+Derived tables stay in step with transaction writes: the balance ledger,
+the per-category month spend counters and closed-month summaries, across
+ORM writes, Core (bulk) statements and archiving.
+"""
+import uuid
+from collections import defaultdict
+from datetime import date, timedelta
+
+from sqlalchemy import delete, insert, select, update
+
+from app.models.archive import ArchivedTransaction
+from app.models.spend import CategoryMonthSpend
+from app.models.summary import MonthSummary
+from app.models.transaction import Transaction
+from app.services.archive import archive_user
+from app.services.data_versions import mark_user_data_changed
+from app.services.ledger import verify_ledger
+from app.services.month_summaries import close_months, current_month
+from app.services.transaction_changes import TransactionChange, record_changes, snapshot_from_values
+
+THIS_MONTH = current_month()
+LAST_MONTH = (THIS_MONTH - timedelta(days=1)).replace(day=1)
+OLDER_MONTH = (LAST_MONTH - timedelta(days=1)).replace(day=1)
+
+
+def add(session, user, day: date, amount: int, category: str = "Transport", is_income: bool = False) -> Transaction:
+    transaction = Transaction(
+        user_id=user.id, date=day, amount=amount, category=category,
+        is_income=is_income, description=f"{category} {amount}"
+    )
+    session.add(transaction)
+    return transaction
+
+
+def expected_spend(session, user_id) -> dict:
+    """Expenses per (category, month) summed over hot and archived rows."""
+    totals = defaultdict(int)
+    for model in (Transaction, ArchivedTransaction):
+        rows = session.execute(
+            select(model.category, model.date, model.amount)
+            .where(model.user_id == user_id, model.is_income == False)
+        )
+        for category, day, amount in rows:
+            totals[(category, day.replace(day=1))] += amount
+    return dict(totals)
+
+
+def counters(session, user_id) -> dict:
+    rows = session.scalars(select(CategoryMonthSpend).where(CategoryMonthSpend.user_id == user_id))
+    return {(row.category, row.month): row.amount for row in rows}
+
+
+def assert_in_step(session, user):
+    assert verify_ledger(session, [user.id]) == []
+    actual = counters(session, user.id)
+    expected = expected_spend(session, user.id)
+    assert {key: amount for key, amount in actual.items() if amount or key in expected} == expected
+
+
+def test_orm_create_update_delete(session, user):
+    food = add(session, user, THIS_MONTH, 1500, "Food & Dining")
+    taxi = add(session, user, THIS_MONTH, 700)
+    add(session, user, LAST_MONTH, 900)
+    add(session, user, THIS_MONTH, 50000, "Income", is_income=True)
+    session.commit()
+    assert_in_step(session, user)
+
+    food.amount = 2500
+    taxi.category = "Shopping"
+    taxi.date = LAST_MONTH  # Moves between months as well as categories
+    session.commit()
+    assert_in_step(session, user)
+
+    session.delete(food)
+    session.commit()
+    assert_in_step(session, user)
+    assert counters(session, user.id)[("Food & Dining", THIS_MONTH)] == 0
+
+
+def test_bulk_core_statements(session, user):
+    rows = [
+        {"id": uuid.uuid4(), "user_id": user.id, "date": THIS_MONTH + timedelta(days=i),
+         "amount": 1000 * (i + 1), "category": "Transport", "is_income": False,
+         "description": f"Ride {i}", "merchant": None}
+        for i in range(4)
+    ]
+    session.execute(insert(Transaction), rows)
+    mark_user_data_changed(session, user.id)
+    record_changes(session, [TransactionChange(None, snapshot_from_values(row)) for row in rows])
+    session.commit()
+    assert_in_step(session, user)
+
+    # Recategorize two rows and delete a third, reported the way the bulk endpoint does
+    moved, removed = rows[:2], rows[2]
+    session.execute(
+        update(Transaction)
+        .where(Transaction.id.in_([row["id"] for row in moved]))
+        .values(category="Shopping")
+        .execution_options(synchronize_session=False)
+    )
+    session.execute(
+        delete(Transaction)
+        .where(Transaction.id == removed["id"])
+        .execution_options(synchronize_session=False)
+    )
+    changes = [
+        TransactionChange(snapshot_from_values(row), snapshot_from_values({**row, "category": "Shopping"}))
+        for row in moved
+    ]
+    changes.append(TransactionChange(snapshot_from_values(removed), None))
+    mark_user_data_changed(session, user.id)
+    record_changes(session, changes)
+    session.commit()
+    assert_in_step(session, user)
+    assert counters(session, user.id)[("Shopping", THIS_MONTH)] == 3000
+
+
+def test_archive_keeps_totals(session, user):
+    add(session, user, OLDER_MONTH, 1200)
+    add(session, user, OLDER_MONTH + timedelta(days=3), 800, "Food & Dining")
+    add(session, user, LAST_MONTH, 400)
+    session.commit()
+
+    assert archive_user(session, user.id, LAST_MONTH) == 2
+    session.commit()
+    assert_in_step(session, user)
+    assert session.scalar(select(Transaction.id).where(Transaction.date < LAST_MONTH)) is None
+
+    # A later write to the archived month still counts the archived rows
+    add(session, user, OLDER_MONTH + timedelta(days=5), 300)
+    session.commit()
+    assert_in_step(session, user)
+    assert counters(session, user.id)[("Transport", OLDER_MONTH)] == 1500
+
+
+def test_missing_counter_starts_from_archived_rows(session, user):
+    add(session, user, OLDER_MONTH, 1200)
+    session.commit()
+    archive_user(session, user.id, LAST_MONTH)
+    session.execute(delete(CategoryMonthSpend).where(CategoryMonthSpend.user_id == user.id))
+    session.commit()
+
+    add(session, user, OLDER_MONTH + timedelta(days=1), 300)
+    session.commit()
+    assert counters(session, user.id)[("Transport", OLDER_MONTH)] == 1500
+    assert_in_step(session, user)
+
+
+def test_late_write_recomputes_closed_month(session, user):
+    add(session, user, LAST_MONTH, 1000)
+    add(session, user, LAST_MONTH + timedelta(days=2), 500, "Food & Dining")
+    session.commit()
+    assert close_months(session, [user.id]) == 1
+    session.commit()
+    assert session.get(MonthSummary, (user.id, LAST_MONTH)).expense_total == 1500
+
+    late = add(session, user, LAST_MONTH + timedelta(days=4), 250)
+    session.commit()
+    session.expire_all()
+    summary = session.get(MonthSummary, (user.id, LAST_MONTH))
+    assert summary.expense_total == 1750
+    assert summary.categories["Transport"]["total"] == 1250
+
+    session.delete(late)
+    session.commit()
+    session.expire_all()
+    assert session.get(MonthSummary, (user.id, LAST_MONTH)).expense_total == 1500
+    assert_in_step(session, user)
+
+
+def test_late_write_to_archived_month_recomputes_summary(session, user):
+    add(session, user, OLDER_MONTH, 1000)
+    session.commit()
+    archive_user(session, user.id, LAST_MONTH)  # Closes the month before moving its rows
+    session.commit()
+    assert session.get(MonthSummary, (user.id, OLDER_MONTH)).expense_total == 1000
+
+    add(session, user, OLDER_MONTH + timedelta(days=1), 400)
+    session.commit()
+    session.expire_all()
+    assert session.get(MonthSummary, (user.id, OLDER_MONTH)).expense_total == 1400
+    assert_in_step(session, user)
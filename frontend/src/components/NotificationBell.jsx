@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { predictionsService } from '../services/predictions';
+import { subscribeToEvents } from '../services/events';
 
 export default function NotificationBell() {
     const [notifications, setNotifications] = useState([]);
@@ -10,9 +11,24 @@ export default function NotificationBell() {
 
     useEffect(() => {
         fetchNotifications();
-        // Refresh every 5 minutes
-        const interval = setInterval(fetchNotifications, 5 * 60 * 1000);
-        return () => clearInterval(interval);
+        // Budget thresholds crossed later are pushed by the server instead of polled
+        return subscribeToEvents({
+            budget_alert: (alert) => {
+                if (alert.alert_level !== 'critical' && alert.alert_level !== 'warning') return;
+                setNotifications((current) => [
+                    {
+                        id: `budget-${alert.category}`,
+                        type: 'budget',
+                        severity: alert.alert_level,
+                        title: `${alert.category} Budget`,
+                        message: alert.message,
+                        icon: alert.alert_level === 'critical' ? '🚨' : '⚠️',
+                        link: '/insights'
+                    },
+                    ...current.filter((n) => n.id !== `budget-${alert.category}`)
+                ].slice(0, 5));
+            },
+        });
     }, []);
 
     const fetchNotifications = async () => {
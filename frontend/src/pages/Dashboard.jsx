@@ -1,5 +1,6 @@
 import { useState, useEffect, useMemo } from 'react';
 import { transactionService } from '../services/transactions';
+import { subscribeToEvents } from '../services/events';
 import Sidebar from '../components/Sidebar';
 import Footer from '../components/Footer';
 import QuickInsights from '../components/QuickInsights';
@@ -25,6 +26,8 @@ export default function Dashboard() {
 
     useEffect(() => {
         fetchData();
+        // Writes from any tab or device arrive as deltas instead of refetching the summary
+        return subscribeToEvents({ dashboard_delta: applyDelta });
     }, []);
 
     const fetchData = async () => {
@@ -43,6 +46,46 @@ export default function Dashboard() {
         }
     };
 
+    const applyDelta = (delta) => {
+        setSummary((current) => {
+            if (!current) return current;
+            const monthlyExpenses = current.monthly_expenses + delta.monthly_expenses;
+            const previousExpenses = (current.previous_month_expenses || 0) + delta.previous_month_expenses;
+            const breakdown = Object.fromEntries(
+                current.category_breakdown.map(({ category, amount }) => [category, amount])
+            );
+            Object.entries(delta.category_breakdown).forEach(([category, amount]) => {
+                breakdown[category] = (breakdown[category] || 0) + amount;
+            });
+            return {
+                ...current,
+                balance: current.balance + delta.balance,
+                monthly_income: current.monthly_income + delta.monthly_income,
+                monthly_expenses: monthlyExpenses,
+                previous_month_expenses: previousExpenses,
+                expense_change_percent: previousExpenses > 0
+                    ? Math.round(((monthlyExpenses - previousExpenses) / previousExpenses) * 1000) / 10
+                    : 0,
+                category_breakdown: Object.entries(breakdown)
+                    .filter(([, amount]) => amount !== 0)
+                    .map(([category, amount]) => ({ category, amount })),
+            };
+        });
+
+        if (delta.truncated) {
+            // Too many rows changed to send individually (e.g. a large import)
+            transactionService.getTransactions({ page: 1, page_size: 100 })
+                .then((txnData) => setTransactions(txnData.transactions));
+            return;
+        }
+        setTransactions((current) => {
+            const changedIds = new Set([...delta.removed, ...delta.upserted.map((t) => t.id)]);
+            return [...current.filter((t) => !changedIds.has(t.id)), ...delta.upserted]
+                .sort((a, b) => b.date.localeCompare(a.date))
+                .slice(0, 100);
+        });
+    };
+
     // Filter transactions by time period
     const filterByPeriod = (txns, period) => {
         const today = new Date();
@@ -86,17 +129,13 @@ export default function Dashboard() {
         return Object.entries(breakdown).map(([category, amount]) => ({ category, amount }));
     }, [categoryTransactions]);
 
+    // The resulting dashboard_delta event updates the view
     const handleAddTransaction = async (data) => {
         await transactionService.createTransaction(data);
-        fetchData();
     };
 
     const handleImportCSV = async (file) => {
-        const result = await transactionService.importCSV(file);
-        if (result.imported > 0) {
-            fetchData();
-        }
-        return result;
+        return transactionService.importCSV(file);
     };
 
     const formatAmount = (amount) => {
@@ -0,0 +1,58 @@
+import api, { API_URL } from './api';
+
+const RECONNECT_DELAY_MS = 5000;
+
+// Live updates pushed by the backend over Server-Sent Events.
+// EventSource can't send headers, so each connection opens with a
+// short-lived single-use ticket rather than the access token.
+export function subscribeToEvents(handlers) {
+    if (!localStorage.getItem('access_token')) {
+        return () => {};
+    }
+
+    let source = null;
+    let retryTimer = null;
+    let closed = false;
+
+    const scheduleReconnect = () => {
+        if (!closed) {
+            retryTimer = setTimeout(connect, RECONNECT_DELAY_MS);
+        }
+    };
+
+    async function connect() {
+        let ticket;
+        try {
+            ({ ticket } = (await api.post('/events/ticket')).data);
+        } catch {
+            scheduleReconnect();
+            return;
+        }
+        if (closed) {
+            return;
+        }
+
+        source = new EventSource(`${API_URL}/events?ticket=${encodeURIComponent(ticket)}`);
+        Object.entries(handlers).forEach(([eventType, handler]) => {
+            source.addEventListener(eventType, (event) => handler(JSON.parse(event.data)));
+        });
+
+        // EventSource would retry with the same ticket, which is already spent
+        source.onerror = () => {
+            source.close();
+            scheduleReconnect();
+        };
+    }
+
+    connect();
+
+    return () => {
+        closed = true;
+        clearTimeout(retryTimer);
+        if (source) {
+            source.close();
+        }
+    };
+}
+
+export default subscribeToEvents;